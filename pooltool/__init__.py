@@ -1,18 +1,38 @@
 """Constants and other
 
 All units are SI unless otherwise stated.
+
+Importing pooltool doesn't import the rendering modules (panda3d and pooltool.ani), so
+that processes that only simulate start quickly. They are imported the first time
+something that needs them is used, e.g. `pooltool.ShotViewer` or
+`System.init_shot_animation`.
 """
 
 __version__ = "0.1"
 
-import pooltool.ani.utils as autils
 import pooltool.utils as utils
-from pooltool.ani.animate import *
+from pooltool.batch import *
 from pooltool.constants import *
 from pooltool.events import *
+from pooltool.kernels import compile_kernels
 from pooltool.layouts import *
 from pooltool.objects.ball import *
 from pooltool.objects.cue import *
 from pooltool.objects.table import *
 from pooltool.system import *
 from pooltool.terminal import *
+
+autils = utils.LazyModule("pooltool.ani.utils")
+
+# The names of pooltool.ani.animate that are attributes of pooltool
+animate_names = ("ModeManager", "Interface", "ShotViewer", "Play")
+
+
+def __getattr__(name):
+    """Import the rendering modules when one of their names is first accessed"""
+    if name in animate_names:
+        import pooltool.ani.animate as animate
+
+        return getattr(animate, name)
+
+    raise AttributeError(f"module 'pooltool' has no attribute '{name}'")
@@ -1,14 +1,11 @@
 #! /usr/bin/env python
 
-import ast
-import configparser
 from pathlib import Path
-from typing import Dict
 
 from panda3d.core import loadPrcFile
 
 import pooltool as pt
-from pooltool.utils import panda_path
+from pooltool.utils import load_config, panda_path, save_config
 
 loadPrcFile(panda_path(Path(pt.__file__).parent / "config" / "config_panda3d.prc"))
 
@@ -67,34 +64,4 @@ logo_paths = {
 }
 
 
-def load_config(name):
-    config_path = Path(__file__).parent.parent / "config" / name
-    config_obj = configparser.ConfigParser()
-    config_obj.read(config_path)
-    config = {}
-    for section in config_obj.sections():
-        config[section] = {}
-        for k, v in config_obj[section].items():
-            try:
-                config[section][k] = ast.literal_eval(v)
-            except Exception:
-                config[section][k] = v
-    return config
-
-
-def save_config(name, config: Dict, overwrite=False):
-    config_path = Path(__file__).parent.parent / "config" / name
-
-    if config_path.exists() and not overwrite:
-        raise ValueError(
-            f"pass overwrite=True to overwrite existing config: '{config_path}'"
-        )
-
-    config_obj = configparser.ConfigParser()
-    config_obj.read_dict(config)
-
-    with open(config_path, "w") as configfile:
-        config_obj.write(configfile)
-
-
 settings = load_config("settings")
@@ -0,0 +1,359 @@
+#! /usr/bin/env python
+"""Simulate many systems in parallel
+
+Each worker process simulates its share of the shots with the compiled engine (see
+pooltool.engine), and sends back a ShotResult for each: the final ball states and the
+compact EventLog of the shot. Since no events or histories are created in the workers,
+results are much cheaper to send between processes than `System.as_dict()`. A shot that
+raises an exception doesn't stop the others, and its ShotResult holds the error instead.
+"""
+
+import collections
+import itertools
+import multiprocessing
+import traceback
+
+import numpy as np
+
+import pooltool.constants as c
+import pooltool.engine as engine
+from pooltool.kernels import compile_kernels
+from pooltool.system import System
+
+__all__ = ["ShotResult", "simulate_many"]
+
+# The keys of a parameter array dictionary (see `simulate_many`). These are passed to
+# Cue.strike
+cue_parameters = ("V0", "phi", "theta", "a", "b")
+
+
+class ShotResult(object):
+    def __init__(self, ids, rvw, s, t, event_log, cue_state=None, error=None):
+        """The outcome of a simulated shot
+
+        Parameters
+        ==========
+        ids : list
+            The ball ids, in the order of the rows of rvw, s, and t
+        rvw : array
+            The (N, 3, 3) final states of the balls
+        s : array
+            The N final motion states of the balls
+        t : array
+            The N final times of the balls
+        event_log : pooltool.engine.EventLog
+            The events of the shot. Its start states (see EventLog) are the states of
+            the balls after the cue struck
+        cue_state : dict, None
+            The parameters of the cue that struck the shot (see `cue_parameters`), or
+            None if the system had no cue
+        error : str, None
+            If the shot raised an exception while it was simulated, its traceback. rvw,
+            s, t, and event_log are then None. None otherwise
+        """
+        self.ids = ids
+        self.rvw = rvw
+        self.s = s
+        self.t = t
+        self.event_log = event_log
+        self.cue_state = cue_state
+        self.error = error
+
+    @property
+    def failed(self):
+        return self.error is not None
+
+    def get_pocketed_ball_ids(self):
+        return [ball_id for ball_id, s in zip(self.ids, self.s) if s == c.pocketed]
+
+    def apply(self, system):
+        """Set a system to the outcome of this shot
+
+        The system must have the same balls (in the same order) and table as the system
+        that was simulated. Only its ball parameters (e.g. mass and friction) and table
+        are used, since the balls are set to their states at the start of the shot (see
+        EventLog), and the cue is set to the one that struck the shot. Its events and
+        ball histories are built from the event log the first time they are accessed.
+
+        Returns
+        =======
+        system : pooltool.system.System
+            The modified system
+        """
+        if self.failed:
+            raise ValueError(
+                f"ShotResult.apply :: The shot failed to simulate:\n{self.error}"
+            )
+
+        if list(system.balls.keys()) != list(self.ids):
+            raise ValueError(
+                f"ShotResult.apply :: system has balls {list(system.balls.keys())}, "
+                f"but the shot has balls {list(self.ids)}"
+            )
+
+        system.reset_history()
+
+        state = system.state
+        state.rvw[:] = self.rvw
+        state.s[:] = self.s
+        state.t[:] = self.t
+
+        engine.add_pocketed_balls(system, self.event_log)
+        system.attach_event_log(self.event_log)
+
+        if system.cue is not None and self.cue_state is not None:
+            system.cue.set_state(**self.cue_state)
+
+        return system
+
+    def __len__(self):
+        return len(self.event_log)
+
+    def __repr__(self):
+        lines = [
+            f"<{self.__class__.__name__} object at {hex(id(self))}>",
+            f" ├── ids    : {self.ids}",
+            f" └── events : {'failed' if self.failed else len(self)}",
+        ]
+
+        return "\n".join(lines) + "\n"
+
+
+def simulate_shot(system):
+    """Simulate a system with the compiled engine and get its ShotResult
+
+    If the simulation raises an exception, the ShotResult holds its traceback instead
+    of the outcome (see ShotResult)
+    """
+    ids = list(system.state.ids)
+    cue_state = (
+        None
+        if system.cue is None
+        else {cue_param: getattr(system.cue, cue_param) for cue_param in cue_parameters}
+    )
+
+    try:
+        system.simulate(quiet=True, engine="compiled", t_final=worker["t_final"])
+    except Exception:
+        return ShotResult(
+            ids,
+            None,
+            None,
+            None,
+            None,
+            cue_state=cue_state,
+            error=traceback.format_exc(),
+        )
+
+    state = system.state
+    return ShotResult(
+        ids=ids,
+        rvw=state.rvw.copy(),
+        s=state.s.copy(),
+        t=state.t.copy(),
+        event_log=system.event_log,
+        cue_state=cue_state,
+    )
+
+
+# The state of a worker process, set by `init_worker`
+worker = {}
+
+
+def init_worker(template, t_final):
+    """Prepare a process to simulate shots
+
+    Parameters
+    ==========
+    template : dict or None
+        The dictionary (see System.as_dict) of the system that parameter arrays are
+        applied to, or None if the shots are systems
+    t_final : float or None
+        Passed to System.simulate
+    """
+    compile_kernels(engine="compiled")
+
+    worker.clear()
+    worker["t_final"] = t_final
+
+    if template is None:
+        return
+
+    system = System(d=template)
+    worker["template"] = system
+    worker["initial_state"] = (
+        system.state.rvw.copy(),
+        system.state.s.copy(),
+        system.state.t.copy(),
+        {cue_param: getattr(system.cue, cue_param) for cue_param in cue_parameters},
+        {pocket_id: set(p.contains) for pocket_id, p in system.table.pockets.items()},
+    )
+
+
+def simulate_chunk(chunk):
+    """Simulate a chunk of shots in a worker process
+
+    Parameters
+    ==========
+    chunk : list or dict
+        Either a list of system dictionaries (see System.as_dict), or a dictionary of
+        equal-length parameter arrays to apply to the template system of the worker
+
+    Returns
+    =======
+    results : list
+        The ShotResult of each shot in the chunk
+    """
+    if not isinstance(chunk, dict):
+        return [simulate_shot(System(d=system_dict)) for system_dict in chunk]
+
+    system = worker["template"]
+    rvw, s, t, cue_state, pocket_contents = worker["initial_state"]
+    num_shots = len(next(iter(chunk.values())))
+
+    results = []
+    for i in range(num_shots):
+        system.state.rvw[:], system.state.s[:], system.state.t[:] = rvw, s, t
+        for pocket_id, contains in pocket_contents.items():
+            system.table.pockets[pocket_id].contains = set(contains)
+
+        system.cue.set_state(**cue_state)
+        system.cue.strike(**{key: values[i] for key, values in chunk.items()})
+        results.append(simulate_shot(system))
+
+    return results
+
+
+def get_chunks(systems, chunksize):
+    """Split shots into the chunks sent to worker processes (see `simulate_chunk`)"""
+    if isinstance(systems, dict):
+        num_shots = len(next(iter(systems.values())))
+        for start in range(0, num_shots, chunksize):
+            yield {
+                key: values[start : start + chunksize]
+                for key, values in systems.items()
+            }
+        return
+
+    systems = iter(systems)
+    while True:
+        chunk = [system.as_dict() for system in itertools.islice(systems, chunksize)]
+        if not chunk:
+            return
+
+        yield chunk
+
+
+def simulate_many(
+    systems,
+    template=None,
+    processes=None,
+    chunksize=None,
+    stream=False,
+    t_final=None,
+):
+    """Simulate many shots across multiple processes
+
+    Each shot is simulated with the compiled engine (see pooltool.engine). Each worker
+    process compiles (or loads from cache) the kernels once when it starts (see
+    pooltool.kernels.compile_kernels), and is then reused for all of the shots assigned
+    to it.
+
+    Parameters
+    ==========
+    systems : iterable or dict
+        Either an iterable of Systems, which are simulated from their current states,
+        or a dictionary of equal-length parameter arrays whose keys are in
+        `cue_parameters`. In the latter case, shot i is simulated by setting the balls
+        to the states of `template`, striking the cue ball with the ith value of each
+        array (see Cue.strike), and simulating. The systems themselves are not modified
+        (see `ShotResult.apply`)
+    template : pooltool.system.System, None
+        The system that parameter arrays are applied to. Its cue must have a cueing
+        ball. Required if and only if systems is a dictionary
+    processes : int, None
+        The number of worker processes. If None, os.cpu_count() is used. If 1, the shots
+        are simulated in this process
+    chunksize : int, None
+        The number of shots sent to a worker at a time. If None, the shots are divided
+        into roughly 4 chunks per process, or chunks of 1 if the number of shots is not
+        known
+    stream : bool, False
+        If True, an iterator is returned that yields each ShotResult as soon as it (and
+        every shot before it) is ready. Only a few chunks per process are queued at any
+        time, so systems can be an endless generator
+    t_final : float, None
+        Passed to System.simulate
+
+    Returns
+    =======
+    results : list or iterator
+        The ShotResult of each shot, in the same order as the shots. The results of
+        shots that raised an exception are failed (see ShotResult)
+    """
+    if isinstance(systems, dict):
+        if template is None:
+            raise ValueError("simulate_many :: parameter arrays require a template")
+
+        unknown = set(systems) - set(cue_parameters)
+        if unknown:
+            raise ValueError(
+                f"simulate_many :: {unknown} are not valid parameters. Please choose "
+                f"from: {cue_parameters}"
+            )
+
+        systems = {key: np.asarray(values) for key, values in systems.items()}
+        if len(set(len(values) for values in systems.values())) > 1:
+            raise ValueError("simulate_many :: parameter arrays must have equal length")
+
+        template = template.as_dict()
+
+    elif template is not None:
+        raise ValueError("simulate_many :: template requires parameter arrays")
+
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+
+    if chunksize is None:
+        if isinstance(systems, dict):
+            num_shots = len(next(iter(systems.values()), []))
+        else:
+            num_shots = len(systems) if hasattr(systems, "__len__") else None
+
+        chunksize = (
+            max(1, int(np.ceil(num_shots / (4 * processes))))
+            if num_shots is not None
+            else 1
+        )
+
+    if isinstance(systems, dict) and not len(systems):
+        results = iter([])
+    elif processes == 1:
+        results = simulate_in_process(systems, template, chunksize, t_final)
+    else:
+        results = simulate_in_pool(systems, template, processes, chunksize, t_final)
+
+    return results if stream else list(results)
+
+
+def simulate_in_process(systems, template, chunksize, t_final):
+    init_worker(template, t_final)
+    for chunk in get_chunks(systems, chunksize):
+        yield from simulate_chunk(chunk)
+
+
+def simulate_in_pool(systems, template, processes, chunksize, t_final):
+    with multiprocessing.Pool(
+        processes, initializer=init_worker, initargs=(template, t_final)
+    ) as pool:
+        pending = collections.deque()
+        for chunk in get_chunks(systems, chunksize):
+            pending.append(pool.apply_async(simulate_chunk, (chunk,)))
+
+            # Limit the number of queued chunks, so results are yielded while the
+            # remaining shots are still being submitted
+            if len(pending) >= 2 * processes:
+                yield from pending.popleft().get()
+
+        while len(pending):
+            yield from pending.popleft().get()
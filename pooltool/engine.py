@@ -0,0 +1,985 @@
+#! /usr/bin/env python
+"""A fully compiled event-based evolution algorithm
+
+The event loop in pooltool.evolution.EvolveShotEventBased creates Python objects for
+each event it considers, which is convenient but slow. This module implements the same
+algorithm as a single just-in-time compiled function that operates on packed arrays of
+ball states (see pooltool.objects.ball.SystemState) and table geometry. The result is a
+compact EventLog, from which Event objects and ball histories can be built on demand.
+"""
+
+import numpy as np
+from numba import jit
+
+import pooltool.constants as c
+import pooltool.physics as physics
+import pooltool.utils as utils
+from pooltool.events import (
+    BallBallCollision,
+    BallCushionCollision,
+    BallPocketCollision,
+    Events,
+    NonEvent,
+    RollingSpinningTransition,
+    RollingStationaryTransition,
+    SlidingRollingTransition,
+    SpinningStationaryTransition,
+)
+
+# Integer codes of the event types recorded in an EventLog
+code_ball_ball = 0
+code_ball_linear_cushion = 1
+code_ball_circular_cushion = 2
+code_ball_pocket = 3
+code_sliding_rolling = 4
+code_rolling_spinning = 5
+code_rolling_stationary = 6
+code_spinning_stationary = 7
+
+transition_classes = {
+    code_sliding_rolling: SlidingRollingTransition,
+    code_rolling_spinning: RollingSpinningTransition,
+    code_rolling_stationary: RollingStationaryTransition,
+    code_spinning_stationary: SpinningStationaryTransition,
+}
+
+# When events are tied in time, they are resolved in this order (see
+# pooltool.evolution.queue_priority)
+priority_transition = 0
+priority_ball_ball = 1
+priority_ball_linear_cushion = 2
+priority_ball_circular_cushion = 3
+priority_ball_pocket = 4
+
+
+class EventLog(object):
+    def __init__(
+        self,
+        time,
+        event_type,
+        agents,
+        rvw_initial,
+        s_initial,
+        rvw_final,
+        s_final,
+        rvw_start,
+        s_start,
+        t_start,
+        ended,
+    ):
+        """A compact record of the events of a simulation
+
+        Event i occurred at time[i], has the type code event_type[i] (e.g.
+        `code_ball_ball`), and involves the agents agents[i]. The first agent is always
+        a ball index (the row of the ball in the SystemState), and the second is either
+        a ball index, a linear cushion index, a circular cushion index, or a pocket
+        index, depending on the event type. Transitions have only one agent, and the
+        second is -1. rvw_initial[i, j] and s_initial[i, j] are the state of ball agent
+        j before the event was resolved, and rvw_final[i, j] and s_final[i, j] after.
+
+        Parameters
+        ==========
+        rvw_start : array
+            The (N, 3, 3) states of all balls when the simulation started. Together
+            with the events, this is enough to reconstruct the state of every ball at
+            any event (see `replay_fast`)
+        s_start : array
+            The N motion states of all balls when the simulation started
+        t_start : float
+            The time when the simulation started
+        ended : bool
+            True if the simulation ran until no more events could occur, and False if
+            it was stopped by `t_final`
+        """
+        self.time = time
+        self.event_type = event_type
+        self.agents = agents
+        self.rvw_initial = rvw_initial
+        self.s_initial = s_initial
+        self.rvw_final = rvw_final
+        self.s_final = s_final
+        self.rvw_start = rvw_start
+        self.s_start = s_start
+        self.t_start = t_start
+        self.ended = ended
+
+    def __len__(self):
+        return len(self.time)
+
+    def __repr__(self):
+        lines = [
+            f"<{self.__class__.__name__} object at {hex(id(self))}>",
+            f" ├── events : {len(self)}",
+            f" └── ended  : {self.ended}",
+        ]
+
+        return "\n".join(lines) + "\n"
+
+
+def simulate(system, t_final=None):
+    """Evolve a system with the compiled event loop
+
+    The balls of the system are evolved in place, and pockets are updated with the
+    balls they contain. Events are not created. Instead, an EventLog is returned.
+
+    Parameters
+    ==========
+    system : pooltool.system.System
+        A system whose balls have been packed (see `System.pack_balls`)
+    t_final : float, None
+        The simulation will run until the time is greater than this value. If None,
+        simulation is ran until the next event occurs at np.inf
+    """
+    state = system.state
+    geometry = system.table.geometry
+
+    rvw_start, s_start = state.rvw.copy(), state.s.copy()
+    t_start = float(system.t)
+
+    include = np.array(
+        [
+            system.include.get(event_type, True)
+            for event_type in ("ball-ball", "ball-cushion", "ball-pocket")
+        ]
+    )
+
+    (
+        num_events,
+        time,
+        event_type,
+        agents,
+        rvw_initial,
+        s_initial,
+        rvw_final,
+        s_final,
+        ended,
+    ) = simulate_fast(
+        state.rvw,
+        state.s,
+        state.t,
+        state.R,
+        state.m,
+        state.g,
+        state.u_s,
+        state.u_sp,
+        state.u_r,
+        state.e_c,
+        state.f_c,
+        geometry.linear_p1,
+        geometry.linear_p2,
+        geometry.linear_lx,
+        geometry.linear_ly,
+        geometry.linear_l0,
+        geometry.linear_direction,
+        geometry.linear_normal,
+        geometry.linear_height,
+        geometry.circular_center,
+        geometry.circular_radius,
+        geometry.circular_height,
+        geometry.pocket_center,
+        geometry.pocket_radius,
+        geometry.pocket_depth,
+        include,
+        t_start,
+        np.inf if t_final is None else t_final,
+        system.detection_counts,
+    )
+
+    log = EventLog(
+        time=time[:num_events],
+        event_type=event_type[:num_events],
+        agents=agents[:num_events],
+        rvw_initial=rvw_initial[:num_events],
+        s_initial=s_initial[:num_events],
+        rvw_final=rvw_final[:num_events],
+        s_final=s_final[:num_events],
+        rvw_start=rvw_start,
+        s_start=s_start,
+        t_start=t_start,
+        ended=ended,
+    )
+
+    add_pocketed_balls(system, log)
+
+    return log
+
+
+def add_pocketed_balls(system, log):
+    """Add the balls pocketed during a simulation to the pockets that hold them"""
+    pocket_ids = system.table.geometry.pocket_ids
+    for i in np.flatnonzero(log.event_type == code_ball_pocket):
+        ball_index, pocket_index = log.agents[i]
+        if not log.s_final[i, 0] == c.pocketed:
+            # The event was not resolved (see System.include)
+            continue
+
+        ball_id = system.state.ids[ball_index]
+        system.table.pockets[pocket_ids[pocket_index]].add(ball_id)
+
+
+def materialize(system, log):
+    """Build the events and ball histories of a system from its EventLog
+
+    This creates the same Event objects, system events, ball events, and ball histories
+    that the Python event loop (EvolveShotEventBased.evolution_algorithm) creates while
+    simulating, including the final NonEvent if the simulation wasn't stopped early.
+    They are appended to the events and histories that the system had when the
+    simulation started, e.g. the initializing NonEvent (see SystemHistory.init_history),
+    or the events before a checkpoint (see SystemHistory.restore). If there were none,
+    an initializing NonEvent is added first. The histories hold the states of all balls
+    or of the agents of each event, depending on `system.history_mode`.
+    """
+    state = system.state
+    balls = [system.balls[ball_id] for ball_id in state.ids]
+    table, geometry = system.table, system.table.geometry
+    linear = [table.cushion_segments["linear"][key] for key in geometry.linear_ids]
+    circular = [
+        table.cushion_segments["circular"][key] for key in geometry.circular_ids
+    ]
+    pockets = [table.pockets[key] for key in geometry.pocket_ids]
+
+    events = system.events
+    if not len(events):
+        event = NonEvent(t=log.t_start)
+        events.append(event)
+        for index, ball in enumerate(balls):
+            ball.history.reset()
+            ball.history.add(log.rvw_start[index], log.s_start[index], log.t_start)
+            ball.events.reset()
+            ball.events.append(event)
+
+    # The position in `events` of the event in row 0 of the log
+    first = len(events)
+
+    # Ball-ball collisions store 4 agent states, and other events store 2
+    num_ball_ball = np.count_nonzero(log.event_type == code_ball_ball)
+    state.event_states.reserve(len(state.event_states) + 2 * (len(log) + num_ball_ball))
+
+    for i in range(len(log)):
+        code, t = log.event_type[i], log.time[i]
+        ball = balls[log.agents[i, 0]]
+        other_index = log.agents[i, 1]
+
+        if code in transition_classes:
+            event = transition_classes[code](ball, t=t)
+            event.agent_state_initial = (log.rvw_initial[i, 0], log.s_initial[i, 0])
+            event.agent_state_final = (log.rvw_final[i, 0], log.s_final[i, 0])
+            events.append(event)
+            continue
+
+        if code == code_ball_ball:
+            event = BallBallCollision(ball, balls[other_index], t=t)
+            event.agent2_state_initial = (log.rvw_initial[i, 1], log.s_initial[i, 1])
+            event.agent2_state_final = (log.rvw_final[i, 1], log.s_final[i, 1])
+        elif code == code_ball_linear_cushion:
+            event = BallCushionCollision(ball, linear[other_index], t=t)
+        elif code == code_ball_circular_cushion:
+            event = BallCushionCollision(ball, circular[other_index], t=t)
+        else:
+            event = BallPocketCollision(ball, pockets[other_index], t=t)
+
+        event.agent1_state_initial = (log.rvw_initial[i, 0], log.s_initial[i, 0])
+        event.agent1_state_final = (log.rvw_final[i, 0], log.s_final[i, 0])
+        events.append(event)
+
+    if log.ended:
+        t_end = log.time[-1] if len(log) else log.t_start
+        events.append(NonEvent(t=t_end + c.tol))
+
+    if system.history_mode == "agents":
+        materialize_agent_histories(balls, events, first, log)
+        return
+
+    rvw_history, s_history = replay_fast(
+        log.rvw_start,
+        log.s_start,
+        state.R,
+        state.m,
+        state.g,
+        state.u_s,
+        state.u_sp,
+        state.u_r,
+        log.time,
+        log.event_type,
+        log.agents,
+        log.rvw_final,
+        log.s_final,
+        log.t_start,
+        log.ended,
+    )
+    new_events = events[first:]
+    t_history = [event.time for event in new_events]
+
+    # Row 0 of the replay is the state when the simulation started
+    for index, ball in enumerate(balls):
+        ball.history.extend(rvw_history[1:, index], s_history[1:, index], t_history)
+        ball.events.extend(new_events)
+
+
+def materialize_agent_histories(balls, events, first, log):
+    """Build ball histories that hold only the states of the agents of each event
+
+    No replay is needed, since the state of each agent after each event is in the log.
+    The final state of each ball is found by evolving the state after its last event.
+
+    Parameters
+    ==========
+    balls : list
+        The balls, in the order of the SystemState
+    events : pooltool.events.Events
+        The events of the system, where the event in row i of the log is at position
+        first + i
+    """
+    ball_ball = log.event_type == code_ball_ball
+    t_end = log.time[-1] if len(log) else log.t_start
+
+    for index, ball in enumerate(balls):
+        rows = np.flatnonzero(
+            (log.agents[:, 0] == index) | (ball_ball & (log.agents[:, 1] == index))
+        )
+        slots = (log.agents[rows, 0] != index).astype(np.int64)
+
+        history = ball.history
+        history.reserve(len(history) + len(rows) + 1)
+        for row, slot in zip(rows, slots):
+            history.add(log.rvw_final[row, slot], log.s_final[row, slot], log.time[row])
+
+        ball_events = ball.events
+        for row in rows:
+            ball_events.append(events[first + row])
+
+        if log.ended:
+            # Like the Python event loop, the final NonEvent records the states of all
+            # balls at the time of the last event
+            rvw, s = ball.state_at(t_end)
+            history.add(rvw, s, events[-1].time)
+            ball_events.append(events[-1])
+
+
+@jit(nopython=True, cache=c.numba_cache)
+def get_transition_fast(rvw, s, R, u_s, u_sp, u_r, g):
+    """Get the time until and type code of a ball's next transition
+
+    (just-in-time compiled)
+
+    This mirrors Ball.update_next_transition_event. Stationary and pocketed balls have
+    no next transition, which is indicated by a time of np.inf.
+    """
+    if s == c.spinning:
+        return physics.get_spin_time_fast(rvw, R, u_sp, g), code_spinning_stationary
+
+    if s == c.rolling:
+        dtau_E_spin = physics.get_spin_time_fast(rvw, R, u_sp, g)
+        dtau_E_roll = physics.get_roll_time_fast(rvw, u_r, g)
+
+        if dtau_E_spin > dtau_E_roll:
+            return dtau_E_roll, code_rolling_spinning
+        else:
+            return dtau_E_roll, code_rolling_stationary
+
+    if s == c.sliding:
+        return physics.get_slide_time_fast(rvw, R, u_s, g), code_sliding_rolling
+
+    return np.inf, -1
+
+
+@jit(nopython=True, cache=c.numba_cache)
+def grow_fast(a, size):
+    """Copy an array into a larger array with `size` rows (just-in-time compiled)"""
+    out = np.empty((size,) + a.shape[1:], dtype=a.dtype)
+    out[: a.shape[0]] = a
+    return out
+
+
+@jit(nopython=True, cache=c.numba_cache)
+def precedes_fast(time1, priority1, tiebreak1, time2, priority2, tiebreak2):
+    """Whether event 1 comes before event 2 (just-in-time compiled)"""
+    if time1 != time2:
+        return time1 < time2
+
+    if priority1 != priority2:
+        return priority1 < priority2
+
+    return tiebreak1 < tiebreak2
+
+
+@jit(nopython=True, cache=c.numba_cache)
+def get_next_event_fast(
+    transition_time,
+    transition_type,
+    ball_ball_time,
+    ball_ball_min,
+    ball_ball_arg,
+    linear_min,
+    linear_arg,
+    circular_min,
+    circular_arg,
+    pocket_min,
+    pocket_arg,
+    excluded,
+):
+    """Find the next event among the cached events of `simulate_fast`
+
+    (just-in-time compiled)
+
+    Events involving a ball for which excluded is True are ignored, since the ball's
+    cached events are stale.
+
+    Returns
+    =======
+    output : tuple
+        (time, event_type, agent1, agent2), where the agents are ball indices, or a
+        ball index and the index of a cushion segment or pocket. agent2 is -1 for
+        transitions. If there is no event, time is np.inf
+    """
+    N = len(transition_time)
+
+    # Find the next event. Ties are broken by priority, and simultaneous transitions
+    # are resolved starting from the last ball
+    next_time, next_priority, next_tiebreak = np.inf, 0, 0
+    next_code, agent1, agent2 = -1, -1, -1
+
+    for i in range(N):
+        if excluded[i]:
+            continue
+
+        # The earliest collision with a ball that isn't excluded
+        ball_ball_next, ball_ball_other = ball_ball_min[i], ball_ball_arg[i]
+        if excluded[ball_ball_other]:
+            ball_ball_next, ball_ball_other = np.inf, -1
+            for j in range(N):
+                if not excluded[j] and ball_ball_time[i, j] < ball_ball_next:
+                    ball_ball_next, ball_ball_other = ball_ball_time[i, j], j
+
+        if precedes_fast(
+            transition_time[i],
+            priority_transition,
+            -i,
+            next_time,
+            next_priority,
+            next_tiebreak,
+        ):
+            next_time, next_priority = transition_time[i], priority_transition
+            next_tiebreak = -i
+            next_code, agent1, agent2 = transition_type[i], i, -1
+
+        if precedes_fast(
+            ball_ball_next,
+            priority_ball_ball,
+            0,
+            next_time,
+            next_priority,
+            next_tiebreak,
+        ):
+            next_time, next_priority = ball_ball_next, priority_ball_ball
+            next_tiebreak = 0
+            next_code, agent1, agent2 = code_ball_ball, i, ball_ball_other
+
+        if precedes_fast(
+            linear_min[i],
+            priority_ball_linear_cushion,
+            0,
+            next_time,
+            next_priority,
+            next_tiebreak,
+        ):
+            next_time, next_priority = linear_min[i], priority_ball_linear_cushion
+            next_tiebreak = 0
+            next_code, agent1, agent2 = code_ball_linear_cushion, i, linear_arg[i]
+
+        if precedes_fast(
+            circular_min[i],
+            priority_ball_circular_cushion,
+            0,
+            next_time,
+            next_priority,
+            next_tiebreak,
+        ):
+            next_time, next_priority = (
+                circular_min[i],
+                priority_ball_circular_cushion,
+            )
+            next_tiebreak = 0
+            next_code, agent1 = code_ball_circular_cushion, i
+            agent2 = circular_arg[i]
+
+        if precedes_fast(
+            pocket_min[i],
+            priority_ball_pocket,
+            0,
+            next_time,
+            next_priority,
+            next_tiebreak,
+        ):
+            next_time, next_priority = pocket_min[i], priority_ball_pocket
+            next_tiebreak = 0
+            next_code, agent1, agent2 = code_ball_pocket, i, pocket_arg[i]
+    # Ball-ball collisions are recorded with the balls in increasing order
+    if next_code == code_ball_ball and agent2 < agent1:
+        agent1, agent2 = agent2, agent1
+
+    return next_time, next_code, agent1, agent2
+
+
+@jit(nopython=True, cache=c.numba_cache)
+def simulate_fast(
+    rvw,
+    s,
+    t,
+    R,
+    m,
+    g,
+    u_s,
+    u_sp,
+    u_r,
+    e_c,
+    f_c,
+    linear_p1,
+    linear_p2,
+    linear_lx,
+    linear_ly,
+    linear_l0,
+    linear_direction,
+    linear_normal,
+    linear_height,
+    circular_center,
+    circular_radius,
+    circular_height,
+    pocket_center,
+    pocket_radius,
+    pocket_depth,
+    include,
+    t_start,
+    t_final,
+    counts,
+):
+    """Run the event-based evolution algorithm (just-in-time compiled)
+
+    The ball states rvw, s, and t are evolved in place. The remaining ball arguments are
+    the ball parameters, and the table arguments are the arrays of a TableGeometry (see
+    pooltool.objects.table). include is a length-3 boolean array that specifies whether
+    ball-ball, ball-cushion, and ball-pocket events are resolved.
+
+    Like in EvolveShotEventBased, the next event time of each agent combination is
+    cached, and only recalculated for the balls involved in the last event. Ball-ball
+    collision times are only calculated for balls whose swept bounding boxes overlap.
+    For each ball, the earliest transition, ball-ball collision, and collision with each
+    kind of table geometry is kept, so finding the next event takes O(N) time.
+
+    Candidates are passed through the same detection tiers as in EvolveShotEventBased,
+    and the number of candidates and rejections by each tier are added to the (4, 4)
+    integer array counts (see EvolveShotEventBased.get_detection_counts).
+
+    Returns
+    =======
+    output : tuple
+        (num_events, time, event_type, agents, rvw_initial, s_initial, rvw_final,
+        s_final, ended), where the arrays have at least num_events rows (see EventLog)
+    """
+    N = len(s)
+
+    # The earliest event of each kind, for each ball
+    transition_time = np.full(N, np.inf)
+    transition_type = np.full(N, -1, dtype=np.int64)
+    ball_ball_time = np.full((N, N), np.inf)
+    ball_ball_min = np.full(N, np.inf)
+    ball_ball_arg = np.full(N, -1, dtype=np.int64)
+    linear_min = np.full(N, np.inf)
+    linear_arg = np.full(N, -1, dtype=np.int64)
+    circular_min = np.full(N, np.inf)
+    circular_arg = np.full(N, -1, dtype=np.int64)
+    pocket_min = np.full(N, np.inf)
+    pocket_arg = np.full(N, -1, dtype=np.int64)
+
+    # The event log, which grows as needed
+    capacity = 16 * (N + 1)
+    log_time = np.full(capacity, np.nan)
+    log_type = np.full(capacity, -1, dtype=np.int64)
+    log_agents = np.full((capacity, 2), -1, dtype=np.int64)
+    log_rvw_initial = np.full((capacity, 2, 3, 3), np.nan)
+    log_s_initial = np.full((capacity, 2), -1, dtype=np.int64)
+    log_rvw_final = np.full((capacity, 2, 3, 3), np.nan)
+    log_s_final = np.full((capacity, 2), -1, dtype=np.int64)
+
+    # The swept bounding box and reachable disc of each ball until its next transition
+    # (see EvolveShotEventBased.update_ball_bounds)
+    bounds = np.empty((N, 4))
+    discs = np.empty((N, 3))
+
+    t_now = t_start
+    stale = np.ones(N, dtype=np.bool_)
+    num_events = 0
+    ended = False
+
+    while True:
+        for i in range(N):
+            if not stale[i]:
+                continue
+
+            dtau_E, code = get_transition_fast(
+                rvw[i], s[i], R[i], u_s[i], u_sp[i], u_r[i], g[i]
+            )
+            transition_time[i] = t[i] + dtau_E
+            transition_type[i] = code
+
+            mu = u_s[i] if s[i] == c.sliding else u_r[i]
+            bounds[i] = physics.get_ball_swept_bounds_fast(
+                rvw[i], s[i], mu, g[i], R[i], transition_time[i] - t_now
+            )
+            discs[i, 0], discs[i, 1] = rvw[i, 0, 0], rvw[i, 0, 1]
+            discs[i, 2] = R[i] + physics.get_ball_reach_fast(
+                rvw[i], s[i], mu, g[i], transition_time[i] - t_now
+            )
+
+        for i in range(N):
+            if stale[i]:
+                ball_ball_time[i, :] = np.inf
+                ball_ball_time[:, i] = np.inf
+
+        # Reschedule the events of stale balls
+        for i in range(N):
+            if not stale[i]:
+                continue
+
+            mu = u_s[i] if s[i] == c.sliding else u_r[i]
+            translating = not (
+                s[i] == c.stationary or s[i] == c.spinning or s[i] == c.pocketed
+            )
+
+            # Ball-ball collisions. Pairs of stale balls are handled by the first ball,
+            # and coefficients are calculated with the balls in the same order as
+            # EvolveShotEventBased, i.e. by increasing index
+            others = np.empty(N, dtype=np.int64)
+            coeffs = np.empty((N, 5))
+            horizons = np.empty(N)
+            num_others = 0
+            for j in range(N):
+                if j == i or (stale[j] and j < i):
+                    continue
+
+                if s[j] == c.pocketed or s[i] == c.pocketed:
+                    continue
+
+                if not translating and (
+                    s[j] == c.stationary or s[j] == c.spinning or s[j] == c.pocketed
+                ):
+                    continue
+
+                # Balls whose swept bounding boxes don't overlap can't collide
+                if (
+                    bounds[i, 0] > bounds[j, 1]
+                    or bounds[j, 0] > bounds[i, 1]
+                    or bounds[i, 2] > bounds[j, 3]
+                    or bounds[j, 2] > bounds[i, 3]
+                ):
+                    continue
+
+                # Balls whose reachable discs are too far apart can't collide
+                counts[0, 0] += 1
+                distance = np.sqrt(
+                    (discs[i, 0] - discs[j, 0]) ** 2 + (discs[i, 1] - discs[j, 1]) ** 2
+                )
+                if distance > discs[i, 2] + discs[j, 2]:
+                    counts[0, 1] += 1
+                    continue
+
+                k, l = (i, j) if i < j else (j, i)
+                mu_k = u_s[k] if s[k] == c.sliding else u_r[k]
+                mu_l = u_s[l] if s[l] == c.sliding else u_r[l]
+                coeffs[num_others] = physics.get_ball_ball_collision_coeffs_fast(
+                    rvw[k], rvw[l], s[k], s[l], mu_k, mu_l, m[k], m[l], g[k], g[l], R[k]
+                )
+                horizons[num_others] = (
+                    min(transition_time[i], transition_time[j]) - t_now
+                )
+                others[num_others] = j
+                num_others += 1
+
+            dtau_Es, skipped = utils.min_real_quartic_roots_within_fast(
+                coeffs[:num_others], horizons[:num_others], c.tol
+            )
+            for n in range(num_others):
+                if skipped[n]:
+                    counts[0, 2] += 1
+                elif not dtau_Es[n] <= horizons[n]:
+                    counts[0, 3] += 1
+
+                j = others[n]
+                ball_ball_time[i, j] = t_now + dtau_Es[n]
+                ball_ball_time[j, i] = ball_ball_time[i, j]
+
+            # Cushion and pocket collisions
+            (
+                linear_dtau,
+                linear_arg[i],
+                circular_dtau,
+                circular_arg[i],
+                pocket_dtau,
+                pocket_arg[i],
+            ) = physics.get_ball_table_collision_times_fast(
+                rvw[i],
+                s[i],
+                mu,
+                m[i],
+                g[i],
+                R[i],
+                transition_time[i] - t_now,
+                linear_p1,
+                linear_p2,
+                linear_lx,
+                linear_ly,
+                linear_l0,
+                linear_direction,
+                circular_center,
+                circular_radius,
+                pocket_center,
+                pocket_radius,
+                counts,
+            )
+            linear_min[i] = t_now + linear_dtau
+            circular_min[i] = t_now + circular_dtau
+            pocket_min[i] = t_now + pocket_dtau
+
+        # Update the earliest ball-ball collision of each ball
+        for i in range(N):
+            if stale[i]:
+                continue
+
+            for j in range(N):
+                if not stale[j]:
+                    continue
+
+                if ball_ball_time[i, j] < ball_ball_min[i]:
+                    ball_ball_min[i], ball_ball_arg[i] = ball_ball_time[i, j], j
+                elif ball_ball_arg[i] == j and ball_ball_time[i, j] != ball_ball_min[i]:
+                    # The earliest collision was invalidated. Search the whole row
+                    ball_ball_arg[i] = np.argmin(ball_ball_time[i])
+                    ball_ball_min[i] = ball_ball_time[i, ball_ball_arg[i]]
+
+        for i in range(N):
+            if stale[i]:
+                ball_ball_arg[i] = np.argmin(ball_ball_time[i])
+                ball_ball_min[i] = ball_ball_time[i, ball_ball_arg[i]]
+
+        stale[:] = False
+
+        next_time, next_code, agent1, agent2 = get_next_event_fast(
+            transition_time,
+            transition_type,
+            ball_ball_time,
+            ball_ball_min,
+            ball_ball_arg,
+            linear_min,
+            linear_arg,
+            circular_min,
+            circular_arg,
+            pocket_min,
+            pocket_arg,
+            stale,
+        )
+
+        if next_time == np.inf:
+            ended = True
+            break
+
+        # Evolve all balls to the time of the event
+        dt = next_time - t_now
+        if dt > 0:
+            physics.evolve_balls_fast(rvw, s, R, m, u_s, u_sp, u_r, g, dt)
+            t[:] = t_now + dt
+        t_now = next_time
+
+        # Resolve the event, followed by any other events at (numerically) the same time
+        # that don't involve the balls of the events already resolved. These are all
+        # resolved at the time of the first event, and the balls are only rescheduled
+        # once the batch is resolved
+        while True:
+            if num_events == capacity:
+                capacity *= 2
+                log_time = grow_fast(log_time, capacity)
+                log_type = grow_fast(log_type, capacity)
+                log_agents = grow_fast(log_agents, capacity)
+                log_rvw_initial = grow_fast(log_rvw_initial, capacity)
+                log_s_initial = grow_fast(log_s_initial, capacity)
+                log_rvw_final = grow_fast(log_rvw_final, capacity)
+                log_s_final = grow_fast(log_s_final, capacity)
+
+            n = num_events
+            log_time[n] = t_now
+            log_type[n] = next_code
+            log_agents[n, 0], log_agents[n, 1] = agent1, agent2
+
+            # Resolve the event
+            if next_code == code_ball_ball:
+                log_rvw_initial[n, 0], log_s_initial[n, 0] = rvw[agent1], s[agent1]
+                log_rvw_initial[n, 1], log_s_initial[n, 1] = rvw[agent2], s[agent2]
+
+                if include[0]:
+                    physics.resolve_ball_ball_collision_fast(rvw[agent1], rvw[agent2])
+                    s[agent1], s[agent2] = c.sliding, c.sliding
+                    t[agent1], t[agent2] = t_now, t_now
+
+                log_rvw_final[n, 0], log_s_final[n, 0] = rvw[agent1], s[agent1]
+                log_rvw_final[n, 1], log_s_final[n, 1] = rvw[agent2], s[agent2]
+                stale[agent1], stale[agent2] = True, True
+
+            elif (
+                next_code == code_ball_linear_cushion
+                or next_code == code_ball_circular_cushion
+            ):
+                log_rvw_initial[n, 0], log_s_initial[n, 0] = rvw[agent1], s[agent1]
+
+                if include[1]:
+                    if next_code == code_ball_linear_cushion:
+                        normal = linear_normal[agent2]
+                        h = linear_height[agent2]
+                    else:
+                        normal = utils.unit_vector_fast(
+                            rvw[agent1, 0] - circular_center[agent2]
+                        )
+                        normal[2] = 0
+                        h = circular_height[agent2]
+
+                    rvw[agent1] = physics.resolve_ball_cushion_collision_fast(
+                        rvw[agent1],
+                        normal,
+                        R[agent1],
+                        m[agent1],
+                        h,
+                        e_c[agent1],
+                        f_c[agent1],
+                    )
+                    s[agent1] = c.sliding
+                    t[agent1] = t_now
+
+                log_rvw_final[n, 0], log_s_final[n, 0] = rvw[agent1], s[agent1]
+                stale[agent1] = True
+
+            elif next_code == code_ball_pocket:
+                log_rvw_initial[n, 0], log_s_initial[n, 0] = rvw[agent1], s[agent1]
+
+                if include[2]:
+                    # Ball is placed at the pocket center
+                    rvw[agent1] = 0
+                    rvw[agent1, 0, 0] = pocket_center[agent2, 0]
+                    rvw[agent1, 0, 1] = pocket_center[agent2, 1]
+                    rvw[agent1, 0, 2] = -pocket_depth[agent2]
+                    s[agent1] = c.pocketed
+
+                log_rvw_final[n, 0], log_s_final[n, 0] = rvw[agent1], s[agent1]
+                stale[agent1] = True
+
+            else:
+                if next_code == code_sliding_rolling:
+                    state_start, state_end = c.sliding, c.rolling
+                elif next_code == code_rolling_spinning:
+                    state_start, state_end = c.rolling, c.spinning
+                elif next_code == code_rolling_stationary:
+                    state_start, state_end = c.rolling, c.stationary
+                else:
+                    state_start, state_end = c.spinning, c.stationary
+
+                log_rvw_initial[n, 0], log_s_initial[n, 0] = rvw[agent1], state_start
+                s[agent1] = state_end
+                log_rvw_final[n, 0], log_s_final[n, 0] = rvw[agent1], state_end
+                stale[agent1] = True
+
+            num_events += 1
+
+            next_time, next_code, agent1, agent2 = get_next_event_fast(
+                transition_time,
+                transition_type,
+                ball_ball_time,
+                ball_ball_min,
+                ball_ball_arg,
+                linear_min,
+                linear_arg,
+                circular_min,
+                circular_arg,
+                pocket_min,
+                pocket_arg,
+                stale,
+            )
+
+            if not next_time <= t_now + c.tol:
+                break
+
+        if t_now >= t_final:
+            break
+
+    return (
+        num_events,
+        log_time,
+        log_type,
+        log_agents,
+        log_rvw_initial,
+        log_s_initial,
+        log_rvw_final,
+        log_s_final,
+        ended,
+    )
+
+
+@jit(nopython=True, cache=c.numba_cache)
+def replay_fast(
+    rvw_start,
+    s_start,
+    R,
+    m,
+    g,
+    u_s,
+    u_sp,
+    u_r,
+    time,
+    event_type,
+    agents,
+    rvw_final,
+    s_final,
+    t_start,
+    ended,
+):
+    """Reconstruct the state of every ball at every event of an EventLog
+
+    (just-in-time compiled)
+
+    Starting from the initial states, the balls are evolved from event to event exactly
+    as they were by `simulate_fast`, and the states of the agents are set to their
+    logged final states.
+
+    Returns
+    =======
+    output : (rvw, s)
+        rvw[i] and s[i] are the (N, 3, 3) states and N motion states of the balls after
+        the ith event, where the 0th event is the initializing NonEvent, and the last
+        is the final NonEvent if `ended`
+    """
+    num_events = len(time)
+    num_states = num_events + 1 + (1 if ended else 0)
+    N = len(s_start)
+
+    rvw_history = np.empty((num_states, N, 3, 3))
+    s_history = np.empty((num_states, N), dtype=np.int64)
+
+    rvw = rvw_start.copy()
+    s = s_start.copy()
+    t_now = t_start
+
+    rvw_history[0], s_history[0] = rvw, s
+
+    for n in range(num_events):
+        # Events resolved as a batch share the same time (see `simulate_fast`)
+        if time[n] > t_now:
+            physics.evolve_balls_fast(rvw, s, R, m, u_s, u_sp, u_r, g, time[n] - t_now)
+        t_now = time[n]
+
+        agent1, agent2 = agents[n, 0], agents[n, 1]
+        rvw[agent1], s[agent1] = rvw_final[n, 0], s_final[n, 0]
+        if event_type[n] == code_ball_ball:
+            rvw[agent2], s[agent2] = rvw_final[n, 1], s_final[n, 1]
+
+        rvw_history[n + 1], s_history[n + 1] = rvw, s
+
+    if ended:
+        rvw_history[-1], s_history[-1] = rvw, s
+
+    return rvw_history, s_history
@@ -1,5 +1,7 @@
 #! /usr/bin/env python
 
+import bisect
+import itertools
 from abc import ABC, abstractmethod
 
 import numpy as np
@@ -24,15 +26,123 @@ type_rolling_spinning = "rolling-spinning"
 type_sliding_rolling = "sliding-rolling"
 
 
+class EventStates(object):
+    def __init__(self, capacity=16):
+        """A buffer of the agent states of many events
+
+        Instead of each event holding its own arrays, events store the states of their
+        agents (see e.g. `Collision.agent1_state_initial`) in rows of a shared buffer,
+        normally the one of the SystemState of their balls, which is replaced at the
+        start of each simulation. The rows are preallocated, and the capacity doubles
+        when they are used up.
+
+        Parameters
+        ==========
+        capacity : int, 16
+            The initial number of states that fit in the buffer
+        """
+        self.n = 0
+        self.rvw = np.empty((capacity, 3, 3), dtype=np.float64)
+        self.s = np.empty(capacity, dtype=np.int8)
+
+    def reserve(self, capacity):
+        """Grow the buffer so that at least `capacity` states fit"""
+        if capacity <= len(self.s):
+            return
+
+        rvw = np.empty((capacity, 3, 3), dtype=np.float64)
+        s = np.empty(capacity, dtype=np.int8)
+        rvw[: self.n], s[: self.n] = self.rvw[: self.n], self.s[: self.n]
+        self.rvw, self.s = rvw, s
+
+    def allocate(self, rows):
+        """Reserve rows for the states of an event, and return the first row
+
+        The motion states of the rows are set to -1, which marks them as unset
+        """
+        if self.n + rows > len(self.s):
+            self.reserve(max(2 * len(self.s), self.n + rows))
+
+        row, self.n = self.n, self.n + rows
+        self.s[row : self.n] = -1
+        return row
+
+    def __len__(self):
+        return self.n
+
+
+def get_event_states(agents):
+    """Get the EventStates of the first agent that is packed in a SystemState"""
+    for agent in agents:
+        system_state = getattr(agent, "system_state", None)
+        if system_state is not None:
+            return system_state.event_states
+
+    return None
+
+
+def agent_state(row):
+    """An event attribute that stores an (rvw, s) agent state in an EventStates
+
+    The attribute is None until it is set. Setting it to None unsets it. Events with
+    fewer than `row + 1` states (see `Event.num_states`) have no such state, so the
+    attribute is always None
+    """
+
+    def getter(event):
+        if row >= event.num_states or event.states is None:
+            return None
+
+        if event.states.s[event.row + row] < 0:
+            return None
+
+        return event.states.rvw[event.row + row], int(event.states.s[event.row + row])
+
+    def setter(event, value):
+        if value is None and (row >= event.num_states or event.states is None):
+            return
+
+        if row >= event.num_states:
+            raise ConfigError(
+                f"{event.__class__.__name__} :: has only {event.num_states} agent "
+                f"states"
+            )
+
+        if event.states is None:
+            states = get_event_states(event.agents)
+            event.states = EventStates(event.num_states) if states is None else states
+            event.row = event.states.allocate(event.num_states)
+
+        if value is None:
+            event.states.s[event.row + row] = -1
+            return
+
+        rvw, s = value
+        event.states.rvw[event.row + row] = rvw
+        event.states.s[event.row + row] = s
+
+    return property(getter, setter)
+
+
 class Event(ABC):
+    __slots__ = ("time", "agents", "partial", "states", "row")
+
     event_type, event_class = None, None
 
+    # The number of agent states stored in `states`
+    num_states = 0
+
     def __init__(self, *agents, t=None):
         self.time = t
         self.agents = agents
 
         self.partial = True if not len(agents) else False
 
+        # The EventStates holding the agent states of this event, starting from `row`.
+        # These are set when the first agent state is set (see `agent_state`)
+        self.states = None
+        self.row = None
+
         if self.event_class is None:
             raise NotImplementedError(
                 "Child classes of Event must have a defined event_type"
@@ -66,18 +176,41 @@ class Event(ABC):
     def save(self, path):
         utils.save_pickle(self.as_dict(), path)
 
+    def copy(self, agents=None):
+        """Return a copy of this event, optionally with other agents
+
+        The copy refers to the same agent states as this event (see EventStates), which
+        are not changed once the event is resolved.
+
+        Parameters
+        ==========
+        agents : tuple, None
+            The agents of the copy. If None, the copy has the agents of this event
+        """
+        event = object.__new__(self.__class__)
+        for slot in Event.__slots__:
+            setattr(event, slot, getattr(self, slot))
+
+        if agents is not None:
+            event.agents = tuple(agents)
+
+        return event
+
 
 class Collision(Event):
+    __slots__ = ()
+
     event_class = class_collision
+    num_states = 4
+
+    agent1_state_initial = agent_state(0)
+    agent1_state_final = agent_state(1)
+    agent2_state_initial = agent_state(2)
+    agent2_state_final = agent_state(3)
 
     def __init__(self, body1, body2, t=None):
         Event.__init__(self, body1, body2, t=t)
 
-        self.agent1_state_initial = None
-        self.agent2_state_initial = None
-        self.agent1_state_final = None
-        self.agent2_state_final = None
-
     def as_dict(self):
         return dict(
             event_class=self.event_class,
@@ -92,6 +225,8 @@ class Collision(Event):
 
 
 class BallBallCollision(Collision):
+    __slots__ = ()
+
     event_type = type_ball_ball
 
     def __init__(self, ball1, ball2, t=None):
@@ -101,10 +236,10 @@ class BallBallCollision(Collision):
         self.is_partial()
         ball1, ball2 = self.agents
 
-        self.agent1_state_initial = (np.copy(ball1.rvw), ball1.s)
-        self.agent2_state_initial = (np.copy(ball2.rvw), ball2.s)
+        self.agent1_state_initial = (ball1.rvw, ball1.s)
+        self.agent2_state_initial = (ball2.rvw, ball2.s)
 
-        rvw1, rvw2 = physics.resolve_ball_ball_collision(ball1.rvw, ball2.rvw)
+        rvw1, rvw2 = physics.resolve_ball_ball_collision_fast(ball1.rvw, ball2.rvw)
         s1, s2 = c.sliding, c.sliding
 
         ball1.set(rvw1, s1, t=self.time)
@@ -113,8 +248,8 @@ class BallBallCollision(Collision):
         ball2.set(rvw2, s2, t=self.time)
         ball2.update_next_transition_event()
 
-        self.agent1_state_final = (np.copy(ball1.rvw), ball1.s)
-        self.agent2_state_final = (np.copy(ball2.rvw), ball2.s)
+        self.agent1_state_final = (ball1.rvw, ball1.s)
+        self.agent2_state_final = (ball2.rvw, ball2.s)
 
     def cut_angle(self):
         """Get the cut angle of a ball-ball collision
@@ -142,8 +277,13 @@ class BallBallCollision(Collision):
 
 
 class BallCushionCollision(Collision):
+    __slots__ = ()
+
     event_type = type_ball_cushion
 
+    # The cushion has no state, so agent2_state_* are always None
+    num_states = 2
+
     def __init__(self, ball, cushion, t=None):
         Collision.__init__(self, body1=ball, body2=cushion, t=t)
 
@@ -152,9 +292,9 @@ class BallCushionCollision(Collision):
         ball, cushion = self.agents
         normal = cushion.get_normal(ball.rvw)
 
-        self.agent1_state_initial = (np.copy(ball.rvw), ball.s)
+        self.agent1_state_initial = (ball.rvw, ball.s)
 
-        rvw = physics.resolve_ball_cushion_collision(
+        rvw = physics.resolve_ball_cushion_collision_fast(
             rvw=ball.rvw,
             normal=normal,
             R=ball.R,
@@ -168,12 +308,17 @@ class BallCushionCollision(Collision):
         ball.set(rvw, s, t=self.time)
         ball.update_next_transition_event()
 
-        self.agent1_state_final = (np.copy(ball.rvw), ball.s)
+        self.agent1_state_final = (ball.rvw, ball.s)
 
 
 class StickBallCollision(Collision):
+    __slots__ = ()
+
     event_type = type_stick_ball
 
+    # The state of the ball (the second agent) is stored as agent1_state_*
+    num_states = 2
+
     def __init__(self, cue_stick, ball, t=None):
         Collision.__init__(self, body1=cue_stick, body2=ball, t=t)
 
@@ -181,7 +326,7 @@ class StickBallCollision(Collision):
         self.is_partial()
         cue_stick, ball = self.agents
 
-        self.agent1_state_initial = (np.copy(ball.rvw), ball.s)
+        self.agent1_state_initial = (ball.rvw, ball.s)
 
         v, w = physics.cue_strike(
             ball.m,
@@ -204,12 +349,17 @@ class StickBallCollision(Collision):
         ball.set(rvw, s)
         ball.update_next_transition_event()
 
-        self.agent1_state_final = (np.copy(ball.rvw), ball.s)
+        self.agent1_state_final = (ball.rvw, ball.s)
 
 
 class BallPocketCollision(Collision):
+    __slots__ = ()
+
     event_type = type_ball_pocket
 
+    # The pocket has no state, so agent2_state_* are always None
+    num_states = 2
+
     def __init__(self, ball, pocket, t=None):
         Collision.__init__(self, body1=ball, body2=pocket, t=t)
 
@@ -217,7 +367,7 @@ class BallPocketCollision(Collision):
         self.is_partial()
         ball, pocket = self.agents
 
-        self.agent1_state_initial = (np.copy(ball.rvw), ball.s)
+        self.agent1_state_initial = (ball.rvw, ball.s)
 
         # Ball is placed at the pocket center
         rvw = np.array([[pocket.a, pocket.b, -pocket.depth], [0, 0, 0], [0, 0, 0]])
@@ -227,28 +377,34 @@ class BallPocketCollision(Collision):
 
         pocket.add(ball.id)
 
-        self.agent1_state_final = (np.copy(ball.rvw), ball.s)
+        self.agent1_state_final = (ball.rvw, ball.s)
 
 
 class Transition(Event):
+    __slots__ = ()
+
     event_class = class_transition
+    num_states = 2
+
+    # The motion states before and after the transition
+    state_start, state_end = None, None
+
+    agent_state_initial = agent_state(0)
+    agent_state_final = agent_state(1)
 
     def __init__(self, ball, t=None):
         Event.__init__(self, ball, t=t)
 
-        self.agent_state_initial = None
-        self.agent_state_final = None
-
     def resolve(self):
         ball = self.agents[0]
 
         self.is_partial()
-        self.agent_state_initial = (np.copy(ball.rvw), self.state_start)
+        self.agent_state_initial = (ball.rvw, self.state_start)
 
         ball.s = self.state_end
         ball.update_next_transition_event()
 
-        self.agent_state_final = (np.copy(ball.rvw), self.state_end)
+        self.agent_state_final = (ball.rvw, self.state_end)
 
     def as_dict(self):
         return dict(
@@ -262,38 +418,36 @@ class Transition(Event):
 
 
 class SpinningStationaryTransition(Transition):
-    event_type = type_spinning_stationary
+    __slots__ = ()
 
-    def __init__(self, ball, t=None):
-        Transition.__init__(self, ball, t=t)
-        self.state_start, self.state_end = c.spinning, c.stationary
+    event_type = type_spinning_stationary
+    state_start, state_end = c.spinning, c.stationary
 
 
 class RollingStationaryTransition(Transition):
-    event_type = type_rolling_stationary
+    __slots__ = ()
 
-    def __init__(self, ball, t=None):
-        Transition.__init__(self, ball, t=t)
-        self.state_start, self.state_end = c.rolling, c.stationary
+    event_type = type_rolling_stationary
+    state_start, state_end = c.rolling, c.stationary
 
 
 class RollingSpinningTransition(Transition):
-    event_type = type_rolling_spinning
+    __slots__ = ()
 
-    def __init__(self, ball, t=None):
-        Transition.__init__(self, ball, t=t)
-        self.state_start, self.state_end = c.rolling, c.spinning
+    event_type = type_rolling_spinning
+    state_start, state_end = c.rolling, c.spinning
 
 
 class SlidingRollingTransition(Transition):
-    event_type = type_sliding_rolling
+    __slots__ = ()
 
-    def __init__(self, ball, t=None):
-        Transition.__init__(self, ball, t=t)
-        self.state_start, self.state_end = c.sliding, c.rolling
+    event_type = type_sliding_rolling
+    state_start, state_end = c.sliding, c.rolling
 
 
 class NonEvent(Event):
+    __slots__ = ()
+
     event_type = type_none
     event_class = class_none
 
@@ -313,8 +467,128 @@ class NonEvent(Event):
         )
 
 
+def get_agent_keys(event):
+    """The keys of the agents of an event in the agent index of Events"""
+    return [(agent.object_type, agent.id) for agent in event.agents]
+
+
+def as_type_list(types):
+    """Turn an event type or collection of event types into a list"""
+    if isinstance(types, str):
+        return [types]
+
+    return list(types)
+
+
+def as_ball_list(balls):
+    """Turn a ball or collection of balls into a list"""
+    try:
+        return list(balls)
+    except TypeError:
+        return [balls]
+
+
 class Events(utils.ListLike):
-    """Stores Event objects"""
+    """Stores Event objects
+
+    Events are indexed by type and by agent as they are appended, so filtering by type
+    (see `filter_type`) or by ball (see `filter_ball`) takes time proportional to the
+    number of matching events rather than the number of events. Filters return
+    EventsView objects, which refer to the events of this object instead of copying
+    them.
+
+    Notes
+    =====
+    - The agents of an event should not be changed after it is appended
+    - Appending is cheap. Any other modification (insert, delete, or replace) copies
+      the event list and rebuilds the indices, so that existing views are unaffected
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._list = []
+
+        # {event_type: positions} and {(agent object_type, agent id): positions}, where
+        # positions is the increasing list of the positions of the matching events
+        self._type_index = {}
+        self._agent_index = {}
+
+    def index_event(self, position, event):
+        self._type_index.setdefault(event.event_type, []).append(position)
+        for key in get_agent_keys(event):
+            self._agent_index.setdefault(key, []).append(position)
+
+    def reindex(self, events):
+        """Replace the events, and rebuild the indices"""
+        self.reset()
+        for event in events:
+            self.append(event)
+
+    def append(self, event):
+        self.index_event(len(self._list), event)
+        self._list.append(event)
+
+    def insert(self, index, event):
+        if index >= len(self._list):
+            self.append(event)
+            return
+
+        events = list(self._list)
+        events.insert(index, event)
+        self.reindex(events)
+
+    def __setitem__(self, index, event):
+        events = list(self._list)
+        events[index] = event
+        self.reindex(events)
+
+    def __delitem__(self, index):
+        events = list(self._list)
+        del events[index]
+        self.reindex(events)
+
+    def __iter__(self):
+        return iter(self._list)
+
+    def truncate(self, n):
+        """Keep only the first n events
+
+        The event list is replaced rather than modified, so existing views are
+        unaffected.
+        """
+        self._list = self._list[:n]
+        self._type_index = truncate_index(self._type_index, n)
+        self._agent_index = truncate_index(self._agent_index, n)
+
+    def copy(self, copy_event=None, n=None):
+        """Return a copy of this object
+
+        Parameters
+        ==========
+        copy_event : callable, None
+            If None, the copy shares the Event objects of this object. Otherwise, each
+            event is replaced by copy_event(event), which must return an event of the
+            same type with agents of the same ids (e.g. see `Event.copy`)
+        n : int, None
+            If not None, only the first n events are copied
+        """
+        events = self._list if n is None else self._list[:n]
+        n = len(events)
+
+        copied = Events()
+        copied._list = (
+            list(events)
+            if copy_event is None
+            else [copy_event(event) for event in events]
+        )
+        copied._type_index = truncate_index(self._type_index, n)
+        copied._agent_index = truncate_index(self._agent_index, n)
+        return copied
+
+    def view(self, positions):
+        return EventsView(self._list, positions)
 
     def filter_type(self, types):
         """Return events in chronological order that are of an event type or types
@@ -327,21 +601,11 @@ class Events(utils.ListLike):
 
         Returns
         =======
-        events : pooltool.events.Events
-            A subset Events object containing events only of specified types
+        events : pooltool.events.EventsView
+            A view of the events of specified types
         """
-
-        try:
-            iter(types)
-        except TypeError:
-            types = [types]
-
-        events = Events()
-        for event in self._list:
-            if event.event_type in types:
-                events.append(event)
-
-        return events
+        indices = [self._type_index.get(t, []) for t in set(as_type_list(types))]
+        return self.view(merge_positions(indices))
 
     def filter_ball(self, balls, keep_nonevent=False):
         """Return events in chronological order that involve a collection of balls
@@ -349,30 +613,21 @@ class Events(utils.ListLike):
         Parameters
         ==========
         balls : pooltool.objects.ball.Ball or list of pooltool.objects.ball.Ball
-            Balls that you want events for.
+            Balls that you want events for. Events are matched by ball id
+        keep_nonevent : bool, False
+            If True, NonEvents are kept too
 
         Returns
         =======
-        events : pooltool.events.Events
-            A subset Events object containing events only with specified balls
+        events : pooltool.events.EventsView
+            A view of the events involving the specified balls
         """
+        keys = set(("ball", ball.id) for ball in as_ball_list(balls))
+        indices = [self._agent_index.get(key, []) for key in keys]
+        if keep_nonevent:
+            indices.append(self._type_index.get(type_none, []))
 
-        try:
-            iter(balls)
-        except TypeError:
-            balls = [balls]
-
-        events = Events()
-        for event in self._list:
-            if keep_nonevent and event.event_type == type_none:
-                events.append(event)
-            else:
-                for ball in balls:
-                    if ball in event.agents:
-                        events.append(event)
-                        break
-
-        return events
+        return self.view(merge_positions(indices))
 
     def filter_time(self, t):
         """Return events in chronological order after a certain time
@@ -384,31 +639,115 @@ class Events(utils.ListLike):
 
         Returns
         =======
-        events : pooltool.events.Events
-            A subset Events object containing events only after specified time
+        events : pooltool.events.EventsView
+            A view of the events after the specified time
         """
+        start = len(self)
+        while start > 0 and self[start - 1].time > t:
+            start -= 1
 
-        events = Events()
-        for event in reversed(self._list):
-            if event.time > t:
-                events.append(event)
-            else:
-                break
-
-        events._list = events._list[::-1]
-        return events
-
-    def reset(self):
-        self._list = []
+        return self.view(range(start, len(self)))
 
     def as_dict(self):
-        return [event.as_dict() for event in self._list]
+        return [event.as_dict() for event in self]
 
     def __repr__(self):
-        return "\n".join(
-            [f"{i}: {event.__repr__()}" for i, event in enumerate(self._list)]
+        return "\n".join([f"{i}: {event.__repr__()}" for i, event in enumerate(self)])
+
+
+def truncate_index(index, n):
+    """Return a copy of an index of Events with only the positions less than n"""
+    truncated = {}
+    for key, positions in index.items():
+        positions = positions[: bisect.bisect_left(positions, n)]
+        if len(positions):
+            truncated[key] = positions
+
+    return truncated
+
+
+def merge_positions(indices):
+    """Merge increasing lists of positions into one, without duplicates"""
+    if len(indices) == 1:
+        return list(indices[0])
+
+    return sorted(set(itertools.chain.from_iterable(indices)))
+
+
+class EventsView(Events):
+    def __init__(self, events, positions):
+        """A read-only selection of events, as returned by the filters of Events
+
+        The selected events are gathered into a list once, when the view is created, so
+        accessing them costs the same as for Events. Filters of a view scan the events
+        of the view.
+
+        Parameters
+        ==========
+        events : list
+            The list of events that the view refers to
+        positions : list
+            The increasing positions in `events` of the selected events
+        """
+        self._events = events
+        self._positions = positions
+        self._list = [events[position] for position in positions]
+
+    def view(self, positions):
+        return EventsView(self._events, positions)
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.view(self._positions[index])
+
+        return self._list[index]
+
+    def __iter__(self):
+        return iter(self._list)
+
+    def filter_type(self, types):
+        types = set(as_type_list(types))
+        return self.view(
+            [
+                p
+                for p, event in zip(self._positions, self._list)
+                if event.event_type in types
+            ]
         )
 
+    def filter_ball(self, balls, keep_nonevent=False):
+        keys = set(("ball", ball.id) for ball in as_ball_list(balls))
+        return self.view(
+            [
+                p
+                for p, event in zip(self._positions, self._list)
+                if (keep_nonevent and event.event_type == type_none)
+                or not keys.isdisjoint(get_agent_keys(event))
+            ]
+        )
+
+    def filter_time(self, t):
+        start = len(self)
+        while start > 0 and self[start - 1].time > t:
+            start -= 1
+
+        return self.view(self._positions[start:])
+
+    def copy(self, copy_event=None):
+        events = Events()
+        events.reindex(self if copy_event is None else map(copy_event, self))
+        return events
+
+    def read_only(self, *args, **kwargs):
+        raise TypeError(
+            "EventsView is read-only. Use EventsView.copy for a modifiable copy"
+        )
+
+    reset = append = insert = truncate = __setitem__ = __delitem__ = read_only
+
 
 def get_subclasses(cls):
     """Built upon https://stackoverflow.com/a/3862957"""
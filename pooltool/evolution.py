@@ -1,10 +1,13 @@
 #! /usr/bin/env python
 
+import heapq
+import itertools
 from abc import ABC, abstractmethod
 
 import numpy as np
 
 import pooltool.constants as c
+import pooltool.engine as engine
 import pooltool.physics as physics
 import pooltool.terminal as terminal
 import pooltool.utils as utils
@@ -13,11 +16,16 @@ from pooltool.events import (
     BallCushionCollision,
     BallPocketCollision,
     NonEvent,
+    class_transition,
     type_ball_ball,
     type_ball_cushion,
     type_ball_pocket,
 )
-from pooltool.objects import DummyBall, NonObject
+
+# Event types of the event queue that have no equivalent in pooltool.events. Both are
+# resolved as type_ball_cushion events
+type_ball_linear_cushion = "ball-linear-cushion"
+type_ball_circular_cushion = "ball-circular-cushion"
 
 
 class EvolveShot(ABC):
@@ -45,8 +53,19 @@ class EvolveShot(ABC):
             A name for the simulated shot
         """
 
+        self.ensure_packed()
         self.reset_history()
         self.init_history()
+        self.resume(name=name, quiet=quiet, **kwargs)
+
+    def resume(self, name="NA", quiet=False, **kwargs):
+        """Continue a simulation from the current state of the system
+
+        Unlike `simulate`, the existing events and histories are kept, and new ones are
+        added after them. This is used to resume a simulation from a checkpoint (see
+        SystemHistory.restore). Parameters are the same as for `simulate`.
+        """
+        self.ensure_packed()
 
         if not quiet:
 
@@ -70,47 +89,150 @@ class EvolveShot(ABC):
             self.run.info("Finished after", self.progress.t.time_elapsed_precise())
 
     def evolve(self, dt):
-        """Evolves current ball an amount of time dt
+        """Evolves all balls an amount of time dt
 
-        FIXME This is very inefficent. each ball should store its natural trajectory
-        thereby avoid a call to the clunky evolve_ball_motion. It could even be a
-        partial function so parameters don't continuously need to be passed
+        The states of all balls are advanced in place with a single call (see
+        `physics.evolve_balls_fast`), which operates on the packed arrays of self.state
         """
-
-        for ball_id, ball in self.balls.items():
-            rvw, s = physics.evolve_ball_motion(
-                state=ball.s,
-                rvw=ball.rvw,
-                R=ball.R,
-                m=ball.m,
-                u_s=ball.u_s,
-                u_sp=ball.u_sp,
-                u_r=ball.u_r,
-                g=ball.g,
-                t=dt,
-            )
-            ball.set(rvw, s=s, t=(self.t + dt))
+        state = self.state
+        physics.evolve_balls_fast(
+            rvw=state.rvw,
+            s=state.s,
+            R=state.R,
+            m=state.m,
+            u_s=state.u_s,
+            u_sp=state.u_sp,
+            u_r=state.u_r,
+            g=state.g,
+            t=dt,
+        )
+        state.t[:] = self.t + dt
 
     @abstractmethod
     def evolution_algorithm(self):
         pass
 
 
+# When scheduled events are tied in time, they are popped from the event queue in this
+# order
+queue_priority = {
+    class_transition: 0,
+    type_ball_ball: 1,
+    type_ball_linear_cushion: 2,
+    type_ball_circular_cushion: 3,
+    type_ball_pocket: 4,
+}
+
+
+# Methods for selecting candidate ball pairs for ball-ball collisions
+broad_phases = ("sweep", None)
+
+# Collision detection passes each candidate through tiers of increasingly expensive
+# tests, and drops it as soon as one rules out a collision before the next transition of
+# its balls (see `get_detection_counts`). These are the rows and columns (after the
+# number of candidates) of the detection counts
+detection_types = (
+    type_ball_ball,
+    type_ball_linear_cushion,
+    type_ball_circular_cushion,
+    type_ball_pocket,
+)
+detection_tiers = ("reach", "interval", "roots")
+
+# Implementations of the event-based evolution algorithm
+engines = ("python", "compiled")
+
+# Which ball states are recorded in the ball histories (see
+# `EvolveShotEventBased.evolution_algorithm`)
+history_modes = ("all", "agents")
+
+
 class EvolveShotEventBased(EvolveShot):
     def __init__(self, *args, **kwargs):
         EvolveShot.__init__(self, *args, **kwargs)
+        self.broad_phase = "sweep"
+        self.reset_event_queue()
+        self.reset_detection_counts()
+
+    def evolution_algorithm(
+        self,
+        t_final=None,
+        continuize=False,
+        dt=None,
+        broad_phase="sweep",
+        engine="python",
+        history=None,
+    ):
+        """The event-based evolution algorithm
 
-    def evolution_algorithm(self, t_final=None, continuize=False, dt=None):
-        """The event-based evolution algorithm"""
+        Parameters
+        ==========
+        broad_phase : str or None, 'sweep'
+            How to select the ball pairs whose collision times are calculated. If
+            'sweep', only pairs whose bounding boxes overlap are considered, where each
+            box encloses a ball's trajectory until its next transition (see
+            `get_ball_ball_candidates`), and candidates that can't collide before the
+            next transition of their balls are skipped before their collision times
+            are calculated (see `get_detection_counts`). If None, every pair and every
+            piece of table geometry is considered
+        engine : str, 'python'
+            If 'python', events are scheduled, created, and resolved one at a time by
+            the methods of this class. If 'compiled', the whole algorithm runs in a
+            single compiled function (see `evolution_algorithm_compiled`). broad_phase
+            has no effect on the compiled engine
+        history : str, None
+            If 'all', the state of every ball is recorded in its history after each
+            event. If 'agents', only the states of the balls that are agents of an event
+            are recorded, along with the initial and final states of every ball. This
+            stores O(events) instead of O(events * N) states, and the state of any ball
+            at any time can still be found from its own last event (see
+            `SystemHistory.set_from_history` and `Ball.state_at`). If None,
+            self.history_mode is kept, which is 'all' unless a resumed simulation
+            recorded its earlier events otherwise
+        """
 
         if dt is None:
             dt = 0.01
 
+        if broad_phase not in broad_phases:
+            raise ValueError(
+                f"'{broad_phase}' is not a valid broad phase. Please choose from: "
+                f"{broad_phases}"
+            )
+
+        if engine not in engines:
+            raise ValueError(
+                f"'{engine}' is not a valid engine. Please choose from: {engines}"
+            )
+
+        if history is None:
+            history = self.history_mode
+
+        if history not in history_modes:
+            raise ValueError(
+                f"'{history}' is not a valid history mode. Please choose from: "
+                f"{history_modes}"
+            )
+
+        self.history_mode = history
+        self.reset_detection_counts()
+
+        if engine == "compiled":
+            self.evolution_algorithm_compiled(t_final=t_final)
+            if continuize:
+                self.continuize(dt=dt)
+            return
+
+        self.broad_phase = broad_phase
+
         # Balls may already have energy. Therefore, it is critical to establish their
         # next transition events.
         for ball in self.balls.values():
             ball.update_next_transition_event()
 
+        # No events have been scheduled yet, so every ball needs scheduling
+        self.reset_event_queue()
+
         while True:
             event = self.get_next_event()
 
@@ -118,14 +240,24 @@ class EvolveShotEventBased(EvolveShot):
                 self.end_history()
                 break
 
-            self.evolve(event.time - self.t)
-            if self.include.get(event.event_type, True):
-                event.resolve()
+            if event.time > self.t:
+                self.evolve(event.time - self.t)
 
-            self.update_history(event, update_all=True)
+            # Resolve the event, followed by any other events at (numerically) the same
+            # time that don't involve the balls of the events already resolved. These
+            # are all resolved at the time of the first event, and the balls are only
+            # rescheduled once the batch is resolved (see `get_simultaneous_event`)
+            while event is not None:
+                if self.include.get(event.event_type, True):
+                    event.resolve()
 
-            if (len(self.events) % 30) == 0:
-                self.progress_update()
+                self.update_history(event, update_all=(history == "all"))
+                self.invalidate_agents(event)
+
+                if (len(self.events) % 30) == 0:
+                    self.progress_update()
+
+                event = self.get_simultaneous_event()
 
             if t_final is not None and self.t >= t_final:
                 break
@@ -133,198 +265,493 @@ class EvolveShotEventBased(EvolveShot):
         if continuize:
             self.continuize(dt=dt)
 
-    def get_next_event(self):
-        # Start by assuming next event doesn't happen
-        event = NonEvent(t=np.inf)
+    def evolution_algorithm_compiled(self, t_final=None):
+        """The event-based evolution algorithm, ran by pooltool.engine
 
-        transition_event = self.get_min_transition_event_time()
-        if transition_event.time < event.time:
-            event = transition_event
+        No events are created during the simulation. Instead, the compact EventLog
+        returned by `engine.simulate` is stored as self.event_log, and the events and
+        ball histories are built from it the first time they are accessed (see
+        `SystemState.materialize`).
+        """
+        self.attach_event_log(engine.simulate(self, t_final=t_final))
 
-        ball_ball_event = self.get_min_ball_ball_event_time()
-        if ball_ball_event.time < event.time:
-            event = ball_ball_event
+    def attach_event_log(self, log):
+        """Make an EventLog the record of the last simulation of this system
 
-        ball_linear_cushion_event = self.get_min_ball_linear_cushion_event_time()
-        if ball_linear_cushion_event.time < event.time:
-            event = ball_linear_cushion_event
+        The balls should already be in their final states. The events and ball
+        histories are built from the log the first time they are accessed.
+        """
+        self.event_log = log
+        self.t = float(log.time[-1]) if len(log) else log.t_start
 
-        ball_circular_cushion_event = self.get_min_ball_circular_cushion_event_time()
-        if ball_circular_cushion_event.time < event.time:
-            event = ball_circular_cushion_event
+        for ball in self.balls.values():
+            ball.update_next_transition_event()
 
-        ball_pocket_event = self.get_min_ball_pocket_event_time()
-        if ball_pocket_event.time < event.time:
-            event = ball_pocket_event
+        self.state.materializer = lambda: engine.materialize(self, log)
 
-        return event
+    def reset_event_queue(self):
+        """Empty the event queue
 
-    def get_min_transition_event_time(self):
-        """Returns minimum time until next ball transition event"""
+        The event queue is a heap of scheduled events ordered by absolute time. Each
+        scheduled event is stamped with the versions of its ball agents at the time it
+        was scheduled. Since an event only alters the trajectories of its agents, a
+        scheduled event remains valid until one of its agents takes part in an event,
+        at which point the version of that agent is incremented and all events
+        scheduled with the old version become stale. Stale events are discarded when
+        they reach the top of the queue (see `get_next_event`).
+        """
+        self.event_queue = []
+        self.queue_counter = itertools.count()
+        self.ball_order = {}
+        self.ball_versions = {}
+
+        # The swept bounding box and reachable disc of each ball, in the order of
+        # self.ball_order (see `update_ball_bounds`)
+        self.ball_bounds = np.empty((0, 4), dtype=np.float64)
+        self.ball_discs = np.empty((0, 3), dtype=np.float64)
+
+        # Events involving these ball ids must be rescheduled. `None` means all balls
+        # must be rescheduled
+        self.stale_ball_ids = None
+
+    def reset_detection_counts(self):
+        """Zero the detection counts (see `get_detection_counts`)"""
+        self.detection_counts = np.zeros(
+            (len(detection_types), 1 + len(detection_tiers)), dtype=np.int64
+        )
 
-        event = NonEvent(t=np.inf)
+    def get_detection_counts(self):
+        """Get how many collision candidates each detection tier rejected
+
+        Each time a ball becomes stale, its possible collisions are candidates. Ball
+        pairs are candidates if their swept bounding boxes overlap (see
+        `get_ball_ball_candidates`) and at least one of the balls is translating, and
+        every piece of table geometry is a candidate for each translating ball. The
+        tiers are applied in this order, and each is only applied to the candidates
+        that the previous tiers didn't reject:
+
+            reach : The balls can't reach each other, or the ball can't reach the
+                geometry, before the next transition (see `update_ball_bounds`)
+            interval : The collision polynomial provably has no roots before the next
+                transition (see `utils.has_root_in_interval_fast`)
+            roots : The collision polynomial was solved, and has no root before the
+                next transition
+
+        The counts are from the last simulation of either engine. With the 'python'
+        engine, no tier is applied if broad_phase is None.
+
+        Returns
+        =======
+        counts : dict
+            For each detection type, a dictionary with the number of 'candidates' and
+            the number rejected by each tier. The remaining candidates are predicted
+            collisions
+        """
+        return {
+            event_type: dict(
+                zip(("candidates",) + detection_tiers, map(int, type_counts))
+            )
+            for event_type, type_counts in zip(detection_types, self.detection_counts)
+        }
 
-        for ball in self.balls.values():
-            if ball.next_transition_event.time <= event.time:
-                event = ball.next_transition_event
+    def invalidate_agents(self, event):
+        """Mark scheduled events involving the ball agents of an event as stale"""
+        if self.stale_ball_ids is None:
+            return
 
-        return event
+        for agent in event.agents:
+            if agent.object_type == "ball":
+                self.stale_ball_ids.add(agent.id)
 
-    def get_min_ball_ball_event_time(self):
-        """Returns minimum time until next ball-ball collision"""
-        dtau_E = np.inf
-        ball_ids = []
-        collision_coeffs = []
+    def schedule(self, t, event_type, agent_ids):
+        """Push an event onto the event queue
 
-        for i, ball1 in enumerate(self.balls.values()):
-            for j, ball2 in enumerate(self.balls.values()):
-                if i >= j:
-                    continue
+        Parameters
+        ==========
+        t : float
+            The absolute time of the event. Events that never happen (np.inf) are not
+            scheduled.
+        event_type : str
+            A key of `queue_priority`
+        agent_ids : tuple
+            The ids of the agents. The first one or two are ball ids (two for ball-ball
+            collisions), and the last is the cushion or pocket id when applicable
+        """
+        if t == np.inf:
+            return
 
-                if ball1.s == c.pocketed or ball2.s == c.pocketed:
-                    continue
+        num_balls = 2 if event_type == type_ball_ball else 1
+        stamps = tuple(self.ball_versions[ball_id] for ball_id in agent_ids[:num_balls])
 
-                if ball1.s in c.nontranslating and ball2.s in c.nontranslating:
-                    continue
+        if event_type == class_transition:
+            # Simultaneous transitions are resolved starting from the last ball
+            tiebreak = -self.ball_order[agent_ids[0]]
+        else:
+            tiebreak = next(self.queue_counter)
+
+        heapq.heappush(
+            self.event_queue,
+            (
+                t,
+                queue_priority[event_type],
+                tiebreak,
+                event_type,
+                agent_ids,
+                stamps,
+            ),
+        )
 
-                collision_coeffs.append(
-                    physics.get_ball_ball_collision_coeffs_fast(
-                        rvw1=ball1.rvw,
-                        rvw2=ball2.rvw,
-                        s1=ball1.s,
-                        s2=ball2.s,
-                        mu1=(ball1.u_s if ball1.s == c.sliding else ball1.u_r),
-                        mu2=(ball2.u_s if ball2.s == c.sliding else ball2.u_r),
-                        m1=ball1.m,
-                        m2=ball2.m,
-                        g1=ball1.g,
-                        g2=ball2.g,
-                        R=ball1.R,
-                    )
-                )
+    def is_stale(self, agent_ids, stamps):
+        """Whether any ball agent of a scheduled event has changed since scheduling"""
+        for ball_id, stamp in zip(agent_ids, stamps):
+            if self.ball_versions[ball_id] != stamp:
+                return True
+
+        return False
+
+    def update_event_queue(self):
+        """Schedule the events of all balls marked as stale"""
+        if self.stale_ball_ids is None:
+            self.ball_order = {ball_id: i for i, ball_id in enumerate(self.balls)}
+            self.ball_bounds = np.empty((len(self.balls), 4), dtype=np.float64)
+            self.ball_discs = np.empty((len(self.balls), 3), dtype=np.float64)
+            stale_ball_ids = set(self.balls.keys())
+        else:
+            stale_ball_ids = self.stale_ball_ids
 
-                ball_ids.append((ball1.id, ball2.id))
+        if len(stale_ball_ids):
+            for ball_id in stale_ball_ids:
+                self.ball_versions[ball_id] = self.ball_versions.get(ball_id, -1) + 1
 
-        if not len(collision_coeffs):
-            # There are no collisions to test for
-            return BallBallCollision(DummyBall(), DummyBall(), t=(self.t + dtau_E))
+            if self.broad_phase is not None:
+                self.update_ball_bounds(stale_ball_ids)
 
-        dtau_E, index = utils.min_real_root(p=np.array(collision_coeffs), tol=c.tol)
+            self.schedule_transitions(stale_ball_ids)
+            self.schedule_ball_ball_collisions(stale_ball_ids)
+            self.schedule_ball_table_collisions(stale_ball_ids)
 
-        ball1_id, ball2_id = ball_ids[index]
-        ball1, ball2 = self.balls[ball1_id], self.balls[ball2_id]
+        self.stale_ball_ids = set()
 
-        return BallBallCollision(ball1, ball2, t=(self.t + dtau_E))
+    def schedule_transitions(self, stale_ball_ids):
+        for ball_id in stale_ball_ids:
+            self.schedule(
+                self.balls[ball_id].next_transition_event.time,
+                class_transition,
+                (ball_id,),
+            )
 
-    def get_min_ball_circular_cushion_event_time(self):
-        dtau_E = np.inf
-        agent_ids = []
-        collision_coeffs = []
+    def update_ball_bounds(self, stale_ball_ids):
+        """Update the swept bounding boxes and reachable discs of the stale balls
 
-        for ball in self.balls.values():
-            if ball.s in c.nontranslating:
+        Both enclose a ball's trajectory from now until its next transition, after
+        which all of its scheduled events become stale anyway. Like the box (see
+        `physics.get_ball_swept_bounds_fast`), the disc (x, y, radius) is padded by the
+        ball radius, i.e. its radius is R plus the distance the ball's center can
+        travel (see `physics.get_ball_reach_fast`). Since they remain valid until their
+        ball becomes stale, only those of stale balls are recalculated.
+        """
+        for stale_id in stale_ball_ids:
+            ball = self.balls[stale_id]
+            i = self.ball_order[stale_id]
+            mu = ball.u_s if ball.s == c.sliding else ball.u_r
+            t = ball.next_transition_event.time - self.t
+
+            self.ball_bounds[i] = physics.get_ball_swept_bounds_fast(
+                rvw=ball.rvw, s=ball.s, mu=mu, g=ball.g, R=ball.R, t=t
+            )
+            self.ball_discs[i, :2] = ball.rvw[0, :2]
+            self.ball_discs[i, 2] = ball.R + physics.get_ball_reach_fast(
+                rvw=ball.rvw, s=ball.s, mu=mu, g=ball.g, t=t
+            )
+
+    def get_ball_ball_candidates(self, stale_ball_ids):
+        """Get the ball pairs whose collision times must be calculated
+
+        A pair is a candidate if at least one of its balls is stale. Pairs are ordered
+        the same way the balls are stored, i.e. (ball1.id, ball2.id) where ball1
+        precedes ball2 in self.balls.
+
+        If `self.broad_phase` is 'sweep', candidates are further restricted to pairs
+        whose swept bounding boxes overlap (see `update_ball_bounds`). When all balls
+        are stale, the overlapping pairs are found with sweep and prune (see
+        `utils.sweep_and_prune_fast`), and otherwise the boxes of the stale balls are
+        compared against all others.
+
+        Returns
+        =======
+        pairs : set
+            A set of (ball1.id, ball2.id) tuples
+        """
+        ball_ids = list(self.balls.keys())
+        ball_index = self.ball_order
+
+        if self.broad_phase is None:
+            pairs = set()
+            for stale_id in stale_ball_ids:
+                i = ball_index[stale_id]
+                for j, other_id in enumerate(ball_ids):
+                    if i < j:
+                        pairs.add((stale_id, other_id))
+                    elif i > j:
+                        pairs.add((other_id, stale_id))
+
+            return pairs
+
+        bounds = self.ball_bounds
+
+        if len(stale_ball_ids) == len(ball_ids):
+            return {
+                (ball_ids[i], ball_ids[j])
+                for i, j in utils.sweep_and_prune_fast(bounds)
+            }
+
+        stale_index = np.array([ball_index[ball_id] for ball_id in stale_ball_ids])
+        stale_bounds = bounds[stale_index, None, :]
+        overlaps = (
+            (stale_bounds[..., 0] <= bounds[:, 1])
+            & (bounds[:, 0] <= stale_bounds[..., 1])
+            & (stale_bounds[..., 2] <= bounds[:, 3])
+            & (bounds[:, 2] <= stale_bounds[..., 3])
+        )
+
+        pairs = set()
+        for i, j in zip(*np.nonzero(overlaps)):
+            i = stale_index[i]
+            if i < j:
+                pairs.add((ball_ids[i], ball_ids[j]))
+            elif i > j:
+                pairs.add((ball_ids[j], ball_ids[i]))
+
+        return pairs
+
+    def schedule_ball_ball_collisions(self, stale_ball_ids):
+        """Schedule the collisions of the candidate ball pairs
+
+        If `self.broad_phase` is 'sweep', candidates are rejected as early as possible
+        (see `get_detection_counts`).
+        """
+        ball_index = self.ball_order
+        pairs = self.get_ball_ball_candidates(stale_ball_ids)
+
+        candidates = []
+        for ball1_id, ball2_id in sorted(
+            pairs, key=lambda pair: (ball_index[pair[0]], ball_index[pair[1]])
+        ):
+            ball1, ball2 = self.balls[ball1_id], self.balls[ball2_id]
+
+            if ball1.s == c.pocketed or ball2.s == c.pocketed:
                 continue
 
-            for cushion in self.table.cushion_segments["circular"].values():
-                collision_coeffs.append(
-                    physics.get_ball_circular_cushion_collision_coeffs_fast(
-                        rvw=ball.rvw,
-                        s=ball.s,
-                        a=cushion.a,
-                        b=cushion.b,
-                        r=cushion.radius,
-                        mu=(ball.u_s if ball.s == c.sliding else ball.u_r),
-                        m=ball.m,
-                        g=ball.g,
-                        R=ball.R,
-                    )
+            if ball1.s in c.nontranslating and ball2.s in c.nontranslating:
+                continue
+
+            candidates.append((ball1_id, ball2_id))
+
+        counts = self.detection_counts[detection_types.index(type_ball_ball)]
+        counts[0] += len(candidates)
+
+        if self.broad_phase is not None and len(candidates):
+            # Reject the pairs whose reachable discs don't overlap
+            index = np.array(
+                [(ball_index[id1], ball_index[id2]) for id1, id2 in candidates]
+            )
+            disc1, disc2 = self.ball_discs[index[:, 0]], self.ball_discs[index[:, 1]]
+            reachable = np.hypot(
+                disc1[:, 0] - disc2[:, 0], disc1[:, 1] - disc2[:, 1]
+            ) <= (disc1[:, 2] + disc2[:, 2])
+
+            counts[1] += np.sum(~reachable)
+            candidates = [pair for pair, keep in zip(candidates, reachable) if keep]
+
+        horizons = []
+        collision_coeffs = []
+
+        for ball1_id, ball2_id in candidates:
+            ball1, ball2 = self.balls[ball1_id], self.balls[ball2_id]
+
+            horizons.append(
+                np.inf
+                if self.broad_phase is None
+                else min(
+                    ball1.next_transition_event.time, ball2.next_transition_event.time
                 )
+                - self.t
+            )
 
-                agent_ids.append((ball.id, cushion.id))
+            collision_coeffs.append(
+                physics.get_ball_ball_collision_coeffs_fast(
+                    rvw1=ball1.rvw,
+                    rvw2=ball2.rvw,
+                    s1=ball1.s,
+                    s2=ball2.s,
+                    mu1=(ball1.u_s if ball1.s == c.sliding else ball1.u_r),
+                    mu2=(ball2.u_s if ball2.s == c.sliding else ball2.u_r),
+                    m1=ball1.m,
+                    m2=ball2.m,
+                    g1=ball1.g,
+                    g2=ball2.g,
+                    R=ball1.R,
+                )
+            )
 
         if not len(collision_coeffs):
-            # There are no collisions to test for
-            return BallBallCollision(DummyBall(), NonObject(), t=(self.t + dtau_E))
-
-        dtau_E, index = utils.min_real_root(p=np.array(collision_coeffs), tol=c.tol)
+            return
 
-        ball_id, cushion_id = agent_ids[index]
-        ball, cushion = (
-            self.balls[ball_id],
-            self.table.cushion_segments["circular"][cushion_id],
+        horizons = np.array(horizons, dtype=np.float64)
+        dtau_Es, skipped = utils.min_real_quartic_roots_within_fast(
+            np.array(collision_coeffs, dtype=np.float64), horizons, tol=c.tol
         )
 
-        return BallCushionCollision(ball, cushion, t=(self.t + dtau_E))
+        counts[2] += np.sum(skipped)
+        counts[3] += np.sum(~skipped & ~(dtau_Es <= horizons))
 
-    def get_min_ball_linear_cushion_event_time(self):
-        dtau_E_min = np.inf
-        involved_agents = tuple([DummyBall(), NonObject()])
+        for ids, dtau_E in zip(candidates, dtau_Es):
+            self.schedule(self.t + dtau_E, type_ball_ball, ids)
 
-        for ball in self.balls.values():
+    def schedule_ball_table_collisions(self, stale_ball_ids):
+        """Schedule the earliest cushion and pocket collisions of each stale ball
+
+        Each ball is checked against all of the table geometry in a single call (see
+        physics.get_ball_table_collision_times_fast). Only the earliest collision with
+        each kind of geometry is scheduled, since the others become stale as soon as it
+        happens. If `self.broad_phase` is 'sweep', candidates are rejected as early as
+        possible (see `get_detection_counts`).
+        """
+        geometry = self.table.geometry
+        detection_arrays = geometry.get_detection_arrays()
+
+        for ball_id in self.balls:
+            if ball_id not in stale_ball_ids:
+                continue
+
+            ball = self.balls[ball_id]
             if ball.s in c.nontranslating:
                 continue
 
-            for cushion in self.table.cushion_segments["linear"].values():
-                dtau_E = physics.get_ball_linear_cushion_collision_time_fast(
-                    rvw=ball.rvw,
-                    s=ball.s,
-                    lx=cushion.lx,
-                    ly=cushion.ly,
-                    l0=cushion.l0,
-                    p1=cushion.p1,
-                    p2=cushion.p2,
-                    direction=cushion.direction,
-                    mu=(ball.u_s if ball.s == c.sliding else ball.u_r),
-                    m=ball.m,
-                    g=ball.g,
-                    R=ball.R,
+            horizon = (
+                np.inf
+                if self.broad_phase is None
+                else ball.next_transition_event.time - self.t
+            )
+
+            (
+                linear_dtau,
+                linear_index,
+                circular_dtau,
+                circular_index,
+                pocket_dtau,
+                pocket_index,
+            ) = physics.get_ball_table_collision_times_fast(
+                ball.rvw,
+                ball.s,
+                ball.u_s if ball.s == c.sliding else ball.u_r,
+                ball.m,
+                ball.g,
+                ball.R,
+                horizon,
+                *detection_arrays,
+                self.detection_counts,
+            )
+
+            if linear_index >= 0:
+                self.schedule(
+                    self.t + linear_dtau,
+                    type_ball_linear_cushion,
+                    (ball_id, geometry.linear_ids[linear_index]),
                 )
 
-                if dtau_E < dtau_E_min:
-                    involved_agents = (ball, cushion)
-                    dtau_E_min = dtau_E
+            if circular_index >= 0:
+                self.schedule(
+                    self.t + circular_dtau,
+                    type_ball_circular_cushion,
+                    (ball_id, geometry.circular_ids[circular_index]),
+                )
 
-        dtau_E = dtau_E_min
+            if pocket_index >= 0:
+                self.schedule(
+                    self.t + pocket_dtau,
+                    type_ball_pocket,
+                    (ball_id, geometry.pocket_ids[pocket_index]),
+                )
 
-        return BallCushionCollision(*involved_agents, t=(self.t + dtau_E))
+    def get_next_event(self):
+        """Pop the next valid event from the event queue
 
-    def get_min_ball_pocket_event_time(self):
-        """Returns minimum time until next ball-pocket collision"""
-        dtau_E = np.inf
-        agent_ids = []
-        collision_coeffs = []
+        Returns
+        =======
+        event : class with base events.Event
+            The earliest scheduled event whose agents have not changed since it was
+            scheduled. If there is no such event, a NonEvent at np.inf is returned
+        """
+        # Bring the event queue up to date
+        self.update_event_queue()
 
-        for ball in self.balls.values():
-            if ball.s in c.nontranslating:
+        while len(self.event_queue):
+            t, _, _, event_type, agent_ids, stamps = heapq.heappop(self.event_queue)
+
+            if self.is_stale(agent_ids, stamps):
                 continue
 
-            for pocket in self.table.pockets.values():
-                collision_coeffs.append(
-                    physics.get_ball_pocket_collision_coeffs_fast(
-                        rvw=ball.rvw,
-                        s=ball.s,
-                        a=pocket.a,
-                        b=pocket.b,
-                        r=pocket.radius,
-                        mu=(ball.u_s if ball.s == c.sliding else ball.u_r),
-                        m=ball.m,
-                        g=ball.g,
-                        R=ball.R,
-                    )
-                )
+            return self.build_event(t, event_type, agent_ids)
 
-                agent_ids.append((ball.id, pocket.id))
+        return NonEvent(t=np.inf)
 
-        if not len(collision_coeffs):
-            # There are no collisions to test for
-            return BallBallCollision(DummyBall(), NonObject(), t=(self.t + dtau_E))
+    def get_simultaneous_event(self):
+        """Pop the next valid event if it happens at (numerically) the current time
+
+        Unlike `get_next_event`, the event queue is not brought up to date first, so
+        events involving balls that took part in an event since the last update are
+        discarded too. Breaks often have many collisions within c.tol of each other
+        that involve different balls, and this allows them to be resolved as a batch,
+        with a single update of the event queue.
+
+        Returns
+        =======
+        event : class with base events.Event or None
+            The earliest scheduled event if it is valid and happens within c.tol of
+            self.t, with its time set to self.t. Otherwise None
+        """
+        while len(self.event_queue) and self.event_queue[0][0] <= self.t + c.tol:
+            _, _, _, event_type, agent_ids, stamps = heapq.heappop(self.event_queue)
+
+            if self.is_stale(agent_ids, stamps):
+                continue
+
+            num_balls = 2 if event_type == type_ball_ball else 1
+            if any(ball_id in self.stale_ball_ids for ball_id in agent_ids[:num_balls]):
+                continue
+
+            return self.build_event(self.t, event_type, agent_ids)
+
+        return None
+
+    def build_event(self, t, event_type, agent_ids):
+        """Create the event object of a scheduled event"""
+        if event_type == class_transition:
+            return self.balls[agent_ids[0]].next_transition_event
 
-        dtau_E, index = utils.min_real_root(p=np.array(collision_coeffs), tol=c.tol)
+        if event_type == type_ball_ball:
+            ball1_id, ball2_id = agent_ids
+            return BallBallCollision(self.balls[ball1_id], self.balls[ball2_id], t=t)
 
-        ball_id, pocket_id = agent_ids[index]
-        ball, pocket = self.balls[ball_id], self.table.pockets[pocket_id]
+        ball_id, other_id = agent_ids
+        ball = self.balls[ball_id]
 
-        return BallPocketCollision(ball, pocket, t=(self.t + dtau_E))
+        if event_type == type_ball_linear_cushion:
+            cushion = self.table.cushion_segments["linear"][other_id]
+            return BallCushionCollision(ball, cushion, t=t)
+
+        if event_type == type_ball_circular_cushion:
+            cushion = self.table.cushion_segments["circular"][other_id]
+            return BallCushionCollision(ball, cushion, t=t)
+
+        if event_type == type_ball_pocket:
+            pocket = self.table.pockets[other_id]
+            return BallPocketCollision(ball, pocket, t=t)
+
+        raise NotImplementedError(
+            f"EvolveShotEventBased.build_event :: '{event_type}' has no event"
+        )
 
 
 class EvolveShotDiscreteTime(EvolveShot):
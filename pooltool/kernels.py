@@ -0,0 +1,127 @@
+#! /usr/bin/env python
+"""Explicit signatures and warm-up of the numba kernels
+
+The functions decorated with numba's `jit` are compiled the first time they are called,
+which takes several seconds for a simulation. Since they are cached on disk (see
+`numba_cache` in pooltool/constants.py), later processes only load them, but the first
+call in each process still pays for the lookup, and a process that runs before the
+cache is populated pays for the compilation.
+
+This module lists the signatures that the kernels called from Python are compiled for,
+so that all of them can be compiled (or loaded from the cache) up front with
+`compile_kernels`. Kernels that are only called from other kernels are compiled as part
+of their callers, and so aren't listed. The signatures are not passed to `jit`, so that
+the kernels can still be called with other types, which are compiled on demand.
+
+The cache can be populated ahead of time, e.g. when building an image for batch workers:
+
+    python -c "import pooltool; pooltool.compile_kernels()"
+"""
+
+import time
+
+from numba import types
+
+import pooltool.physics as physics
+import pooltool.utils as utils
+from pooltool.engine import replay_fast, simulate_fast
+from pooltool.evolution import engines
+
+f8 = types.float64
+i8 = types.int64
+i1 = types.int8
+b1 = types.boolean
+
+# C-contiguous arrays
+f8_1d = types.float64[::1]
+f8_2d = types.float64[:, ::1]
+f8_3d = types.float64[:, :, ::1]
+f8_4d = types.float64[:, :, :, ::1]
+i8_1d = types.int64[::1]
+i8_2d = types.int64[:, ::1]
+b1_1d = types.boolean[::1]
+
+# The arrays of table geometry passed to physics.get_ball_table_collision_times_fast
+# (see `TableGeometry.get_detection_arrays`)
+table_arrays = (f8_2d, f8_2d, f8_1d, f8_1d, f8_1d, i8_1d, f8_2d, f8_1d, f8_2d, f8_1d)
+
+# The signatures of each kernel. The motion state of a ball is an int8 when it comes
+# from a history, and an int64 otherwise
+signatures = {
+    physics.resolve_ball_ball_collision_fast: [(f8_2d, f8_2d)],
+    physics.resolve_ball_cushion_collision_fast: [(f8_2d, f8_1d, f8, f8, f8, f8, f8)],
+    physics.get_ball_ball_collision_coeffs_fast: [
+        (f8_2d, f8_2d, i8, i8, f8, f8, f8, f8, f8, f8, f8)
+    ],
+    physics.get_ball_reach_fast: [(f8_2d, i8, f8, f8, f8)],
+    physics.get_ball_swept_bounds_fast: [(f8_2d, i8, f8, f8, f8, f8)],
+    physics.get_ball_table_collision_times_fast: [
+        (f8_2d, i8, f8, f8, f8, f8, f8) + table_arrays + (i8_2d,)
+    ],
+    physics.get_slide_time_fast: [(f8_2d, f8, f8, f8)],
+    physics.get_roll_time_fast: [(f8_2d, f8, f8)],
+    physics.get_spin_time_fast: [(f8_2d, f8, f8, f8)],
+    physics.evolve_ball_motion: [
+        (s, f8_2d, f8, f8, f8, f8, f8, f8, f8) for s in (i1, i8)
+    ],
+    physics.evolve_balls_fast: [(f8_3d, i8_1d) + (f8_1d,) * 6 + (f8,)],
+    physics.evolve_ball_motion_times: [(i1, f8_2d) + (f8,) * 6 + (f8_1d,)],
+    physics.sample_ball_motion_fast: [(s, f8_2d) + (f8,) * 8 for s in (i1, i8)],
+    utils.sweep_and_prune_fast: [(f8_2d,)],
+    utils.min_real_quartic_roots_within_fast: [(f8_2d, f8_1d, f8)],
+    simulate_fast: [
+        (f8_3d, i8_1d)
+        + (f8_1d,) * 9
+        + table_arrays
+        + (f8_1d, f8_2d, f8_1d, f8_1d, b1_1d, f8, f8, i8_2d)
+    ],
+    replay_fast: [(f8_3d, i8_1d) + (f8_1d,) * 7 + (i8_1d, i8_2d, f8_4d, i8_2d, f8, b1)],
+}
+
+
+# The kernels of the compiled engine. The kernels they call are compiled along with them
+compiled_engine_kernels = (simulate_fast, replay_fast)
+
+
+def get_kernel_name(kernel):
+    return f"{kernel.py_func.__module__}.{kernel.__name__}"
+
+
+def compile_kernels(engine=None):
+    """Compile the numba kernels, or load them from the cache
+
+    Each kernel is compiled for each of its signatures (see `signatures`). Calling this
+    once when a process starts, e.g. in the initializer of a worker process, moves all
+    compilation out of the first simulation. Calling it again does nothing.
+
+    Parameters
+    ==========
+    engine : str, None
+        If 'compiled', only the kernels of the compiled engine are compiled. If
+        'python', only the others are. If None, all kernels are compiled. See
+        pooltool.evolution.engines
+
+    Returns
+    =======
+    times : dict
+        The seconds spent compiling or loading each kernel, by name
+    """
+    if engine is not None and engine not in engines:
+        raise ValueError(
+            f"'{engine}' is not a valid engine. Please choose from: {engines}"
+        )
+
+    times = {}
+    for kernel, kernel_signatures in signatures.items():
+        if engine is not None and (kernel in compiled_engine_kernels) != (
+            engine == "compiled"
+        ):
+            continue
+
+        start = time.perf_counter()
+        for signature in kernel_signatures:
+            kernel.compile(signature)
+
+        times[get_kernel_name(kernel)] = time.perf_counter() - start
+
+    return times
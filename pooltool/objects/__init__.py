@@ -32,7 +32,49 @@ class DummyBall(NonObject):
         self.id = ball_id
 
 
+class RenderAttribute(object):
+    def __init__(self, factory):
+        """An attribute of a Render that is created the first time it is accessed
+
+        Until then, the attribute isn't stored in the object, so objects that are only
+        simulated don't carry it. For example, `nodes = RenderAttribute(dict)` gives
+        each object its own empty dictionary the first time self.nodes is accessed.
+
+        Parameters
+        ==========
+        factory : callable
+            Called without arguments to create the value of the attribute
+        """
+        self.factory = factory
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+
+        # This is a non-data descriptor, so once the value is stored in the object, it
+        # is found there instead
+        value = obj.__dict__[self.name] = self.factory()
+        return value
+
+
 class Render(ABC):
+    # The render attributes of an object are only stored in the object once they are
+    # set (e.g. by render), so objects that are only simulated don't carry them. Until
+    # then, these are their values
+    nodes = RenderAttribute(dict)
+    rendered = False
+
+    # These are initialized when render(...) is called
+    loader = None
+    global_render = None
+    base = None
+
+    # The names of the render attributes (see reset_render_attributes)
+    render_attributes = ("nodes", "rendered", "loader", "global_render", "base")
+
     def __init__(self):
         """A base class for rendering physical pool objects
 
@@ -44,15 +86,18 @@ class Render(ABC):
         - All nodes for a given object (e.g. table) are stored in self.nodes.
         - Each method decorated with 'abstractmethod' must be defined by the child
           class. The decorator _ensures_ this happens.
+        - The render attributes aren't created here (see the class attributes)
         """
+        pass
 
-        self.nodes = {}
-        self.rendered = False
+    def reset_render_attributes(self):
+        """Remove the render attributes stored in this object, e.g. in a shallow copy
 
-        # These are initialized when render(...) is called
-        self.loader = None
-        self.global_render = None
-        self.base = None
+        Afterwards, the object is unrendered. Its nodes are not removed (see
+        `remove_nodes`).
+        """
+        for name in self.render_attributes:
+            self.__dict__.pop(name, None)
 
     def remove_node(self, name):
         self.nodes[name].removeNode()
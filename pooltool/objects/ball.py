@@ -3,29 +3,14 @@
 from pathlib import Path
 
 import numpy as np
-from direct.interval.IntervalGlobal import (
-    LerpFunc,
-    LerpPosInterval,
-    LerpPosQuatInterval,
-    Parallel,
-    Sequence,
-)
-from panda3d.core import (
-    CollisionCapsule,
-    CollisionNode,
-    LineSegs,
-    SamplerState,
-    TransparencyAttrib,
-)
 
-import pooltool.ani as ani
-import pooltool.ani.utils as autils
 import pooltool.constants as c
 import pooltool.physics as physics
 import pooltool.utils as utils
 from pooltool.error import ConfigError
 from pooltool.events import (
     Events,
+    EventStates,
     NonEvent,
     RollingSpinningTransition,
     RollingStationaryTransition,
@@ -34,18 +19,26 @@ from pooltool.events import (
     event_from_dict,
 )
 from pooltool.objects import Object, Render
-from pooltool.utils import panda_path
+from pooltool.utils import LazyModule, panda_path
+
+ani = LazyModule("pooltool.ani")
+autils = LazyModule("pooltool.ani.utils")
 
 
 class BallRender(Render):
+    quats = None
+    playback_sequence = None
+
+    render_attributes = Render.render_attributes + ("quats", "playback_sequence")
+
     def __init__(self, rel_model_path=None):
         self.rel_model_path = rel_model_path
-        self.quats = None
-        self.playback_sequence = None
         Render.__init__(self)
 
     def init_sphere(self):
         """Initialize the ball's nodes"""
+        from panda3d.core import SamplerState
+
         position = (
             self.global_render.find("scene")
             .find("cloth")
@@ -106,6 +99,8 @@ class BallRender(Render):
             self.initial_orientation = self.get_orientation()
 
     def init_collision(self, cue):
+        from panda3d.core import CollisionCapsule, CollisionNode
+
         if not cue.rendered:
             raise ConfigError("BallRender.init_collision :: `cue` must be rendered")
 
@@ -121,6 +116,8 @@ class BallRender(Render):
         self.nodes[f"ball_csphere_{self.id}"] = collision_node
 
     def init_shadow(self):
+        from panda3d.core import TransparencyAttrib
+
         N = 20
         start, stop = 0.5, 0.9  # fraction of ball radius
         z_offset = 0.0005
@@ -146,6 +143,8 @@ class BallRender(Render):
         return shadow_node
 
     def init_angular_vector(self):
+        from panda3d.core import LineSegs
+
         self.vector_drawer = LineSegs()
         self.vector_drawer.setThickness(3)
         node = self.nodes["pos"].attachNewNode(self.vector_drawer.create())
@@ -227,6 +226,14 @@ class BallRender(Render):
 
     def set_playback_sequence(self, playback_speed=1):
         """Creates the sequence motions of the ball for a given playback speed"""
+        from direct.interval.IntervalGlobal import (
+            LerpFunc,
+            LerpPosInterval,
+            LerpPosQuatInterval,
+            Parallel,
+            Sequence,
+        )
+
         dts = np.diff(self.history_cts.t)
         motion_states = self.history_cts.s
         playback_dts = dts / playback_speed
@@ -323,6 +330,8 @@ class BallRender(Render):
             self.playback_sequence.append(angular_vector_sequence)
 
     def set_alpha(self, alpha):
+        from panda3d.core import TransparencyAttrib
+
         self.get_node("pos").setTransparency(TransparencyAttrib.MAlpha)
         self.get_node("pos").setAlphaScale(alpha)
         self.get_node("shadow").setAlphaScale(alpha)
@@ -375,11 +384,54 @@ class BallRender(Render):
         self.init_sphere()
 
 
+# The arrays of empty histories, which are shared, since they have no elements to modify
+empty_rvw = np.empty((0, 3, 3), dtype=np.float64)
+empty_s = np.empty(0, dtype=np.int8)
+empty_t = np.empty(0, dtype=np.float64)
+
+
 class BallHistory(object):
-    def __init__(self):
-        self.vectorized = False
+    def __init__(self, capacity=16):
+        """The states of a ball over time
+
+        The states are stored in preallocated arrays: an (capacity, 3, 3) float64 array
+        of rvw, an int8 array of motion states, and a float64 array of times. When the
+        arrays are full, they are replaced by arrays with twice the capacity, so adding
+        a state takes amortized constant time and allocates nothing. rvw, s, and t are
+        views of the filled part of the arrays, so they are always vectorized.
+
+        An empty history holds no arrays of its own, so histories that are never used
+        (e.g. the continuized history of a ball that isn't animated) cost little memory.
+        The arrays are allocated when the first state is added.
+
+        Parameters
+        ==========
+        capacity : int, 16
+            The number of states that fit in the arrays when they are first allocated
+        """
+        self.initial_capacity = capacity
         self.reset()
 
+    @property
+    def rvw(self):
+        return self._rvw[: self.n]
+
+    @property
+    def s(self):
+        return self._s[: self.n]
+
+    @property
+    def t(self):
+        return self._t[: self.n]
+
+    @property
+    def vectorized(self):
+        return True
+
+    @property
+    def capacity(self):
+        return len(self._t)
+
     def get_state(self, i):
         """Get state based on history index
 
@@ -390,39 +442,222 @@ class BallHistory(object):
         return self.rvw[i], self.s[i], self.t[i]
 
     def reset(self):
-        n = 0
-        self.vectorized = False
-        self.rvw = [np.nan * np.ones((3, 3))] * n
-        self.s = [np.nan] * n
-        self.t = [np.nan] * n
+        self.n = 0
+        self._rvw, self._s, self._t = empty_rvw, empty_s, empty_t
 
     def is_populated(self):
         """Returns True if rvw has non-zero length"""
-        return True if len(self.rvw) else False
+        return True if self.n else False
+
+    def reserve(self, capacity):
+        """Grow the arrays so that at least `capacity` states fit"""
+        if capacity <= self.capacity:
+            return
+
+        for name in ("_rvw", "_s", "_t"):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[: self.n] = old[: self.n]
+            setattr(self, name, new)
 
     def add(self, rvw, s, t):
-        self.rvw.append(rvw)
-        self.s.append(s)
-        self.t.append(t)
+        if self.n == self.capacity:
+            self.reserve(max(2 * self.capacity, self.initial_capacity, 1))
+
+        self._rvw[self.n] = rvw
+        self._s[self.n] = s
+        self._t[self.n] = t
+        self.n += 1
+
+    def set(self, rvw, s, t):
+        """Replace the history with arrays of states
+
+        Parameters
+        ==========
+        rvw : array-like or None
+            The (n, 3, 3) states. If None, the history is emptied
+        s : array-like or None
+            The n motion states
+        t : array-like or None
+            The n times
+        """
+        if rvw is None:
+            self.reset()
+            return
+
+        self._rvw = np.array(rvw, dtype=np.float64).reshape(-1, 3, 3)
+        self._s = np.array(s, dtype=np.int8)
+        self._t = np.array(t, dtype=np.float64)
+        self.n = len(self._t)
+
+    def extend(self, rvw, s, t):
+        """Add arrays of states
+
+        Parameters
+        ==========
+        rvw : array-like
+            The (n, 3, 3) states
+        s : array-like
+            The n motion states
+        t : array-like
+            The n times
+        """
+        n = self.n + len(t)
+        if n > self.capacity:
+            self.reserve(max(n, 2 * self.capacity))
+
+        self._rvw[self.n : n] = rvw
+        self._s[self.n : n] = s
+        self._t[self.n : n] = t
+        self.n = n
+
+    def truncate(self, n):
+        """Keep only the first n states
+
+        The arrays are not copied. Instead, the first state added afterwards moves the
+        kept states to new arrays, so views of the removed states remain intact.
+        """
+        self._rvw, self._s, self._t = self._rvw[:n], self._s[:n], self._t[:n]
+        self.n = n
+
+    def share(self, history, n):
+        """Replace the history with the first n states of another history
+
+        The arrays are shared rather than copied, and as in `truncate`, the first state
+        added afterwards moves the shared states to new arrays. So neither history is
+        affected by states added to the other.
+        """
+        self._rvw, self._s, self._t = history._rvw[:n], history._s[:n], history._t[:n]
+        self.n = n
+
+    def shrink(self):
+        """Free the unused capacity of the arrays"""
+        for name in ("_rvw", "_s", "_t"):
+            setattr(self, name, getattr(self, name)[: self.n].copy())
 
     def vectorize(self):
-        """Convert all list objects in self.history to array objects
+        """Does nothing, since the history is always vectorized
 
         Notes
         =====
-        - Append operations will cease to work
+        - This is kept for compatibility. Unlike before, append operations continue to
+          work afterwards
         """
+        pass
+
+    def __len__(self):
+        return self.n
+
+
+class SystemState(object):
+    def __init__(self, n=0):
+        """The packed states and parameters of a collection of balls
+
+        Each ball state and parameter is stored as an array, where element i belongs to
+        the ball with index i. This allows the states of all balls to be operated on in
+        a single call. Ball objects read and write their attributes from their row of a
+        SystemState (see `Ball.attach_system_state`), so the two never go out of sync.
+
+        Parameters
+        ==========
+        n : int, 0
+            The number of balls
+        """
+        self.ids = [None] * n
+        self.rvw = np.full((n, 3, 3), np.nan)
+        self.s = np.full(n, c.stationary, dtype=np.int64)
+        self.t = np.zeros(n)
+
+        # The parameters are rows of a single array, which is faster to allocate
+        params = np.full((len(self.params), n), np.nan)
+        for param, values in zip(self.params, params):
+            setattr(self, param, values)
+
+        # A function that builds the events and histories of the balls, or None if they
+        # are up to date (see `materialize`)
+        self.materializer = None
+
+        # The agent states of the events of the balls
+        self.event_states = EventStates()
 
-        self.rvw = np.array(self.rvw)
-        self.s = np.array(self.s)
-        self.t = np.array(self.t)
+    # Per-ball parameters. Together with rvw, s, and t, these make up `fields`
+    params = ("m", "R", "I", "g", "u_s", "u_r", "u_sp", "e_c", "f_c")
+    fields = ("rvw", "s", "t") + params
 
-        self.vectorized = True
+    def __len__(self):
+        return len(self.ids)
+
+    def materialize(self):
+        """Build any events and histories that are pending
+
+        Some evolution algorithms (see pooltool.engine) don't create events and
+        histories while simulating. Instead, they set self.materializer, which is called
+        the first time the events or histories of the system or its balls are accessed.
+        """
+        if self.materializer is None:
+            return
+
+        materializer, self.materializer = self.materializer, None
+        materializer()
+
+    def __repr__(self):
+        lines = [
+            f"<{self.__class__.__name__} object at {hex(id(self))}>",
+            f" └── ids : {self.ids}",
+        ]
+
+        return "\n".join(lines) + "\n"
+
+
+def system_state_field(field):
+    """A Ball attribute stored in the ball's row of its SystemState"""
+
+    def getter(ball):
+        return getattr(ball.system_state, field)[ball.index]
+
+    def setter(ball, value):
+        getattr(ball.system_state, field)[ball.index] = value
+
+    return property(getter, setter)
+
+
+def materialized_field(field):
+    """A Ball attribute that is built on demand if its SystemState has pending events
+
+    See `SystemState.materialize`
+    """
+    private = "_" + field
+
+    def getter(ball):
+        ball.system_state.materialize()
+        return getattr(ball, private)
+
+    def setter(ball, value):
+        setattr(ball, private, value)
+
+    return property(getter, setter)
 
 
 class Ball(Object, BallRender):
     object_type = "ball"
 
+    rvw = system_state_field("rvw")
+    s = system_state_field("s")
+    t = system_state_field("t")
+    m = system_state_field("m")
+    R = system_state_field("R")
+    I = system_state_field("I")
+    g = system_state_field("g")
+    u_s = system_state_field("u_s")
+    u_r = system_state_field("u_r")
+    u_sp = system_state_field("u_sp")
+    e_c = system_state_field("e_c")
+    f_c = system_state_field("f_c")
+
+    history = materialized_field("history")
+    history_cts = materialized_field("history_cts")
+    events = materialized_field("events")
+
     def __init__(
         self,
         ball_id,
@@ -450,6 +685,9 @@ class Ball(Object, BallRender):
         if not (isinstance(self.id, int) or isinstance(self.id, str)):
             raise ConfigError("ball_id must be integer or string")
 
+        # Until the ball is packed with other balls, it has a SystemState of its own
+        self.attach_system_state(SystemState(1), 0)
+
         # physical properties
         self.m = m or c.m
         self.R = R or c.R
@@ -478,12 +716,35 @@ class Ball(Object, BallRender):
 
         self.events = Events()
 
-        if initial_orientation is None:
-            self.initial_orientation = self.get_random_orientation()
+        self.initial_orientation = (
+            self.get_random_orientation()
+            if initial_orientation is None
+            else initial_orientation
+        )
 
         self.rel_model_path = rel_model_path
         BallRender.__init__(self, rel_model_path=self.rel_model_path)
 
+    def attach_system_state(self, system_state, index):
+        """Store the ball's state and parameters in row `index` of a SystemState
+
+        The current values are copied into the SystemState, after which the ball is a
+        view into it: e.g. modifying `ball.rvw` modifies `system_state.rvw[index]`, and
+        vice versa.
+        """
+        values = (
+            {field: getattr(self, field) for field in SystemState.fields}
+            if hasattr(self, "system_state")
+            else {}
+        )
+
+        self.system_state = system_state
+        self.index = index
+        system_state.ids[index] = self.id
+
+        for field, value in values.items():
+            setattr(self, field, value)
+
     def attach_history(self, history):
         """Sets self.history to an existing BallHistory object"""
         self.history = history
@@ -493,7 +754,7 @@ class Ball(Object, BallRender):
         self.history_cts = history
 
     def update_history(self, event):
-        self.history.add(np.copy(self.rvw), self.s, event.time)
+        self.history.add(self.rvw, self.s, event.time)
         self.events.append(event)
 
     def init_history(self):
@@ -558,6 +819,61 @@ class Ball(Object, BallRender):
         """Set the ball state according to a history index"""
         self.set(*self.history.get_state(i))
 
+    def state_at(self, times):
+        """Get the state of the ball at arbitrary times
+
+        For each time, the last history entry at or before it is found by binary search,
+        and the state of that entry is evolved analytically until the time. Since the
+        history holds the ball state after each event, this is exact, and doesn't
+        require a continuized history.
+
+        Parameters
+        ==========
+        times : float or array-like
+            The times. Times before the first history entry get the state of the first
+            entry. Times after the last history entry are evolved from the last entry as
+            if no further events occur
+
+        Returns
+        =======
+        output : (rvw, s)
+            If times is a float, the (3, 3) state and motion state of the ball.
+            Otherwise, an array of states with shape (len(times), 3, 3) and an array of
+            motion states with shape (len(times),)
+        """
+        if not self.history.is_populated():
+            raise ConfigError(f"Ball.state_at :: ball '{self.id}' has no history")
+
+        scalar = np.ndim(times) == 0
+        times = np.atleast_1d(np.asarray(times, dtype=np.float64))
+
+        history_t = np.asarray(self.history.t, dtype=np.float64)
+        indices = np.searchsorted(history_t, times, side="right") - 1
+        indices = np.maximum(indices, 0)
+
+        rvws = np.empty((len(times), 3, 3), dtype=np.float64)
+        states = np.empty(len(times), dtype=np.int64)
+
+        for index in np.unique(indices):
+            mask = indices == index
+            rvw, s, t = self.history.get_state(index)
+            rvws[mask], states[mask] = physics.evolve_ball_motion_times(
+                s,
+                np.asarray(rvw, dtype=np.float64),
+                self.R,
+                self.m,
+                self.u_s,
+                self.u_sp,
+                self.u_r,
+                self.g,
+                np.maximum(times[mask] - t, 0),
+            )
+
+        if scalar:
+            return rvws[0], states[0]
+
+        return rvws, states
+
     def set_time(self, t):
         self.t = t
 
@@ -603,6 +919,37 @@ class Ball(Object, BallRender):
     def save(self, path):
         utils.save_pickle(self.as_dict(), path)
 
+    def copy(self, history=True):
+        """Return an unrendered copy of the ball
+
+        The copy has its own SystemState (see `attach_system_state`). Events are not
+        copied, since their agents should be objects of the same system as the copy
+        (see System.copy).
+
+        Parameters
+        ==========
+        history : bool, True
+            If True, the histories are copied. Otherwise, they are empty
+        """
+        ball = Ball(
+            self.id,
+            rel_model_path=self.rel_model_path,
+            initial_orientation=self.initial_orientation,
+        )
+
+        for field in SystemState.fields:
+            setattr(ball, field, getattr(self, field))
+
+        ball.update_next_transition_event()
+
+        if history:
+            ball.history.set(self.history.rvw, self.history.s, self.history.t)
+            ball.history_cts.set(
+                self.history_cts.rvw, self.history_cts.s, self.history_cts.t
+            )
+
+        return ball
+
 
 def ball_from_dict(d):
     """Return a ball object from a dictionary
@@ -633,17 +980,14 @@ def ball_from_dict(d):
     ball.rvw = d["rvw"]
 
     ball_history = BallHistory()
-    ball_history.rvw = d["history"]["rvw"]
-    ball_history.s = d["history"]["s"]
-    ball_history.t = d["history"]["t"]
-    ball_history.vectorized = d["history"]["vectorized"]
+    ball_history.set(d["history"]["rvw"], d["history"]["s"], d["history"]["t"])
     ball.attach_history(ball_history)
 
     ball_history_cts = BallHistory()
-    ball_history_cts.rvw = d.get("history_cts", {}).get("rvw")
-    ball_history_cts.s = d.get("history_cts", {}).get("s")
-    ball_history_cts.t = d.get("history_cts", {}).get("t")
-    ball_history_cts.vectorized = d.get("history_cts", {}).get("vectorized", False)
+    history_cts = d.get("history_cts", {})
+    ball_history_cts.set(
+        history_cts.get("rvw"), history_cts.get("s"), history_cts.get("t")
+    )
     ball.attach_history_cts(ball_history_cts)
 
     events = Events()
@@ -1,29 +1,38 @@
 #! /usr/bin/env python
 
 import numpy as np
-from direct.interval.IntervalGlobal import LerpPosInterval, Sequence
-from panda3d.core import ClockObject, CollisionNode, CollisionSegment, Vec3
 
-import pooltool.ani as ani
 import pooltool.constants as c
 import pooltool.utils as utils
 from pooltool.error import ConfigError
 from pooltool.events import StickBallCollision
-from pooltool.objects import Object, Render
+from pooltool.objects import Object, Render, RenderAttribute
+from pooltool.utils import LazyModule
+
+ani = LazyModule("pooltool.ani")
 
 
 class CueRender(Render):
+    follow = None
+    stroke_sequence = None
+    stroke_clock = None
+    has_focus = False
+
+    stroke_pos = RenderAttribute(list)
+    stroke_time = RenderAttribute(list)
+
+    render_attributes = Render.render_attributes + (
+        "follow",
+        "stroke_sequence",
+        "stroke_clock",
+        "has_focus",
+        "stroke_pos",
+        "stroke_time",
+    )
+
     def __init__(self):
         Render.__init__(self)
 
-        self.follow = None
-        self.stroke_sequence = None
-        self.stroke_clock = ClockObject()
-        self.has_focus = False
-
-        self.stroke_pos = []
-        self.stroke_time = []
-
     def init_model(self, R=c.R):
         path = utils.panda_path(ani.model_dir / "cue" / "cue.glb")
         cue_stick_model = self.loader.loadModel(path)
@@ -55,6 +64,8 @@ class CueRender(Render):
         self.has_focus = True
 
     def init_collision_handling(self, collision_handler):
+        from panda3d.core import CollisionNode, CollisionSegment
+
         if not ani.settings["gameplay"]["cue_collision"]:
             return
 
@@ -86,8 +97,13 @@ class CueRender(Render):
 
     def track_stroke(self):
         """Initialize variables for storing cue position during stroke"""
+        from panda3d.core import ClockObject
+
         self.stroke_pos = []
         self.stroke_time = []
+
+        if self.stroke_clock is None:
+            self.stroke_clock = ClockObject()
         self.stroke_clock.reset()
 
     def append_stroke_data(self):
@@ -97,6 +113,8 @@ class CueRender(Render):
 
     def set_stroke_sequence(self):
         """Init a stroke sequence based off of self.stroke_pos and self.stroke_time"""
+        from direct.interval.IntervalGlobal import LerpPosInterval, Sequence
+        from panda3d.core import Vec3
 
         cue_stick = self.get_node("cue_stick")
         self.stroke_sequence = Sequence()
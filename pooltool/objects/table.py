@@ -1,17 +1,23 @@
 #! /usr/bin/env python
 
+import copy
+
 import numpy as np
-from panda3d.core import CollisionNode, CollisionPlane, LineSegs, Plane, Point3, Vec3
 
-import pooltool.ani as ani
 import pooltool.constants as c
 import pooltool.utils as utils
 from pooltool.error import ConfigError
-from pooltool.objects import Object, Render
-from pooltool.utils import panda_path
+from pooltool.objects import Object, Render, RenderAttribute
+from pooltool.utils import LazyModule, panda_path
+
+ani = LazyModule("pooltool.ani")
 
 
 class TableRender(Render):
+    collision_nodes = RenderAttribute(dict)
+
+    render_attributes = Render.render_attributes + ("collision_nodes",)
+
     def __init__(self, name, has_model):
         """A class for all pool table associated panda3d nodes"""
         self.name = name
@@ -47,9 +53,10 @@ class TableRender(Render):
             node.setName("cloth")
 
         self.nodes["cloth"] = node
-        self.collision_nodes = {}
 
     def init_collisions(self):
+        from panda3d.core import CollisionNode, CollisionPlane, Plane, Point3, Vec3
+
         if not ani.settings["gameplay"]["cue_collision"]:
             return
 
@@ -134,6 +141,8 @@ class TableRender(Render):
             self.init_pocket(pocket_id)
 
     def render(self):
+        from panda3d.core import LineSegs
+
         super().render()
 
         # draw table as rectangle
@@ -191,6 +200,98 @@ class Table(object):
     def save(self, path):
         utils.save_pickle(self.as_dict(), path)
 
+    def copy(self):
+        """Return an unrendered copy of the table
+
+        The cushion segments and compiled geometry never change once the table is
+        created, so they are shared with the copy. The pockets are copied, since they
+        hold the ids of the balls they contain.
+        """
+        table = copy.copy(self)
+        table.pockets = {
+            pocket_id: pocket.copy() for pocket_id, pocket in self.pockets.items()
+        }
+        table.reset_render_attributes()
+
+        return table
+
+    def compile_geometry(self):
+        """Pack the cushion segments and pockets into contiguous arrays
+
+        This is done when the table is created. If self.cushion_segments or
+        self.pockets are modified afterwards, this must be called again.
+        """
+        self.geometry = TableGeometry(self)
+
+
+def pack_array(values, shape=(-1,), dtype=np.float64):
+    """Pack per-segment values into a contiguous array, even if there are none"""
+    return np.ascontiguousarray(np.array(values, dtype=dtype).reshape(shape))
+
+
+class TableGeometry(object):
+    def __init__(self, table):
+        """The collision geometry of a table, packed into contiguous arrays
+
+        Each kind of geometry (linear cushion segments, circular cushion segments, and
+        pockets) is stored as a set of arrays, where element i belongs to the ith
+        segment or pocket, in the iteration order of table.cushion_segments and
+        table.pockets. For example, linear_lx[i] is the lx of the linear cushion segment
+        with id linear_ids[i]. This allows a ball to be checked against all the geometry
+        of a table in a single call (see physics.get_ball_table_collision_times_fast).
+        """
+        linear = table.cushion_segments["linear"]
+        self.linear_ids = list(linear.keys())
+        self.linear_p1 = pack_array([s.p1 for s in linear.values()], (-1, 3))
+        self.linear_p2 = pack_array([s.p2 for s in linear.values()], (-1, 3))
+        self.linear_lx = pack_array([s.lx for s in linear.values()])
+        self.linear_ly = pack_array([s.ly for s in linear.values()])
+        self.linear_l0 = pack_array([s.l0 for s in linear.values()])
+        self.linear_direction = pack_array(
+            [s.direction for s in linear.values()], dtype=np.int64
+        )
+        self.linear_normal = pack_array([s.normal for s in linear.values()], (-1, 3))
+        self.linear_height = pack_array([s.height for s in linear.values()])
+
+        circular = table.cushion_segments["circular"]
+        self.circular_ids = list(circular.keys())
+        self.circular_center = pack_array(
+            [s.center for s in circular.values()], (-1, 3)
+        )
+        self.circular_radius = pack_array([s.radius for s in circular.values()])
+        self.circular_height = pack_array([s.height for s in circular.values()])
+
+        pockets = table.pockets
+        self.pocket_ids = list(pockets.keys())
+        self.pocket_center = pack_array([p.center for p in pockets.values()], (-1, 3))
+        self.pocket_radius = pack_array([p.radius for p in pockets.values()])
+        self.pocket_depth = pack_array([p.depth for p in pockets.values()])
+
+    def get_detection_arrays(self):
+        """Get the table arguments of physics.get_ball_table_collision_times_fast"""
+        return (
+            self.linear_p1,
+            self.linear_p2,
+            self.linear_lx,
+            self.linear_ly,
+            self.linear_l0,
+            self.linear_direction,
+            self.circular_center,
+            self.circular_radius,
+            self.pocket_center,
+            self.pocket_radius,
+        )
+
+    def __repr__(self):
+        lines = [
+            f"<{self.__class__.__name__} object at {hex(id(self))}>",
+            f" ├── linear   : {len(self.linear_ids)}",
+            f" ├── circular : {len(self.circular_ids)}",
+            f" └── pockets  : {len(self.pocket_ids)}",
+        ]
+
+        return "\n".join(lines) + "\n"
+
 
 class PocketTable(Object, Table, TableRender):
     object_type = "pocket_table"
@@ -239,13 +340,14 @@ class PocketTable(Object, Table, TableRender):
         if self.model_name != "none":
             # User is passing a table with pre-existing parameters. All params
             # explicitly defined by this preset table will overwrite all other options
-            table_params = ani.load_config("tables")[self.model_name]
+            table_params = utils.load_config("tables")[self.model_name]
             for key, val in table_params.items():
                 setattr(self, key, val)
 
         self.center = (self.w / 2, self.l / 2)
         self.cushion_segments = self.get_cushion_segments()
         self.pockets = self.get_pockets()
+        self.compile_geometry()
 
         TableRender.__init__(self, name=self.model_name, has_model=self.has_model)
 
@@ -553,13 +655,14 @@ class BilliardTable(Object, Table, TableRender):
         if self.model_name != "none":
             # User is passing a table with pre-existing parameters. All params
             # explicitly defined by this preset table will overwrite all other options
-            table_params = ani.load_config("tables")[self.model_name]
+            table_params = utils.load_config("tables")[self.model_name]
             for key, val in table_params.items():
                 setattr(self, key, val)
 
         self.center = (self.w / 2, self.l / 2)
         self.cushion_segments = self.get_cushion_segments()
         self.pockets = {}
+        self.compile_geometry()
 
         TableRender.__init__(self, name=self.model_name, has_model=self.has_model)
 
@@ -708,6 +811,11 @@ class Pocket(object):
     def remove(self, ball_id):
         self.contains.remove(ball_id)
 
+    def copy(self):
+        pocket = copy.copy(self)
+        pocket.contains = set(self.contains)
+        return pocket
+
 
 table_types = {
     "pocket": PocketTable,
@@ -66,6 +66,30 @@ def resolve_ball_ball_collision(rvw1, rvw2):
     return rvw1, rvw2
 
 
+@jit(nopython=True, cache=const.numba_cache)
+def resolve_ball_ball_collision_fast(rvw1, rvw2):
+    """FIXME Instantaneous, elastic, equal mass collision (just-in-time compiled)
+
+    Like resolve_ball_ball_collision, rvw1 and rvw2 are modified in place
+    """
+
+    r1, r2 = rvw1[0], rvw2[0]
+    v1, v2 = rvw1[1], rvw2[1]
+
+    v_rel = v1 - v2
+    v_mag = np.linalg.norm(v_rel)
+
+    n = utils.unit_vector_fast(r2 - r1)
+    t = utils.coordinate_rotation_fast(n, np.pi / 2)
+
+    beta = utils.angle_fast(v_rel, n)
+
+    rvw1[1] = t * v_mag * np.sin(beta) + v2
+    rvw2[1] = n * v_mag * np.cos(beta) + v2
+
+    return rvw1, rvw2
+
+
 def resolve_ball_cushion_collision(rvw, normal, R, m, h, e_c, f_c):
     """Inhwan Han (2005) 'Dynamics in Carom and Three Cushion Billiards'"""
 
@@ -136,6 +160,85 @@ def resolve_ball_cushion_collision(rvw, normal, R, m, h, e_c, f_c):
     return rvw
 
 
+@jit(nopython=True, cache=const.numba_cache)
+def resolve_ball_cushion_collision_fast(rvw, normal, R, m, h, e_c, f_c):
+    """Inhwan Han (2005) 'Dynamics in Carom and Three Cushion Billiards'
+
+    (just-in-time compiled)
+
+    Notes
+    =====
+    - The restitution and friction coefficients are e_c and f_c, which is what
+      get_ball_cushion_restitution and get_ball_cushion_friction currently return
+    """
+
+    # orient the normal so it points away from playing surface
+    normal = normal if np.dot(normal, rvw[1]) > 0 else -normal
+
+    # Change from the table frame to the cushion frame. The cushion frame is defined by
+    # the normal vector is parallel with <1,0,0>.
+    psi = utils.angle_fast(normal)
+    rvw_R = utils.coordinate_rotation_fast(rvw.T, -psi).T
+
+    # The incidence angle--called theta_0 in paper
+    phi = utils.angle_fast(rvw_R[1]) % (2 * np.pi)
+
+    # Get mu and e
+    e = e_c
+    mu = f_c
+
+    # Depends on height of cushion relative to ball
+    theta_a = np.arcsin(h / R - 1)
+
+    # Eqs 14
+    sx = rvw_R[1, 0] * np.sin(theta_a) - rvw_R[1, 2] * np.cos(theta_a) + R * rvw_R[2, 1]
+    sy = (
+        -rvw_R[1, 1]
+        - R * rvw_R[2, 2] * np.cos(theta_a)
+        + R * rvw_R[2, 0] * np.sin(theta_a)
+    )
+    c = rvw_R[1, 0] * np.cos(theta_a)  # 2D assumption
+
+    # Eqs 16
+    I = 2 / 5 * m * R**2
+    A = 7 / 2 / m
+    B = 1 / m
+
+    # Eqs 17 & 20
+    PzE = (1 + e) * c / B
+    PzS = np.sqrt(sx**2 + sy**2) / A
+
+    if PzS <= PzE:
+        # Sliding and sticking case
+        PX = -sx / A * np.sin(theta_a) - (1 + e) * c / B * np.cos(theta_a)
+        PY = sy / A
+        PZ = sx / A * np.cos(theta_a) - (1 + e) * c / B * np.sin(theta_a)
+    else:
+        # Forward sliding case
+        PX = -mu * (1 + e) * c / B * np.cos(phi) * np.sin(theta_a) - (
+            1 + e
+        ) * c / B * np.cos(theta_a)
+        PY = mu * (1 + e) * c / B * np.sin(phi)
+        PZ = mu * (1 + e) * c / B * np.cos(phi) * np.cos(theta_a) - (
+            1 + e
+        ) * c / B * np.sin(theta_a)
+
+    # Update velocity
+    rvw_R[1, 0] += PX / m
+    rvw_R[1, 1] += PY / m
+    # rvw_R[1,2] += PZ/m
+
+    # Update angular velocity
+    rvw_R[2, 0] += -R / I * PY * np.sin(theta_a)
+    rvw_R[2, 1] += R / I * (PX * np.sin(theta_a) - PZ * np.cos(theta_a))
+    rvw_R[2, 2] += R / I * PY * np.cos(theta_a)
+
+    # Change back to table reference frame
+    rvw = utils.coordinate_rotation_fast(rvw_R.T, psi).T
+
+    return rvw
+
+
 def get_ball_cushion_restitution(rvw, e_c):
     """Get restitution coefficient dependent on ball state
 
@@ -310,7 +413,8 @@ def get_ball_ball_collision_coeffs_fast(
 
     Notes
     =====
-    - Speed comparison in pooltool/tests/speed/get_ball_ball_collision_coeffs.py
+    - Speed comparison with `pooltool/tests/speed/suite.py --filter
+      kernels/get_ball_ball_collision_coeffs/`
     """
     c1x, c1y = rvw1[0, 0], rvw1[0, 1]
     c2x, c2y = rvw2[0, 0], rvw2[0, 1]
@@ -374,6 +478,117 @@ def get_ball_ball_collision_coeffs_fast(
     return a, b, c, d, e
 
 
+@jit(nopython=True, cache=const.numba_cache)
+def get_ball_reach_fast(rvw, s, mu, g, t):
+    """Get how far a ball's center can travel over the next t seconds
+
+    (just-in-time compiled)
+
+    Like in `get_ball_swept_bounds_fast`, the ball is assumed to keep its current motion
+    state, so the result is only valid up until the ball's next transition. The ball
+    decelerates by mu*g along a fixed direction, so its displacement after t seconds is
+    at most v*t + mu*g*t**2/2. A rolling ball decelerates along its velocity, so the
+    displacement is exactly v*t - mu*g*t**2/2, which is at most the stopping distance
+    v**2/(2*mu*g).
+
+    Returns
+    =======
+    reach : float
+        The radius of the disc centered at the ball's current position that contains
+        the ball's center over the next t seconds. The radius is padded by a relative
+        1e-9 to absorb round-off
+    """
+    if s == const.spinning or s == const.pocketed or s == const.stationary:
+        return 0.0
+
+    if t == np.inf:
+        return np.inf
+
+    v = np.sqrt(rvw[1, 0] ** 2 + rvw[1, 1] ** 2)
+
+    if s == const.rolling:
+        t = min(t, v / (mu * g))
+        reach = v * t - 0.5 * mu * g * t**2
+    else:
+        reach = v * t + 0.5 * mu * g * t**2
+
+    return reach * (1 + 1e-9)
+
+
+@jit(nopython=True, cache=const.numba_cache)
+def get_ball_swept_bounds_fast(rvw, s, mu, g, R, t):
+    """Get the axis-aligned bounding box of a ball's trajectory over the next t seconds
+
+    (just-in-time compiled)
+
+    The trajectory is the quadratic r(t) = c + b*t + a*t**2 also used to calculate the
+    ball-ball collision coefficients (see `get_ball_ball_collision_coeffs_fast`), so it
+    is only accurate up until the ball's next transition. Along each axis, the
+    trajectory is bounded by its endpoints and its extremum, if it lies within the
+    interval.
+
+    Returns
+    =======
+    bounds : numpy.array
+        [xmin, xmax, ymin, ymax] of the space occupied by the ball, i.e. the bounding
+        box of the ball center is padded by R. If the ball is pocketed, the box is
+        empty (xmin > xmax)
+    """
+    bounds = np.empty(4, dtype=np.float64)
+
+    if s == const.pocketed:
+        bounds[0], bounds[1] = np.inf, -np.inf
+        bounds[2], bounds[3] = np.inf, -np.inf
+        return bounds
+
+    cx, cy = rvw[0, 0], rvw[0, 1]
+
+    if s == const.spinning or s == const.stationary:
+        bounds[0], bounds[1] = cx - R, cx + R
+        bounds[2], bounds[3] = cy - R, cy + R
+        return bounds
+
+    if t == np.inf:
+        bounds[0], bounds[1] = -np.inf, np.inf
+        bounds[2], bounds[3] = -np.inf, np.inf
+        return bounds
+
+    phi = utils.angle_fast(rvw[1])
+    v = np.linalg.norm(rvw[1])
+
+    u = (
+        np.array([1, 0, 0], dtype=np.float64)
+        if s == const.rolling
+        else utils.coordinate_rotation_fast(
+            utils.unit_vector_fast(utils.get_rel_velocity_fast(rvw, R)), -phi
+        )
+    )
+
+    K = -0.5 * mu * g
+    cos_phi = np.cos(phi)
+    sin_phi = np.sin(phi)
+
+    ax = K * (u[0] * cos_phi - u[1] * sin_phi)
+    ay = K * (u[0] * sin_phi + u[1] * cos_phi)
+    bx = v * cos_phi
+    by = v * sin_phi
+
+    for i, (a, b, c) in enumerate(((ax, bx, cx), (ay, by, cy))):
+        end = c + b * t + a * t**2
+        lower, upper = min(c, end), max(c, end)
+
+        if a != 0:
+            t_extremum = -b / (2 * a)
+            if 0 < t_extremum < t:
+                extremum = c + b * t_extremum + a * t_extremum**2
+                lower, upper = min(lower, extremum), max(upper, extremum)
+
+        bounds[2 * i] = lower - R
+        bounds[2 * i + 1] = upper + R
+
+    return bounds
+
+
 def get_ball_ball_collision_time(rvw1, rvw2, s1, s2, mu1, mu2, m1, m2, g1, g2, R):
     """Get the time until collision between 2 balls
 
@@ -486,21 +701,19 @@ def get_ball_linear_cushion_collision_time(rvw, s, lx, ly, l0, p1, p2, mu, m, g,
 
 
 @jit(nopython=True, cache=const.numba_cache)
-def get_ball_linear_cushion_collision_time_fast(
-    rvw, s, lx, ly, l0, p1, p2, direction, mu, m, g, R
-):
-    """Get time until collision between ball and linear cushion segment
+def get_ball_linear_cushion_collision_coeffs_fast(rvw, s, lx, ly, l0, mu, m, g, R):
+    """Get the quadratic coeffs of a ball's distance from a linear cushion's line
 
     (just-in-time compiled)
 
-    Notes
-    =====
-    - Speed comparison in
-      pooltool/tests/speed/get_ball_circular_cushion_collision_coeffs.py
+    Returns
+    =======
+    output : tuple
+        (A, B, C), where A*t**2 + B*t + C is the signed distance between the ball's
+        center and the line lx*x + ly*y + l0 = 0 after t seconds, multiplied by
+        sqrt(lx**2 + ly**2). The ball contacts the line when this is -R*sqrt(lx**2 +
+        ly**2) (direction 0) or R*sqrt(lx**2 + ly**2) (direction 1)
     """
-    if s == const.spinning or s == const.pocketed or s == const.stationary:
-        return np.inf
-
     phi = utils.angle_fast(rvw[1])
     v = np.linalg.norm(rvw[1])
 
@@ -521,22 +734,39 @@ def get_ball_linear_cushion_collision_time_fast(
     bx, by = v * cos_phi, v * sin_phi
     cx, cy = rvw[0, 0], rvw[0, 1]
 
-    A = lx * ax + ly * ay
-    B = lx * bx + ly * by
+    return lx * ax + ly * ay, lx * bx + ly * by, l0 + lx * cx + ly * cy
+
+
+@jit(nopython=True, cache=const.numba_cache)
+def get_ball_linear_cushion_collision_time_fast(
+    rvw, s, lx, ly, l0, p1, p2, direction, mu, m, g, R
+):
+    """Get time until collision between ball and linear cushion segment
+
+    (just-in-time compiled)
+
+    Notes
+    =====
+    - Speed comparison with `pooltool/tests/speed/suite.py --filter
+      kernels/get_ball_linear_cushion_collision_time/`
+    """
+    if s == const.spinning or s == const.pocketed or s == const.stationary:
+        return np.inf
+
+    A, B, C = get_ball_linear_cushion_collision_coeffs_fast(
+        rvw, s, lx, ly, l0, mu, m, g, R
+    )
+    offset = R * np.sqrt(lx**2 + ly**2)
 
     if direction == 0:
-        C = l0 + lx * cx + ly * cy + R * np.sqrt(lx**2 + ly**2)
-        root1, root2 = utils.quadratic_fast(A, B, C)
+        root1, root2 = utils.quadratic_fast(A, B, C + offset)
         roots = [root1, root2]
     elif direction == 1:
-        C = l0 + lx * cx + ly * cy - R * np.sqrt(lx**2 + ly**2)
-        root1, root2 = utils.quadratic_fast(A, B, C)
+        root1, root2 = utils.quadratic_fast(A, B, C - offset)
         roots = [root1, root2]
     else:
-        C1 = l0 + lx * cx + ly * cy + R * np.sqrt(lx**2 + ly**2)
-        C2 = l0 + lx * cx + ly * cy - R * np.sqrt(lx**2 + ly**2)
-        root1, root2 = utils.quadratic_fast(A, B, C1)
-        root3, root4 = utils.quadratic_fast(A, B, C2)
+        root1, root2 = utils.quadratic_fast(A, B, C + offset)
+        root3, root4 = utils.quadratic_fast(A, B, C - offset)
         roots = [root1, root2, root3, root4]
 
     min_time = np.inf
@@ -614,8 +844,8 @@ def get_ball_circular_cushion_collision_coeffs_fast(rvw, s, a, b, r, mu, m, g, R
 
     Notes
     =====
-    - Speed comparison in
-      pooltool/tests/speed/get_ball_circular_cushion_collision_coeffs.py
+    - Speed comparison with `pooltool/tests/speed/suite.py --filter
+      kernels/get_ball_circular_cushion_collision_coeffs/`
     """
 
     if s == const.spinning or s == const.pocketed or s == const.stationary:
@@ -733,8 +963,8 @@ def get_ball_pocket_collision_coeffs_fast(rvw, s, a, b, r, mu, m, g, R):
 
     Notes
     =====
-    - Speed comparison in
-      pooltool/tests/speed/get_ball_circular_cushion_collision_coeffs.py
+    - Speed comparison with `pooltool/tests/speed/suite.py --filter
+      kernels/get_ball_pocket_collision_coeffs/`
     """
 
     if s == const.spinning or s == const.pocketed or s == const.stationary:
@@ -796,6 +1026,208 @@ def get_ball_pocket_collision_time(rvw, s, a, b, r, mu, m, g, R):
     return roots.min() if len(roots) else np.inf
 
 
+@jit(nopython=True, cache=const.numba_cache)
+def get_ball_table_collision_times_fast(
+    rvw,
+    s,
+    mu,
+    m,
+    g,
+    R,
+    t,
+    linear_p1,
+    linear_p2,
+    linear_lx,
+    linear_ly,
+    linear_l0,
+    linear_direction,
+    circular_center,
+    circular_radius,
+    pocket_center,
+    pocket_radius,
+    counts,
+):
+    """Get the earliest collision of a ball with each kind of table geometry
+
+    (just-in-time compiled)
+
+    The table arguments are the arrays of a pooltool.objects.table.TableGeometry (see
+    `TableGeometry.get_detection_arrays`), so the ball is checked against every linear
+    cushion segment, circular cushion segment, and pocket of the table in one call.
+
+    t is the time until the ball's next transition. Collisions after the transition
+    never happen, so each piece of geometry is passed through increasingly expensive
+    tests, and dropped as soon as one rules out a collision within t:
+
+        1. reach: The geometry is out of reach (see `get_ball_reach_fast`). A linear
+           segment must be within R + reach of the ball's center, and the ball's center
+           must be within reach of the circle it crosses when it hits a circular
+           segment (radius r + R) or a pocket (radius r)
+        2. interval: The collision polynomial has no roots in [0, t] (see
+           `utils.has_root_in_interval_fast`)
+        3. roots: The collision polynomial is solved, and has no root within t
+
+    Pass np.inf to check all of the geometry. counts is a (4, 4) integer array of
+    detection counts (see pooltool.evolution.detection_tiers), to which the number of
+    candidates and the number of rejections by each tier are added. Rows 1, 2, and 3
+    are for linear segments, circular segments, and pockets.
+
+    Returns
+    =======
+    output : tuple
+        (linear_dtau, linear_index, circular_dtau, circular_index, pocket_dtau,
+        pocket_index), where each dtau is the time until the earliest collision with
+        that kind of geometry, and each index is the row of the colliding segment or
+        pocket. If there is no collision, dtau is np.inf and index is -1
+    """
+    linear_dtau, linear_index = np.inf, -1
+    circular_dtau, circular_index = np.inf, -1
+    pocket_dtau, pocket_index = np.inf, -1
+
+    if s == const.spinning or s == const.pocketed or s == const.stationary:
+        return (
+            linear_dtau,
+            linear_index,
+            circular_dtau,
+            circular_index,
+            pocket_dtau,
+            pocket_index,
+        )
+
+    cx, cy = rvw[0, 0], rvw[0, 1]
+    reach = get_ball_reach_fast(rvw, s, mu, g, t)
+
+    counts[1, 0] += len(linear_lx)
+    for i in range(len(linear_lx)):
+        # The distance between the ball's center and the segment
+        dx, dy = linear_p2[i, 0] - linear_p1[i, 0], linear_p2[i, 1] - linear_p1[i, 1]
+        px, py = cx - linear_p1[i, 0], cy - linear_p1[i, 1]
+        proj = min(max((px * dx + py * dy) / (dx**2 + dy**2), 0.0), 1.0)
+        if np.sqrt((px - proj * dx) ** 2 + (py - proj * dy) ** 2) > R + reach:
+            counts[1, 1] += 1
+            continue
+
+        A, B, C = get_ball_linear_cushion_collision_coeffs_fast(
+            rvw, s, linear_lx[i], linear_ly[i], linear_l0[i], mu, m, g, R
+        )
+        offset = R * np.sqrt(linear_lx[i] ** 2 + linear_ly[i] ** 2)
+        if not (
+            (
+                linear_direction[i] != 1
+                and utils.has_root_in_interval_fast(np.array([A, B, C + offset]), t)
+            )
+            or (
+                linear_direction[i] != 0
+                and utils.has_root_in_interval_fast(np.array([A, B, C - offset]), t)
+            )
+        ):
+            counts[1, 2] += 1
+            continue
+
+        dtau_E = get_ball_linear_cushion_collision_time_fast(
+            rvw,
+            s,
+            linear_lx[i],
+            linear_ly[i],
+            linear_l0[i],
+            linear_p1[i],
+            linear_p2[i],
+            linear_direction[i],
+            mu,
+            m,
+            g,
+            R,
+        )
+        if not dtau_E <= t:
+            counts[1, 3] += 1
+
+        if dtau_E < linear_dtau:
+            linear_dtau, linear_index = dtau_E, i
+
+    coeffs = np.empty((len(circular_radius), 5), dtype=np.float64)
+    candidates = np.empty(len(circular_radius), dtype=np.int64)
+    num_candidates = 0
+    counts[2, 0] += len(circular_radius)
+    for i in range(len(circular_radius)):
+        d = np.sqrt(
+            (cx - circular_center[i, 0]) ** 2 + (cy - circular_center[i, 1]) ** 2
+        )
+        if abs(d - circular_radius[i] - R) > reach:
+            counts[2, 1] += 1
+            continue
+
+        coeffs[num_candidates] = get_ball_circular_cushion_collision_coeffs_fast(
+            rvw,
+            s,
+            circular_center[i, 0],
+            circular_center[i, 1],
+            circular_radius[i],
+            mu,
+            m,
+            g,
+            R,
+        )
+        candidates[num_candidates] = i
+        num_candidates += 1
+
+    dtau_Es, skipped = utils.min_real_quartic_roots_within_fast(
+        coeffs[:num_candidates], np.full(num_candidates, t), const.tol
+    )
+    for n in range(num_candidates):
+        if skipped[n]:
+            counts[2, 2] += 1
+        elif not dtau_Es[n] <= t:
+            counts[2, 3] += 1
+
+        if dtau_Es[n] < circular_dtau:
+            circular_dtau, circular_index = dtau_Es[n], candidates[n]
+
+    coeffs = np.empty((len(pocket_radius), 5), dtype=np.float64)
+    candidates = np.empty(len(pocket_radius), dtype=np.int64)
+    num_candidates = 0
+    counts[3, 0] += len(pocket_radius)
+    for i in range(len(pocket_radius)):
+        d = np.sqrt((cx - pocket_center[i, 0]) ** 2 + (cy - pocket_center[i, 1]) ** 2)
+        if abs(d - pocket_radius[i]) > reach:
+            counts[3, 1] += 1
+            continue
+
+        coeffs[num_candidates] = get_ball_pocket_collision_coeffs_fast(
+            rvw,
+            s,
+            pocket_center[i, 0],
+            pocket_center[i, 1],
+            pocket_radius[i],
+            mu,
+            m,
+            g,
+            R,
+        )
+        candidates[num_candidates] = i
+        num_candidates += 1
+
+    dtau_Es, skipped = utils.min_real_quartic_roots_within_fast(
+        coeffs[:num_candidates], np.full(num_candidates, t), const.tol
+    )
+    for n in range(num_candidates):
+        if skipped[n]:
+            counts[3, 2] += 1
+        elif not dtau_Es[n] <= t:
+            counts[3, 3] += 1
+
+        if dtau_Es[n] < pocket_dtau:
+            pocket_dtau, pocket_index = dtau_Es[n], candidates[n]
+
+    return (
+        linear_dtau,
+        linear_index,
+        circular_dtau,
+        circular_index,
+        pocket_dtau,
+        pocket_index,
+    )
+
+
 def get_slide_time(rvw, R, u_s, g):
     return 2 * np.linalg.norm(utils.get_rel_velocity_fast(rvw, R)) / (7 * u_s * g)
 
@@ -832,13 +1264,16 @@ def get_ball_energy(rvw, R, m):
 
     Currently calculating linear and rotational kinetic energy. Need to add potential
     energy if z-axis is freed
+
+    The energies of many balls can be calculated at once by passing a (N, 3, 3) array
+    of states and length-N arrays of R and m (see pooltool.objects.ball.SystemState)
     """
     # Linear
-    LKE = m * np.linalg.norm(rvw[1]) ** 2 / 2
+    LKE = m * np.linalg.norm(rvw[..., 1, :], axis=-1) ** 2 / 2
 
     # Rotational
     I = 2 / 5 * m * R**2
-    RKE = I * np.linalg.norm(rvw[2]) ** 2 / 2
+    RKE = I * np.linalg.norm(rvw[..., 2, :], axis=-1) ** 2 / 2
 
     return LKE + RKE
 
@@ -880,6 +1315,117 @@ def evolve_ball_motion(state, rvw, R, m, u_s, u_sp, u_r, g, t):
             return evolve_perpendicular_spin_state(rvw, R, u_sp, g, t), const.spinning
 
 
+@jit(nopython=True, cache=const.numba_cache)
+def evolve_balls_fast(rvw, s, R, m, u_s, u_sp, u_r, g, t):
+    """Evolve the states of many balls an amount of time t, in place
+
+    (just-in-time compiled)
+
+    This is equivalent to calling evolve_ball_motion for each ball, except the arrays
+    of states are modified rather than copied. Arguments are arrays with a leading
+    dimension of length N, e.g. rvw is (N, 3, 3) and s is (N,) (see
+    pooltool.objects.ball.SystemState).
+    """
+    for i in range(len(s)):
+        s[i] = evolve_ball_motion_inplace(
+            s[i], rvw[i], R[i], m[i], u_s[i], u_sp[i], u_r[i], g[i], t
+        )
+
+
+@jit(nopython=True, cache=const.numba_cache)
+def evolve_ball_motion_inplace(state, rvw, R, m, u_s, u_sp, u_r, g, t):
+    """Variant of evolve_ball_motion that modifies rvw and returns the new state"""
+    if state == const.stationary or state == const.pocketed:
+        return state
+
+    if state == const.sliding:
+        dtau_E_slide = get_slide_time_fast(rvw, R, u_s, g)
+
+        if t >= dtau_E_slide:
+            evolve_slide_state_inplace(rvw, R, u_s, u_sp, g, dtau_E_slide)
+            state = const.rolling
+            t -= dtau_E_slide
+        else:
+            evolve_slide_state_inplace(rvw, R, u_s, u_sp, g, t)
+            return const.sliding
+
+    if state == const.rolling:
+        dtau_E_roll = get_roll_time_fast(rvw, u_r, g)
+
+        if t >= dtau_E_roll:
+            evolve_roll_state_inplace(rvw, R, u_r, u_sp, g, dtau_E_roll)
+            state = const.spinning
+            t -= dtau_E_roll
+        else:
+            evolve_roll_state_inplace(rvw, R, u_r, u_sp, g, t)
+            return const.rolling
+
+    if state == const.spinning:
+        dtau_E_spin = get_spin_time_fast(rvw, R, u_sp, g)
+
+        if t >= dtau_E_spin:
+            rvw[2, 2] = evolve_perpendicular_spin_component(
+                rvw[2, 2], R, u_sp, g, dtau_E_spin
+            )
+            return const.stationary
+        else:
+            rvw[2, 2] = evolve_perpendicular_spin_component(rvw[2, 2], R, u_sp, g, t)
+            return const.spinning
+
+    return state
+
+
+@jit(nopython=True, cache=const.numba_cache)
+def evolve_slide_state_inplace(rvw, R, u_s, u_sp, g, t):
+    """Variant of evolve_slide_state that modifies rvw
+
+    Rather than rotating into the ball frame and back, the equations of motion are
+    expressed directly in the table frame, where the friction acts opposite to the
+    relative velocity unit vector u
+    """
+    if t == 0:
+        return
+
+    # Relative velocity unit vector (its z-component is 0)
+    ux = rvw[1, 0] - R * rvw[2, 1]
+    uy = rvw[1, 1] + R * rvw[2, 0]
+    norm = np.sqrt(ux**2 + uy**2)
+    ux, uy = ux / norm, uy / norm
+
+    a = u_s * g
+    rvw[0, 0] += rvw[1, 0] * t - 0.5 * a * t**2 * ux
+    rvw[0, 1] += rvw[1, 1] * t - 0.5 * a * t**2 * uy
+    rvw[1, 0] -= a * t * ux
+    rvw[1, 1] -= a * t * uy
+    rvw[2, 0] -= 5 / 2 / R * a * t * uy
+    rvw[2, 1] += 5 / 2 / R * a * t * ux
+    rvw[2, 2] = evolve_perpendicular_spin_component(rvw[2, 2], R, u_sp, g, t)
+
+
+@jit(nopython=True, cache=const.numba_cache)
+def evolve_roll_state_inplace(rvw, R, u_r, u_sp, g, t):
+    """Variant of evolve_roll_state that modifies rvw"""
+    if t == 0:
+        return
+
+    vx, vy, vz = rvw[1, 0], rvw[1, 1], rvw[1, 2]
+    norm = np.sqrt(vx**2 + vy**2 + vz**2)
+    ux, uy, uz = vx / norm, vy / norm, vz / norm
+
+    a = u_r * g
+    rvw[0, 0] += vx * t - 0.5 * a * t**2 * ux
+    rvw[0, 1] += vy * t - 0.5 * a * t**2 * uy
+    rvw[0, 2] += vz * t - 0.5 * a * t**2 * uz
+    rvw[1, 0] = vx - a * t * ux
+    rvw[1, 1] = vy - a * t * uy
+    rvw[1, 2] = vz - a * t * uz
+
+    # The ball rolls without slipping, i.e. w = (z x v) / R
+    rvw[2, 0] = -rvw[1, 1] / R
+    rvw[2, 1] = rvw[1, 0] / R
+    rvw[2, 2] = evolve_perpendicular_spin_component(rvw[2, 2], R, u_sp, g, t)
+
+
 @jit(nopython=True, cache=const.numba_cache)
 def evolve_state_motion(state, rvw, R, m, u_s, u_sp, u_r, g, t):
     """Variant of evolve_ball_motion that does not respect motion transition events"""
@@ -989,6 +1535,227 @@ def evolve_perpendicular_spin_state(rvw, R, u_sp, g, t):
     return rvw
 
 
+@jit(nopython=True, cache=const.numba_cache)
+def evolve_ball_motion_times(state, rvw, R, m, u_s, u_sp, u_r, g, t):
+    """Variant of evolve_ball_motion for an array of times
+
+    (just-in-time compiled)
+
+    The motion of the ball is split into segments, one per motion state, which start at
+    the ball's transition times. The states at each time are then calculated by
+    evolving the start of its segment with the array-of-times variant of the segment's
+    motion state.
+
+    Returns
+    =======
+    output : (rvws, states)
+        rvws[i] and states[i] are what evolve_ball_motion returns for t[i]
+    """
+    rvws = np.empty((len(t), 3, 3), dtype=np.float64)
+    states = np.empty(len(t), dtype=np.int64)
+
+    # The motion state, start time, and start state of each segment. The first segment
+    # extends back to -inf, and the last to +inf
+    seg_states = np.empty(4, dtype=np.int64)
+    seg_starts = np.empty(4, dtype=np.float64)
+    seg_rvws = np.empty((4, 3, 3), dtype=np.float64)
+
+    num_segs = 0
+    t_start = -np.inf
+    while True:
+        seg_states[num_segs] = state
+        seg_starts[num_segs] = t_start
+        seg_rvws[num_segs] = rvw
+        num_segs += 1
+
+        if state == const.sliding:
+            dtau_E = get_slide_time_fast(rvw, R, u_s, g)
+            rvw = evolve_slide_state(rvw, R, m, u_s, u_sp, g, dtau_E)
+            state = const.rolling
+        elif state == const.rolling:
+            dtau_E = get_roll_time_fast(rvw, u_r, g)
+            rvw = evolve_roll_state(rvw, R, u_r, u_sp, g, dtau_E)
+            state = const.spinning
+        elif state == const.spinning:
+            dtau_E = get_spin_time_fast(rvw, R, u_sp, g)
+            rvw = evolve_perpendicular_spin_state(rvw, R, u_sp, g, dtau_E)
+            state = const.stationary
+        else:
+            break
+
+        t_start = max(t_start, 0) + dtau_E
+
+    for k in range(num_segs):
+        t_end = seg_starts[k + 1] if k + 1 < num_segs else np.inf
+        mask = (t >= seg_starts[k]) & (t < t_end)
+        if not mask.any():
+            continue
+
+        # Times relative to the start of the segment. The first segment starts at 0
+        dt = t[mask] - max(seg_starts[k], 0)
+        rvw_k = seg_rvws[k]
+
+        if seg_states[k] == const.sliding:
+            rvws[mask] = evolve_slide_state_times(rvw_k, R, m, u_s, u_sp, g, dt)
+        elif seg_states[k] == const.rolling:
+            rvws[mask] = evolve_roll_state_times(rvw_k, R, u_r, u_sp, g, dt)
+        elif seg_states[k] == const.spinning:
+            rvws[mask] = evolve_perpendicular_spin_state_times(rvw_k, R, u_sp, g, dt)
+        else:
+            rvws[mask] = rvw_k
+
+        states[mask] = seg_states[k]
+
+    return rvws, states
+
+
+@jit(nopython=True, cache=const.numba_cache)
+def sample_ball_motion_fast(state, rvw, R, m, u_s, u_sp, u_r, g, dtau, dt):
+    """Sample the motion of a ball between two events (just-in-time compiled)
+
+    This samples the states used by SystemHistory.continuize. A step counter is advanced
+    by dt until it reaches dtau, and for each step, the ball state evolved one step
+    further is recorded. In other words, the state recorded for step k * dt is the
+    state at (k + 1) * dt. The final sample is the state at dtau.
+
+    Returns
+    =======
+    output : (steps, rvws, states)
+        steps has one entry per step, and rvws and states have one entry per step plus
+        the final sample
+    """
+    num_steps = 0
+    step = 0.0
+    while step < dtau:
+        step += dt
+        num_steps += 1
+
+    steps = np.empty(num_steps + 1, dtype=np.float64)
+    steps[0] = 0.0
+    for k in range(num_steps):
+        steps[k + 1] = steps[k] + dt
+
+    rvws = np.empty((num_steps + 1, 3, 3), dtype=np.float64)
+    states = np.empty(num_steps + 1, dtype=np.int64)
+
+    if num_steps == 0:
+        # dtau is 0, so the final sample is the state itself
+        rvws[0], states[0] = rvw, state
+        return steps[:0], rvws, states
+
+    rvws[:num_steps], states[:num_steps] = evolve_ball_motion_times(
+        state, rvw, R, m, u_s, u_sp, u_r, g, steps[1:]
+    )
+
+    # The last step overshoots dtau by less than dt, which is undone to get the state
+    # at dtau
+    rvws[num_steps], states[num_steps] = evolve_ball_motion(
+        states[num_steps - 1],
+        rvws[num_steps - 1],
+        R,
+        m,
+        u_s,
+        u_sp,
+        u_r,
+        g,
+        dtau - steps[num_steps],
+    )
+
+    return steps[:num_steps], rvws, states
+
+
+@jit(nopython=True, cache=const.numba_cache)
+def evolve_slide_state_times(rvw, R, m, u_s, u_sp, g, t):
+    """Variant of evolve_slide_state for an array of times
+
+    (just-in-time compiled)
+
+    Like evolve_slide_state_inplace, the equations of motion are expressed in the table
+    frame. Returns an array of shape (len(t), 3, 3)
+    """
+    rvws = np.empty((len(t), 3, 3), dtype=np.float64)
+
+    # Relative velocity unit vector (its z-component is 0)
+    ux = rvw[1, 0] - R * rvw[2, 1]
+    uy = rvw[1, 1] + R * rvw[2, 0]
+    norm = np.sqrt(ux**2 + uy**2)
+    ux, uy = ux / norm, uy / norm
+
+    a = u_s * g
+    rvws[:, 0, 0] = rvw[0, 0] + rvw[1, 0] * t - 0.5 * a * t**2 * ux
+    rvws[:, 0, 1] = rvw[0, 1] + rvw[1, 1] * t - 0.5 * a * t**2 * uy
+    rvws[:, 0, 2] = rvw[0, 2]
+    rvws[:, 1, 0] = rvw[1, 0] - a * t * ux
+    rvws[:, 1, 1] = rvw[1, 1] - a * t * uy
+    rvws[:, 1, 2] = rvw[1, 2]
+    rvws[:, 2, 0] = rvw[2, 0] - 5 / 2 / R * a * t * uy
+    rvws[:, 2, 1] = rvw[2, 1] + 5 / 2 / R * a * t * ux
+    rvws[:, 2, 2] = evolve_perpendicular_spin_component_times(rvw[2, 2], R, u_sp, g, t)
+
+    return rvws
+
+
+@jit(nopython=True, cache=const.numba_cache)
+def evolve_roll_state_times(rvw, R, u_r, u_sp, g, t):
+    """Variant of evolve_roll_state for an array of times
+
+    (just-in-time compiled)
+
+    Returns an array of shape (len(t), 3, 3)
+    """
+    rvws = np.empty((len(t), 3, 3), dtype=np.float64)
+
+    v_0 = rvw[1]
+    v_0_hat = utils.unit_vector_fast(v_0)
+
+    a = u_r * g
+    for j in range(3):
+        rvws[:, 0, j] = rvw[0, j] + v_0[j] * t - 0.5 * a * t**2 * v_0_hat[j]
+        rvws[:, 1, j] = v_0[j] - a * t * v_0_hat[j]
+
+    # The ball rolls without slipping, i.e. w = (z x v) / R
+    rvws[:, 2, 0] = -rvws[:, 1, 1] / R
+    rvws[:, 2, 1] = rvws[:, 1, 0] / R
+    rvws[:, 2, 2] = evolve_perpendicular_spin_component_times(rvw[2, 2], R, u_sp, g, t)
+
+    return rvws
+
+
+@jit(nopython=True, cache=const.numba_cache)
+def evolve_perpendicular_spin_component_times(wz, R, u_sp, g, t):
+    """Variant of evolve_perpendicular_spin_component for an array of times
+
+    (just-in-time compiled)
+    """
+    if np.abs(wz) < const.tol:
+        return np.full(len(t), wz)
+
+    alpha = 5 * u_sp * g / (2 * R)
+
+    # You can't decay past 0 angular velocity
+    t = np.minimum(t, np.abs(wz) / alpha)
+
+    # Always decay towards 0, whether spin is +ve or -ve
+    sign = 1 if wz > 0 else -1
+
+    return wz - sign * alpha * t
+
+
+@jit(nopython=True, cache=const.numba_cache)
+def evolve_perpendicular_spin_state_times(rvw, R, u_sp, g, t):
+    """Variant of evolve_perpendicular_spin_state for an array of times
+
+    (just-in-time compiled)
+
+    Returns an array of shape (len(t), 3, 3)
+    """
+    rvws = np.empty((len(t), 3, 3), dtype=np.float64)
+    rvws[:] = rvw
+    rvws[:, 2, 2] = evolve_perpendicular_spin_component_times(rvw[2, 2], R, u_sp, g, t)
+
+    return rvws
+
+
 def cue_strike(m, M, R, V0, phi, theta, a, b):
     """Strike a ball
                               , - ~  ,
@@ -1084,4 +1851,4 @@ def cue_strike(m, M, R, V0, phi, theta, a, b):
 
 
 def is_overlapping(rvw1, rvw2, R1, R2):
-    return np.linalg.norm(rvw1[0] - rvw2[0]) < (R1 + R2)
+    return np.linalg.norm(rvw1[..., 0, :] - rvw2[..., 0, :], axis=-1) < (R1 + R2)
@@ -1,18 +1,17 @@
 #! /usr/bin/env python
 
-import tempfile
+import copy
 from pathlib import Path
 
-from direct.interval.IntervalGlobal import Func, Parallel, Sequence, Wait
-from panda3d.direct import HideInterval, ShowInterval
+import numpy as np
 
-import pooltool.ani as ani
 import pooltool.constants as c
 import pooltool.physics as physics
 import pooltool.utils as utils
 from pooltool.error import ConfigError
 from pooltool.events import (
     Events,
+    EventStates,
     NonEvent,
     class_collision,
     class_none,
@@ -24,9 +23,12 @@ from pooltool.events import (
     type_stick_ball,
 )
 from pooltool.evolution import EvolveShotEventBased
-from pooltool.objects.ball import BallHistory, ball_from_dict
+from pooltool.objects.ball import BallHistory, SystemState, ball_from_dict
 from pooltool.objects.cue import cue_from_dict
 from pooltool.objects.table import table_from_dict
+from pooltool.utils import LazyModule
+
+ani = LazyModule("pooltool.ani")
 
 
 class SystemHistory(object):
@@ -35,6 +37,26 @@ class SystemHistory(object):
         self.events = Events()
         self.continuized = False
 
+        # Which ball states the histories hold (see
+        # `EvolveShotEventBased.evolution_algorithm`)
+        self.history_mode = "all"
+
+    @property
+    def events(self):
+        """The events of the system, which are built on demand if pending
+
+        See `SystemState.materialize`
+        """
+        state = getattr(self, "state", None)
+        if state is not None:
+            state.materialize()
+
+        return self._events
+
+    @events.setter
+    def events(self, events):
+        self._events = events
+
     def init_history(self):
         """Add an initializing NonEvent"""
         event = NonEvent(t=0)
@@ -57,6 +79,13 @@ class SystemHistory(object):
 
         self.t = 0
         self.continuized = False
+        self.history_mode = "all"
+
+        # Pending events and histories would be erased anyway
+        self.state.materializer = None
+
+        # Events of earlier simulations keep the buffer of their states
+        self.state.event_states = EventStates()
 
         for ball in self.balls.values():
             ball.history.reset()
@@ -66,10 +95,125 @@ class SystemHistory(object):
 
         self.events.reset()
 
+    def checkpoint(self, i=-1):
+        """Snapshot the state of the system after an event
+
+        The snapshot is taken from the events and histories, so the system doesn't have
+        to be resimulated. See `restore`.
+
+        Parameters
+        ==========
+        i : int, -1
+            The index of the event in self.events
+
+        Returns
+        =======
+        checkpoint : pooltool.system.Checkpoint
+        """
+        return Checkpoint(self, i)
+
+    def restore(self, checkpoint):
+        """Return the system to a checkpoint, so the simulation can be resumed from it
+
+        The ball states, time, and pocket contents are set to those of the checkpoint,
+        and the events and histories after it are removed. Parameters of the balls and
+        table can then be modified before the simulation is continued with `resume`.
+        A checkpoint can be restored any number of times, as long as the events up to
+        it haven't been removed (e.g. by `simulate` or by restoring an earlier
+        checkpoint).
+
+        Parameters
+        ==========
+        checkpoint : pooltool.system.Checkpoint
+            A checkpoint of this system (see `checkpoint`)
+        """
+        events = self.events
+        if checkpoint.index >= len(events) or (
+            events[checkpoint.index] is not checkpoint.event
+        ):
+            raise ConfigError(
+                "SystemHistory.restore :: The events up to the checkpoint are no "
+                "longer in the history of this system"
+            )
+
+        events.truncate(checkpoint.index + 1)
+
+        for ball_id, ball in self.balls.items():
+            n = checkpoint.history_lengths[ball_id]
+            ball.history.truncate(n)
+            ball.events.truncate(n)
+
+        self.set_from_checkpoint(checkpoint)
+
+    def set_from_checkpoint(self, checkpoint):
+        """Set the ball states, time, and pocket contents to those of a checkpoint
+
+        Unlike `restore`, the events and histories are left as they are, except for the
+        continuized histories, which are removed.
+
+        Parameters
+        ==========
+        checkpoint : pooltool.system.Checkpoint
+            A checkpoint of this system or of a system with the same balls and pockets
+        """
+        for ball_id, ball in self.balls.items():
+            ball.history_cts.reset()
+
+            index = checkpoint.ids.index(ball_id)
+            ball.set(checkpoint.rvw[index].copy(), checkpoint.s[index], checkpoint.t)
+            ball.update_next_transition_event()
+
+        for pocket_id, contains in checkpoint.pocket_contents.items():
+            self.table.pockets[pocket_id].contains = set(contains)
+
+        self.t = checkpoint.t
+        self.continuized = False
+
     def set_from_history(self, i):
-        """Set the ball states according to a history index"""
+        """Set the ball states according to a history index
+
+        If the histories hold the states of every ball after each event (i.e.
+        `self.history_mode` is 'all'), the ith history entry of each ball is the state
+        after the ith event. If they hold only the states of the agents of each event
+        ('agents'), the states at the time of the ith event are reconstructed from the
+        last event of each ball (see `Ball.state_at`). If other events occurred at the
+        same time, their outcomes are included.
+        """
+        if self.history_mode == "all" or i == 0:
+            for ball in self.balls.values():
+                ball.set_from_history(i)
+            return
+
+        t = self.events[i].time
         for ball in self.balls.values():
-            ball.set_from_history(i)
+            rvw, s = ball.state_at(t)
+            ball.set(rvw, s, t)
+
+    def state_at(self, t):
+        """Get the states of all balls at arbitrary times
+
+        See Ball.state_at
+
+        Parameters
+        ==========
+        t : float or array-like
+            The time(s)
+
+        Returns
+        =======
+        output : (rvw, s)
+            rvw[..., i, :, :] and s[..., i] are the states of the ith ball (in the order
+            of self.balls) at the time(s) t. If t is a float, rvw has shape (N, 3, 3)
+            and s has shape (N,). Otherwise, they have shapes (len(t), N, 3, 3) and
+            (len(t), N)
+        """
+        states = [ball.state_at(t) for ball in self.balls.values()]
+        axis = 0 if np.ndim(t) == 0 else 1
+
+        return (
+            np.stack([rvw for rvw, _ in states], axis=axis),
+            np.stack([s for _, s in states], axis=axis),
+        )
 
     def update_history(self, event, update_all=False):
         """Updates the history for agents of an event
@@ -107,18 +251,17 @@ class SystemHistory(object):
           event, and one immediately after.  This ensures that during lerp (linear
           interpolation) operations, the event is never interpolated over with any
           significant amount of time.
-        - FIXME This is a very inefficient function that could be radically sped up if
-          physics.evolve_ball_motion and/or its functions had vectorized operations for
-          arrays of time values.
+        - Each segment between two events is sampled with a single call to
+          physics.sample_ball_motion_fast, which evolves the ball to every timepoint
+          of the segment at once.
         - FIXME This function doesn't do a good job. Reduce dt to 0.1 and see the
           results...
         """
         for ball in self.balls.values():
-            # Create a new history
-            cts_history = BallHistory()
-
             # Add t=0
-            cts_history.add(ball.history.rvw[0], ball.history.s[0], 0)
+            rvws = [np.array([ball.history.rvw[0]])]
+            ss = [np.array([ball.history.s[0]])]
+            ts = [np.array([0.0])]
 
             events = self.events.filter_ball(ball, keep_nonevent=True)
             for n in range(len(events) - 1):
@@ -151,61 +294,133 @@ class SystemHistory(object):
                         f"'{curr_event.event_class}' is not implemented"
                     )
 
-                step = 0
-                while step < dtau_E:
-                    rvw, s = physics.evolve_ball_motion(
-                        state=s,
-                        rvw=rvw,
-                        R=ball.R,
-                        m=ball.m,
-                        u_s=ball.u_s,
-                        u_sp=ball.u_sp,
-                        u_r=ball.u_r,
-                        g=ball.g,
-                        t=dt,
-                    )
-
-                    cts_history.add(rvw, s, curr_event.time + step)
-                    step += dt
-
-                # By this point the history has been populated with equally spaced
-                # timesteps `dt` starting from curr_event.time up until--but not
-                # including--next_event.time.  There still exists a `remainder` of time
-                # that is strictly less than `dt`. I evolve the state this additional
-                # amount which gives the state of the system at the time of the next
-                # event. This makes sure there exists a timepoint precisely at each
+                # The timepoints are equally spaced by `dt`, starting from
+                # curr_event.time up until--but not including--next_event.time. The
+                # last state is evolved by the `remainder` of time that is strictly
+                # less than `dt`, which gives the state of the ball at the time of the
+                # next event. This makes sure there exists a timepoint precisely at each
                 # event, which is helpful for things like smooth, nonintersecting
                 # animations
-                remainder = dtau_E - step
-                rvw, s = physics.evolve_ball_motion(
-                    state=s,
-                    rvw=rvw,
-                    R=ball.R,
-                    m=ball.m,
-                    u_s=ball.u_s,
-                    u_sp=ball.u_sp,
-                    u_r=ball.u_r,
-                    g=ball.g,
-                    t=remainder,
+                steps, segment_rvws, segment_ss = physics.sample_ball_motion_fast(
+                    s,
+                    np.asarray(rvw, dtype=np.float64),
+                    ball.R,
+                    ball.m,
+                    ball.u_s,
+                    ball.u_sp,
+                    ball.u_r,
+                    ball.g,
+                    dtau_E,
+                    dt,
                 )
 
-                cts_history.add(rvw, s, next_event.time - c.tol)
+                rvws.append(segment_rvws)
+                ss.append(segment_ss)
+                ts.append(curr_event.time + steps)
+                ts.append(np.array([next_event.time - c.tol]))
 
             # Attach the newly created history to the ball, overwriting the existing
             # history
+            cts_history = BallHistory()
+            cts_history.set(
+                np.concatenate(rvws), np.concatenate(ss), np.concatenate(ts)
+            )
             ball.attach_history_cts(cts_history)
-            ball.history_cts.vectorize()
 
         self.continuized = True
 
 
+class Checkpoint(object):
+    def __init__(self, system, i=-1):
+        """The state of a simulated system after one of its events
+
+        See SystemHistory.checkpoint and SystemHistory.restore. The state of each ball
+        is taken from the last entry of its history at or before the event, and evolved
+        until the time of the event. Other events at the same time as the event (see
+        `EvolveShotEventBased.get_simultaneous_event`) are only included if they come
+        before it.
+
+        Parameters
+        ==========
+        system : pooltool.system.System
+            A simulated system
+        i : int, -1
+            The index of the event in system.events
+        """
+        events = system.events
+        self.index = i % len(events)
+        self.event = events[self.index]
+        self.t = self.event.time
+
+        # The events after this one that happened at the same time, and the balls
+        # pocketed after this one
+        tied, pocketed_after = set(), set()
+        for event in events[self.index + 1 :]:
+            if event.time == self.t:
+                tied.add(id(event))
+            if event.event_type == type_ball_pocket:
+                pocketed_after.add(event.agents[0].id)
+
+        self.ids = list(system.balls.keys())
+        self.rvw = np.empty((len(self.ids), 3, 3), dtype=np.float64)
+        self.s = np.empty(len(self.ids), dtype=np.int64)
+
+        # The number of history entries (and ball events) of each ball up to the event
+        self.history_lengths = {}
+
+        for index, ball in enumerate(system.balls.values()):
+            n = np.searchsorted(ball.history.t, self.t, side="right")
+            while n > 1 and id(ball.events[n - 1]) in tied:
+                n -= 1
+
+            self.history_lengths[ball.id] = n
+
+            rvw, s, t = ball.history.get_state(n - 1)
+            self.rvw[index], self.s[index] = physics.evolve_ball_motion(
+                s,
+                np.asarray(rvw, dtype=np.float64),
+                ball.R,
+                ball.m,
+                ball.u_s,
+                ball.u_sp,
+                ball.u_r,
+                ball.g,
+                self.t - t,
+            )
+
+        self.pocket_contents = {
+            pocket_id: pocket.contains - pocketed_after
+            for pocket_id, pocket in system.table.pockets.items()
+        }
+
+    def __repr__(self):
+        lines = [
+            f"<{self.__class__.__name__} object at {hex(id(self))}>",
+            f" ├── event : {self.index}",
+            f" └── time  : {self.t}",
+        ]
+
+        return "\n".join(lines) + "\n"
+
+
 class SystemRender(object):
+    # The animation state is only stored in the system once the system is animated.
+    # Until then, these are its values (see `reset_animation`)
+    shot_animation = None
+    ball_animations = None
+    stroke_animation = None
+    user_stroke = False
+    playback_speed = 1
+
     def __init__(self):
-        self.reset_animation()
+        pass
 
     def init_shot_animation(
         self, animate_stroke=True, trailing_buffer=0, leading_buffer=0
     ):
+        from direct.interval.IntervalGlobal import Func, Parallel, Sequence, Wait
+        from panda3d.direct import HideInterval, ShowInterval
+
         if not len(self.events):
             try:
                 self.simulate()
@@ -356,6 +571,19 @@ class System(SystemHistory, SystemRender, EvolveShotEventBased):
             self.t = None
             self.meta = None
 
+    @property
+    def balls(self):
+        """The balls of the system, by ID
+
+        Assigning balls is the same as calling `set_balls`, so the states of the balls
+        are always packed into self.state (see `pack_balls`)
+        """
+        return self._balls
+
+    @balls.setter
+    def balls(self, balls):
+        self.set_balls(balls)
+
     def set_cue(self, cue):
         self.cue = cue
 
@@ -363,7 +591,42 @@ class System(SystemHistory, SystemRender, EvolveShotEventBased):
         self.table = table
 
     def set_balls(self, balls):
-        self.balls = balls
+        # Pending events and histories belong to the current balls
+        state = getattr(self, "state", None)
+        if state is not None:
+            state.materialize()
+
+        self._balls = balls
+        self.pack_balls()
+
+    def pack_balls(self):
+        """Store the states and parameters of all balls in a single SystemState
+
+        Afterwards, self.state.rvw[i] is the state of the ith ball in self.balls, and
+        so on for each field of SystemState. Each ball remains usable as before, since
+        its attributes are views into self.state (see `Ball.attach_system_state`).
+        """
+        balls = self.balls.values() if self.balls is not None else []
+
+        self.state = SystemState(len(balls))
+        for index, ball in enumerate(balls):
+            ball.attach_system_state(self.state, index)
+
+    def ensure_packed(self):
+        """Pack the balls if self.state doesn't hold exactly the balls of self.balls
+
+        Assigning self.balls packs the balls, but modifying it in place (e.g. adding a
+        ball to it) doesn't. Since only the balls in self.state are evolved, this is
+        called before simulating.
+        """
+        balls = self.balls.values() if self.balls is not None else []
+        if len(self.state) == len(balls) and all(
+            getattr(ball, "system_state", None) is self.state and ball.index == index
+            for index, ball in enumerate(balls)
+        ):
+            return
+
+        self.set_balls(self.balls)
 
     def set_meta(self, meta):
         """Define any meta data for the shot
@@ -384,11 +647,8 @@ class System(SystemHistory, SystemRender, EvolveShotEventBased):
         self.meta = meta
 
     def get_system_energy(self):
-        energy = 0
-        for ball in self.balls.values():
-            energy += physics.get_ball_energy(ball.rvw, ball.R, ball.m)
-
-        return energy
+        self.ensure_packed()
+        return physics.get_ball_energy(self.state.rvw, self.state.R, self.state.m).sum()
 
     def reset_balls(self):
         """Reset balls to their initial states, i.e. ball.history.*[0]"""
@@ -399,15 +659,14 @@ class System(SystemHistory, SystemRender, EvolveShotEventBased):
                 pass
 
     def is_balls_overlapping(self):
-        for ball1 in self.balls.values():
-            for ball2 in self.balls.values():
-                if ball1 is ball2:
-                    continue
-
-                if physics.is_overlapping(ball1.rvw, ball2.rvw, ball1.R, ball2.R):
-                    return True
+        self.ensure_packed()
+        rvw, R = self.state.rvw, self.state.R
+        overlapping = physics.is_overlapping(
+            rvw[:, None], rvw[None, :], R[:, None], R[None, :]
+        )
+        np.fill_diagonal(overlapping, False)
 
-        return False
+        return overlapping.any()
 
     def set_system_state(self):
         raise NotImplementedError(
@@ -430,6 +689,7 @@ class System(SystemHistory, SystemRender, EvolveShotEventBased):
 
         d["events"] = self.events.as_dict()
         d["meta"] = self.meta
+        d["history_mode"] = self.history_mode
 
         return d
 
@@ -511,33 +771,160 @@ class System(SystemHistory, SystemRender, EvolveShotEventBased):
 
     def load(self, path):
         """Load a pickle-stored system state"""
-        self.balls, self.table, self.cue, self.events, self.meta = self.from_dict(
-            utils.load_pickle(path)
-        )
+        self.load_from_dict(utils.load_pickle(path))
 
     def load_from_dict(self, d):
         """Load a dictionary-stored system state"""
         self.balls, self.table, self.cue, self.events, self.meta = self.from_dict(d)
+        self.history_mode = d.get("history_mode", "all")
 
-    def copy(self, set_to_initial=True):
+    def copy(self, set_to_initial=True, history=True):
         """Make a fresh copy of this system state
 
+        The copy is made in memory. The balls, table, and cue are copied (see
+        Ball.copy and Table.copy), and so are the events, whose agents are replaced by
+        the corresponding objects of the copy. The copied events refer to the same
+        agent states as the events of this system (see `Event.copy`).
+
         Parameters
         ==========
         set_to_initial : bool, True
             Prior to copying, this method sets the ball states the initial states in the
             history.  However, this can be prevented by setting this to False, causing
             the ball states to be copied as is.
+        history : bool, True
+            If False, the events and histories are not copied, and the copy has none
         """
-        with tempfile.NamedTemporaryFile(delete=True) as temp:
-            self.save(temp.name, set_to_initial=set_to_initial)
-            balls, table, cue, events, meta = self.from_dict(
-                utils.load_pickle(temp.name)
-            )
+        if set_to_initial:
+            self.reset_balls()
+
+        balls = {
+            ball_id: ball.copy(history=history) for ball_id, ball in self.balls.items()
+        }
+        table = self.table.copy() if self.table is not None else None
+        cue = cue_from_dict(self.cue.as_dict()) if self.cue is not None else None
+        if cue is not None and cue.cueing_ball_id in balls:
+            cue.set_state(cueing_ball=balls[cue.cueing_ball_id])
 
         system = self.__class__(balls=balls, table=table, cue=cue)
-        system.events = events
-        system.meta = meta
+        system.meta = copy.deepcopy(self.meta)
+        system.history_mode = self.history_mode
+
+        if not history:
+            return system
+
+        self.copy_events(system)
+        system.t = self.t
+        system.continuized = self.continuized
+
+        return system
+
+    def copy_events(self, system, checkpoint=None):
+        """Give a copy of this system copies of the events of this system
+
+        The agents of the copied events are replaced by the corresponding objects of the
+        copy, and the copied events refer to the same agent states as the events of this
+        system (see `Event.copy`).
+
+        Parameters
+        ==========
+        system : pooltool.system.System
+            A copy of this system (see `copy`)
+        checkpoint : pooltool.system.Checkpoint, None
+            If not None, only the events up to this checkpoint of this system are copied
+        """
+        # The objects of this system, by id(), and their copies
+        copies = {
+            id(ball): system.balls[ball_id] for ball_id, ball in self.balls.items()
+        }
+        if system.table is not None:
+            for pocket_id, pocket in self.table.pockets.items():
+                copies[id(pocket)] = system.table.pockets[pocket_id]
+        if system.cue is not None:
+            copies[id(self.cue)] = system.cue
+
+        event_copies = {}
+
+        def copy_event(event):
+            if id(event) not in event_copies:
+                agents = [copies.get(id(agent), agent) for agent in event.agents]
+                event_copies[id(event)] = event.copy(agents)
+
+            return event_copies[id(event)]
+
+        n = None if checkpoint is None else checkpoint.index + 1
+        system.events = self.events.copy(copy_event, n)
+
+        for ball_id, ball in self.balls.items():
+            n = None if checkpoint is None else checkpoint.history_lengths[ball_id]
+            system.balls[ball_id].events = ball.events.copy(copy_event, n)
+
+    def branch(self, event_index, t_final=None, engine="python", **changes):
+        """Resimulate this system from one of its events, with some changes
+
+        A copy of this system is set to its state after the event (see `checkpoint`),
+        the changes are applied to its balls, and the copy is simulated from there. The
+        copy shares the states of the events and histories up to the event with this
+        system, rather than copying them (see `BallHistory.share`). The events
+        themselves are copied, since their agents are the objects of the copy, but
+        their agent states are not (see `Event.copy`).
+
+        Parameters
+        ==========
+        event_index : int
+            The index of the event in self.events
+        t_final : float, None
+            Passed to `resume`
+        engine : str, 'python'
+            Passed to `resume`
+        **changes
+            Ball attributes (see SystemState.fields, except 't') to change before
+            resimulating, e.g. e_c=0.8 or rvw={'cue': rvw}. Each value is either set for
+            every ball, or is a dictionary of values by ball id
+
+        Returns
+        =======
+        system : pooltool.system.System
+            The resimulated copy
+        """
+        fields = [field for field in SystemState.fields if field != "t"]
+        unknown = set(changes) - set(fields)
+        if unknown:
+            raise ValueError(
+                f"System.branch :: {unknown} are not valid changes. Please choose "
+                f"from: {fields}"
+            )
+
+        # The final NonEvent only timestamps the final states, and resuming adds a new
+        # one, so a branch from it is a branch from the event before it
+        event_index %= len(self.events)
+        if event_index == len(self.events) - 1 and event_index > 0:
+            if isinstance(self.events[event_index], NonEvent):
+                event_index -= 1
+
+        checkpoint = self.checkpoint(event_index)
+
+        system = self.copy(set_to_initial=False, history=False)
+        self.copy_events(system, checkpoint)
+
+        for ball_id, ball in self.balls.items():
+            n = checkpoint.history_lengths[ball_id]
+            system.balls[ball_id].history.share(ball.history, n)
+
+        system.set_from_checkpoint(checkpoint)
+
+        for field, value in changes.items():
+            values = (
+                value if isinstance(value, dict) else dict.fromkeys(system.balls, value)
+            )
+            for ball_id, ball_value in values.items():
+                setattr(system.balls[ball_id], field, ball_value)
+
+        for ball in system.balls.values():
+            ball.update_next_transition_event()
+
+        system.resume(quiet=True, t_final=t_final, engine=engine)
+
         return system
 
 
@@ -550,6 +937,8 @@ class SystemCollectionRender(object):
         self.paused = False
 
     def set_animation(self):
+        from direct.interval.IntervalGlobal import Parallel
+
         if self.parallel:
             self.shot_animation = Parallel()
 
@@ -728,7 +1117,8 @@ class SystemCollection(utils.ListLike, SystemCollectionRender):
         assert state in {"initial", "final", "current"}
 
         set_to_initial = False if state == "current" else True
-        new = self.active.copy(set_to_initial=set_to_initial)
+        history = False if (reset_history and state == "current") else True
+        new = self.active.copy(set_to_initial=set_to_initial, history=history)
 
         if state == "initial":
             new.set_from_history(0)
@@ -13,8 +13,6 @@ import textwrap
 import time
 from collections import OrderedDict
 
-import pandas as pd
-
 
 def get_color_objects():
     """Get objects for coloring the progress bar
@@ -561,6 +559,7 @@ class Timer:
 
     def gen_dataframe_report(self):
         """Returns a dataframe"""
+        import pandas as pd
 
         d = {"key": [], "time": [], "score": []}
         for checkpoint_key, checkpoint in self.checkpoints.items():
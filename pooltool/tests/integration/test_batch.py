@@ -0,0 +1,64 @@
+#! /usr/bin/env python
+
+import numpy as np
+import pytest
+
+import pooltool as pt
+from pooltool.system import System
+from pooltool.tests import ref, trial
+
+
+def test_simulate_many(ref, trial):
+    ref.reset_balls()
+
+    # A system is simulated the same way by every worker
+    results = pt.simulate_many([ref, ref], processes=2)
+    assert len(results) == 2
+    for result in results:
+        assert result.ids == list(trial.balls.keys())
+        np.testing.assert_allclose(
+            result.rvw,
+            [ball.history.rvw[-1] for ball in trial.balls.values()],
+            atol=1e-8,
+        )
+
+    # The result can be turned back into a simulated system, even one with a different
+    # cue and starting positions
+    system = ref.copy()
+    system.cue.set_state(V0=1, phi=0)
+    system.balls["1"].rvw[0, 0] += 0.1
+    system = results[0].apply(system)
+    assert len(system.events) == len(trial.events)
+    assert (system.cue.V0, system.cue.phi) == (ref.cue.V0, ref.cue.phi)
+    for ball_id, ball in system.balls.items():
+        np.testing.assert_allclose(
+            ball.history.rvw, trial.balls[ball_id].history.rvw, atol=1e-8
+        )
+
+    # Parameter arrays are applied to a template
+    results = pt.simulate_many(dict(V0=[ref.cue.V0, 1]), template=ref, processes=1)
+    assert len(results) == 2
+    assert len(results[0]) != len(results[1])
+
+
+def test_simulate_many_failure(ref, monkeypatch):
+    ref.reset_balls()
+    simulate = System.simulate
+
+    def fail_slow_shots(system, **kwargs):
+        if system.cue.V0 < 2:
+            raise ValueError("failed")
+        simulate(system, **kwargs)
+
+    monkeypatch.setattr(System, "simulate", fail_slow_shots)
+
+    # A shot that fails doesn't stop the shots after it
+    V0 = [1, ref.cue.V0, 1, ref.cue.V0]
+    results = pt.simulate_many(dict(V0=V0), template=ref, processes=1, chunksize=4)
+    assert [result.failed for result in results] == [True, False, True, False]
+    assert "ValueError: failed" in results[0].error
+    assert results[0].ids == results[1].ids
+    assert len(results[1]) == len(results[3])
+
+    with pytest.raises(ValueError):
+        results[0].apply(ref.copy())
@@ -0,0 +1,107 @@
+#! /usr/bin/env python
+
+import numpy as np
+
+import pooltool as pt
+import pooltool.constants as c
+from pooltool.tests import ref, trial
+
+
+def test_compiled_engine(ref, trial):
+    ref.reset_balls()
+    ref.simulate(quiet=True, engine="compiled")
+
+    # Events are built from the event log when first accessed
+    assert ref.state.materializer is not None
+    assert len(ref.events) == len(trial.events)
+    assert ref.state.materializer is None
+
+    for event_ref, event_trial in zip(ref.events, trial.events):
+        assert event_ref.event_type == event_trial.event_type
+        assert [agent.id for agent in event_ref.agents] == [
+            agent.id for agent in event_trial.agents
+        ]
+        np.testing.assert_allclose(event_ref.time, event_trial.time, rtol=1e-8)
+
+    # Both engines reject the same candidates with the same detection tiers
+    assert ref.get_detection_counts() == trial.get_detection_counts()
+
+    ref.continuize(dt=0.01)
+
+    for ball_trial in trial.balls.values():
+        ball_ref = ref.balls[ball_trial.id]
+
+        assert len(ball_ref.events) == len(ball_trial.events)
+        np.testing.assert_allclose(
+            ball_ref.history.rvw, ball_trial.history.rvw, atol=1e-8
+        )
+        np.testing.assert_allclose(ball_ref.history.s, ball_trial.history.s)
+        np.testing.assert_allclose(ball_ref.history.t, ball_trial.history.t, rtol=1e-8)
+        np.testing.assert_allclose(
+            ball_ref.history_cts.rvw, ball_trial.history_cts.rvw, atol=1e-8
+        )
+
+
+def get_mirrored_system():
+    # Two identical collisions far apart from each other, which happen at exactly the
+    # same time
+    table = pt.PocketTable(model_name="7_foot")
+    balls = {}
+    for i, x in enumerate((0.25, 0.75)):
+        balls[f"{i}a"] = pt.Ball(f"{i}a", xyz=(x * table.w, 0.3, c.R))
+        balls[f"{i}a"].rvw[1] = [0, 1, 0]
+        balls[f"{i}a"].s = c.sliding
+        balls[f"{i}b"] = pt.Ball(f"{i}b", xyz=(x * table.w, 0.8, c.R))
+
+    return pt.System(table=table, balls=balls)
+
+
+def test_simultaneous_events():
+    events = {}
+    for engine in pt.evolution.engines:
+        system = get_mirrored_system()
+        system.simulate(quiet=True, engine=engine)
+        events[engine] = [
+            (event.event_type, [agent.id for agent in event.agents], event.time)
+            for event in system.events
+        ]
+
+        # Both collisions are resolved in the same batch
+        collisions = [
+            i
+            for i, event in enumerate(system.events)
+            if event.event_type == "ball-ball"
+        ]
+        assert len(collisions) == 2
+        assert collisions[1] == collisions[0] + 1
+        assert system.events[collisions[0]].time == system.events[collisions[1]].time
+
+    assert events["python"] == events["compiled"]
+
+
+def test_agent_history(ref, trial):
+    times = np.linspace(0, trial.t, 100)
+    rvw_trial, s_trial = trial.state_at(times)
+
+    for engine in pt.evolution.engines:
+        system = ref.copy()
+        system.simulate(quiet=True, engine=engine, history="agents")
+        assert len(system.events) == len(trial.events)
+
+        # Each ball only records the events it is an agent of, plus the initial and
+        # final states
+        for ball in system.balls.values():
+            num_agent_events = len(trial.events.filter_ball(trial.balls[ball.id]))
+            assert len(ball.history) == num_agent_events + 2
+            assert len(ball.events) == len(ball.history)
+
+        rvw, s = system.state_at(times)
+        np.testing.assert_allclose(rvw, rvw_trial, atol=1e-8)
+        np.testing.assert_allclose(s, s_trial)
+
+        for i in (0, len(trial.events) // 2, -1):
+            system.set_from_history(i)
+            trial.set_from_history(i)
+            np.testing.assert_allclose(system.state.rvw, trial.state.rvw, atol=1e-8)
+
+    trial.reset_balls()
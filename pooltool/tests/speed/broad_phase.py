@@ -0,0 +1,74 @@
+#! /usr/bin/env python
+"""Compare the ball-ball broad phase to the brute-force pair search
+
+Each system is an arena (see sandbox/arena.py) of N randomly placed balls, where the
+table is scaled so the fraction of the table area covered by balls is the same for every
+N. The cue ball is struck at the first object ball, and the system is simulated until
+`--t-final` with each broad phase.
+"""
+
+import numpy as np
+
+import pooltool as pt
+
+
+def arena(N, density, seed):
+    np.random.seed(seed)
+
+    R = pt.Ball("dummy").R
+    w = np.sqrt((N + 1) * np.pi * R**2 / density / 2)
+    table = pt.PocketTable(l=2 * w, w=w)
+
+    positions = np.empty((0, 2))
+    while len(positions) < N + 1:
+        candidate = np.random.rand(2) * [table.w - 2 * R, table.l - 2 * R] + R
+        if np.all(np.linalg.norm(positions - candidate, axis=1) > 2 * R):
+            positions = np.vstack([positions, candidate])
+
+    balls = {}
+    for i, (x, y) in enumerate(positions):
+        ball_id = "cue" if i == 0 else str(i - 1)
+        balls[ball_id] = pt.Ball(ball_id, xyz=(x, y, R))
+
+    cue = pt.Cue(cueing_ball=balls["cue"])
+    cue.aim_at_ball(balls["0"])
+    cue.strike(V0=40)
+
+    return pt.System(cue=cue, table=table, balls=balls)
+
+
+def main(args):
+    run = pt.terminal.Run()
+
+    # Run once to compile all numba functions. By doing this, compilation times will be
+    # excluded in the timing.
+    for broad_phase in pt.evolution.broad_phases:
+        arena(16, args.density, args.seed).simulate(
+            quiet=True, t_final=args.t_final, broad_phase=broad_phase
+        )
+
+    for N in args.N:
+        run.warning("", header=f"N = {N}", lc="green")
+        for broad_phase in pt.evolution.broad_phases:
+            system = arena(N, args.density, args.seed)
+            with pt.terminal.TimeCode(quiet=True) as timer:
+                system.simulate(
+                    quiet=True, t_final=args.t_final, broad_phase=broad_phase
+                )
+
+            run.info(
+                f"{broad_phase or 'brute force'}",
+                f"{timer.time.total_seconds():.3f}s ({len(system.events)} events)",
+            )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("-N", type=int, nargs="+", default=[16, 50, 200, 1000])
+    ap.add_argument("--t-final", type=float, default=1)
+    ap.add_argument("--density", type=float, default=0.05)
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+    main(args)
@@ -0,0 +1,102 @@
+#! /usr/bin/env python
+"""Measure the time from `import pooltool` to the first simulated shot
+
+Each measurement is made in a fresh Python process, which imports pooltool, optionally
+calls `pooltool.compile_kernels` for the engine, loads benchmark_short.pkl, and
+simulates it twice. With `--cold`, the numba cache is directed to an empty directory
+(see NUMBA_CACHE_DIR), so that every kernel is compiled, like in a process that runs
+before the cache exists.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import pooltool as pt
+
+path = Path(pt.__file__).parent / "tests" / "speed" / "benchmark_short.pkl"
+
+script = """
+import json
+import time
+
+start = time.perf_counter()
+
+import pooltool as pt
+
+times = {"import": time.perf_counter() - start}
+
+if %(compile_kernels)r:
+    pt.compile_kernels(engine=%(engine)r)
+    times["compile_kernels"] = time.perf_counter() - start - sum(times.values())
+
+system = pt.System(path=%(path)r)
+system.simulate(quiet=True, engine=%(engine)r)
+times["first shot"] = time.perf_counter() - start - sum(times.values())
+
+system = pt.System(path=%(path)r)
+shot_start = time.perf_counter()
+system.simulate(quiet=True, engine=%(engine)r)
+times["second shot"] = time.perf_counter() - shot_start
+
+print(json.dumps(times))
+"""
+
+
+def measure(engine, compile_kernels, cache_dir=None):
+    env = dict(os.environ)
+    if cache_dir is not None:
+        env["NUMBA_CACHE_DIR"] = cache_dir
+
+    code = script % dict(path=str(path), engine=engine, compile_kernels=compile_kernels)
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(args):
+    run = pt.terminal.Run()
+
+    for engine in args.engine:
+        for compile_kernels in (False, True):
+            header = f"{engine} engine, " + (
+                "compile_kernels" if compile_kernels else "compiled on demand"
+            )
+            run.warning("", header=header, lc="green")
+
+            with tempfile.TemporaryDirectory() as cache_dir:
+                times = measure(
+                    engine, compile_kernels, cache_dir if args.cold else None
+                )
+
+            for step, seconds in times.items():
+                run.info(step, f"{seconds:.3f}s")
+
+            startup = sum(
+                seconds for step, seconds in times.items() if step != "second shot"
+            )
+            run.info("import to first shot", f"{startup:.3f}s")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument(
+        "--engine",
+        nargs="+",
+        choices=pt.evolution.engines,
+        default=pt.evolution.engines,
+    )
+    ap.add_argument("--cold", action="store_true")
+    args = ap.parse_args()
+    main(args)
@@ -0,0 +1,44 @@
+#! /usr/bin/env python
+"""Compare the Python and compiled implementations of the event-based algorithm
+
+Each system is an arena of N randomly placed balls (see broad_phase.py), simulated until
+`--t-final`. Timings include building the events from the event log, since the compiled
+engine builds them lazily.
+"""
+
+from broad_phase import arena
+
+import pooltool as pt
+
+
+def main(args):
+    run = pt.terminal.Run()
+
+    # Run once to compile all numba functions. By doing this, compilation times will be
+    # excluded in the timing.
+    for engine in pt.evolution.engines:
+        arena(16, args.density, args.seed).simulate(
+            quiet=True, t_final=args.t_final, engine=engine
+        )
+
+    for N in args.N:
+        run.warning("", header=f"N = {N}", lc="green")
+        for engine in pt.evolution.engines:
+            system = arena(N, args.density, args.seed)
+            with pt.terminal.TimeCode(quiet=True) as timer:
+                system.simulate(quiet=True, t_final=args.t_final, engine=engine)
+                num_events = len(system.events)
+
+            run.info(engine, f"{timer.time.total_seconds():.3f}s ({num_events} events)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("-N", type=int, nargs="+", default=[16, 50, 200])
+    ap.add_argument("--t-final", type=float, default=1)
+    ap.add_argument("--density", type=float, default=0.05)
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+    main(args)
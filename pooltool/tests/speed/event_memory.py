@@ -0,0 +1,76 @@
+#! /usr/bin/env python
+"""Measure the memory held by the events of simulated systems
+
+Each system is an arena of N randomly placed balls (see broad_phase.py), simulated until
+`--t-final`. The memory held by the events is the memory that is freed when the events
+of the system and its balls (and the event log of the compiled engine) are discarded, as
+measured by tracemalloc. To isolate the events, ball histories are recorded with
+history='agents', and are discarded before the measurement begins.
+"""
+
+import gc
+import tracemalloc
+
+from broad_phase import arena
+
+import pooltool as pt
+
+
+def get_event_memory(system):
+    """Get the number of bytes freed by discarding the events of a simulated system"""
+    for ball in system.balls.values():
+        ball.history.reset()
+        ball.history_cts.reset()
+
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+
+    system.events.reset()
+    for ball in system.balls.values():
+        ball.events.reset()
+        ball.next_transition_event = None
+    system.state.event_states = None
+    system.event_log = None
+
+    gc.collect()
+    return before - tracemalloc.get_traced_memory()[0]
+
+
+def main(args):
+    run = pt.terminal.Run()
+
+    # Run once to compile all numba functions, so that compilation doesn't allocate
+    # memory during the measurements
+    for engine in pt.evolution.engines:
+        arena(16, args.density, args.seed).simulate(
+            quiet=True, t_final=args.t_final, engine=engine
+        )
+
+    tracemalloc.start()
+    for N in args.N:
+        run.warning("", header=f"N = {N}", lc="green")
+        for engine in pt.evolution.engines:
+            system = arena(N, args.density, args.seed)
+            system.simulate(
+                quiet=True, t_final=args.t_final, engine=engine, history="agents"
+            )
+            num_events = len(system.events)
+            num_bytes = get_event_memory(system)
+
+            run.info(
+                engine,
+                f"{num_bytes / num_events:.0f} bytes per event ({num_events} events)",
+            )
+    tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("-N", type=int, nargs="+", default=[16, 50, 200])
+    ap.add_argument("--t-final", type=float, default=1)
+    ap.add_argument("--density", type=float, default=0.05)
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+    main(args)
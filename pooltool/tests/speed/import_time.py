@@ -0,0 +1,81 @@
+#! /usr/bin/env python
+"""Measure the time it takes to import pooltool
+
+Each measurement is made in a fresh Python process. `import pooltool` doesn't import
+the rendering modules (panda3d and pooltool.ani), which are imported the first time they
+are used, e.g. by accessing `pooltool.ShotViewer`. Both are measured, and the slowest
+imports of `import pooltool` (see `python -X importtime`) are listed.
+"""
+
+import statistics
+import subprocess
+import sys
+
+import pooltool as pt
+
+statements = {
+    "import pooltool": "import pooltool",
+    "import pooltool with rendering": "import pooltool; pooltool.ShotViewer",
+}
+
+script = """
+import time
+
+start = time.perf_counter()
+%s
+print(time.perf_counter() - start)
+"""
+
+
+def measure(statement):
+    output = subprocess.run(
+        [sys.executable, "-c", script % statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+    return float(output.strip().splitlines()[-1])
+
+
+def get_slowest_imports(num):
+    """Get the cumulative import times of the slowest modules imported by pooltool"""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import pooltool"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative) / 1e6
+
+    return sorted(times.items(), key=lambda item: item[1], reverse=True)[:num]
+
+
+def main(args):
+    run = pt.terminal.Run()
+
+    run.warning("", header="Import times", lc="green")
+    for name, statement in statements.items():
+        times = [measure(statement) for _ in range(args.repeats)]
+        run.info(name, f"{statistics.median(times):.3f}s (median of {args.repeats})")
+
+    run.warning("", header="Slowest imports of `import pooltool`", lc="green")
+    for name, seconds in get_slowest_imports(args.top):
+        run.info(name, f"{seconds:.3f}s")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--repeats", type=int, default=5)
+    ap.add_argument("--top", type=int, default=10)
+    args = ap.parse_args()
+    main(args)
@@ -0,0 +1,74 @@
+#! /usr/bin/env python
+"""Measure the memory and construction time of unrendered objects
+
+Objects that are only simulated never render, so they shouldn't pay for render state.
+For each kind of object, `--number` instances are constructed and kept alive, and the
+memory they hold is measured with tracemalloc. The construction time is measured
+separately, without tracemalloc, which slows down allocation.
+"""
+
+import gc
+import time
+import tracemalloc
+from pathlib import Path
+
+import pooltool as pt
+
+path = Path(pt.__file__).parent / "tests" / "speed" / "benchmark_short.pkl"
+
+
+def get_memory(make, number):
+    """Get the number of bytes held by each object made by `make`"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    objects = [make() for _ in range(number)]
+
+    gc.collect()
+    num_bytes = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    del objects
+    return num_bytes / number
+
+
+def get_time(make, number):
+    """Get the seconds it takes to make each object"""
+    start = time.perf_counter()
+    for _ in range(number):
+        make()
+
+    return (time.perf_counter() - start) / number
+
+
+def main(args):
+    run = pt.terminal.Run()
+
+    table = pt.PocketTable(model_name="7_foot")
+    system = pt.System(path=path)
+    simulated = system.copy()
+    simulated.simulate(quiet=True)
+
+    makers = {
+        "Ball": lambda: pt.Ball("1"),
+        "PocketTable": lambda: pt.PocketTable(model_name="7_foot"),
+        "Table.copy": table.copy,
+        "nine ball rack": lambda: pt.get_nine_ball_rack(table),
+        "System.copy(history=False)": lambda: system.copy(history=False),
+        "System.copy() after simulating": simulated.copy,
+    }
+
+    for name, make in makers.items():
+        run.warning("", header=name, lc="green")
+        run.info("memory", f"{get_memory(make, args.number):.0f} bytes")
+        run.info("time", f"{get_time(make, args.number) * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--number", type=int, default=100)
+    args = ap.parse_args()
+    main(args)
@@ -0,0 +1,578 @@
+#! /usr/bin/env python
+"""Run the benchmark suite and compare the results to a baseline
+
+The suite times standard scenarios: the nine-ball break of gen_dataset.py,
+benchmark_long.pkl, arenas of N balls (see broad_phase.py), a three-cushion shot,
+continuizing a simulated shot, saving and loading a system, and the numba kernels next
+to their pure Python counterparts. Simulations are timed for both engines, and the
+accuracy of the quartic solvers is reported along with their time. Nothing is rendered,
+so the suite runs headlessly.
+
+The kernel benchmarks replace the standalone comparison scripts that used to be in this
+directory, one per kernel. For example, `--filter kernels/min_real_quartic_roots/`
+compares the analytic quartic solver to the eigenvalue solver (min_real_root.py and
+min_real_quartic_roots.py), and the fast version of each kernel is checked against its
+Python version before it is timed.
+
+Each benchmark is repeated `--repeat` times, and its time is the fastest repetition,
+which is the least affected by other processes. The results are written as JSON to
+`--output`, along with the versions and platform they were measured on. They are
+compared to the baseline (baseline.json by default), and a benchmark is a regression if
+it is slower than the baseline by more than its threshold, in which case the exit status
+is 1.
+
+Times are only comparable on the same machine, so the baseline is machine-local and is
+not committed. If there is no baseline yet, the results are stored as the baseline, and
+`--save-baseline` replaces it. The thresholds only absorb the noise between runs on one
+machine, and a warning is shown if the baseline was measured on a different platform or
+with different versions of Python, numpy, or numba.
+"""
+
+import json
+import platform
+import re
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numba
+import numpy as np
+from broad_phase import arena
+
+import pooltool as pt
+
+speed_dir = Path(pt.__file__).parent / "tests" / "speed"
+default_baseline = speed_dir / "baseline.json"
+
+# The keys of the results metadata (see `get_meta`) that should match the baseline's for
+# the times to be comparable
+machine_keys = ("machine", "processor", "system", "python", "numpy", "numba")
+
+# Where systems are saved to and loaded from by the save and load benchmarks
+io_path = Path(tempfile.gettempdir()) / "pooltool_benchmark.pkl"
+
+# The time each repetition of a benchmark should take at least. Fast benchmarks are
+# called as many times as it takes (see `Benchmark.measure`)
+min_repetition_time = 0.05
+
+
+class Benchmark(object):
+    def __init__(
+        self, name, setup, run, number=None, threshold=0.2, check=None, metrics=None
+    ):
+        """A timed operation
+
+        Parameters
+        ==========
+        name : str
+            The name of the benchmark, which identifies it in the results and baseline.
+            Benchmarks of the same group share a prefix, e.g. 'arena/N=50/compiled'
+        setup : callable
+            Called without arguments before each repetition, untimed. Returns the
+            argument passed to `run`
+        run : callable
+            The timed operation. Called with the output of `setup`. If it returns a
+            dict, it holds counts that are stored with the results (e.g. the number of
+            events)
+        number : int, None
+            The number of times `run` is called per repetition. If None, it's chosen so
+            that a repetition takes at least `min_repetition_time`. Operations that
+            can't be repeated on the output of `setup`, like simulations, use 1
+        threshold : float, 0.2
+            The fraction by which the benchmark may be slower than the baseline before
+            it's a regression
+        check : callable, None
+            If not None, called with the output of `setup` before timing, to check that
+            the operation is correct. It should raise if it isn't
+        metrics : callable, None
+            If not None, called without arguments before timing. Returns a dict of
+            measurements that are stored with the results, e.g. of the accuracy of the
+            operation
+        """
+        self.name = name
+        self.setup = setup
+        self.run = run
+        self.number = number
+        self.threshold = threshold
+        self.check = check
+        self.metrics = metrics
+
+    def measure(self, repeat):
+        """Time the benchmark
+
+        `run` is called once before timing, so that numba kernels are compiled (or
+        loaded from the cache) first.
+
+        Returns
+        =======
+        result : dict
+            'seconds' is the fastest time per call and 'median' the median, over
+            `repeat` repetitions. Counts returned by `run` are included
+        """
+        arg = self.setup()
+        if self.check is not None:
+            self.check(arg)
+
+        measurements = self.metrics() if self.metrics is not None else {}
+
+        start = time.perf_counter()
+        counts = self.run(arg)
+        if not isinstance(counts, dict):
+            counts = {}
+        elapsed = time.perf_counter() - start
+
+        number = self.number
+        if number is None:
+            number = max(1, int(np.ceil(min_repetition_time / max(elapsed, 1e-9))))
+
+        times = []
+        for _ in range(repeat):
+            arg = self.setup()
+            start = time.perf_counter()
+            for _ in range(number):
+                self.run(arg)
+            times.append((time.perf_counter() - start) / number)
+
+        return dict(
+            seconds=min(times),
+            median=float(np.median(times)),
+            repeat=repeat,
+            number=number,
+            threshold=self.threshold,
+            **counts,
+            **measurements,
+        )
+
+
+def get_break():
+    """The nine-ball break of gen_dataset.py"""
+    table = pt.PocketTable(model_name="7_foot")
+    balls = pt.get_nine_ball_rack(table, ordered=True)
+    cue = pt.Cue(cueing_ball=balls["cue"])
+    cue.aim_at_ball(balls["1"])
+    cue.strike(V0=8)
+
+    return pt.System(cue=cue, table=table, balls=balls)
+
+
+def get_three_cushion_shot():
+    """A shot on a carom table in which the cue ball hits 9 cushions"""
+    table = pt.BilliardTable(model_name="3_cushion")
+    balls = pt.get_three_cushion_rack(table)
+    cue = pt.Cue(cueing_ball=balls["white"])
+    cue.aim_at_ball(balls["yellow"], cut=30)
+    cue.strike(V0=4, a=0.2, b=0.2)
+
+    return pt.System(cue=cue, table=table, balls=balls)
+
+
+def get_simulated_break():
+    system = get_break()
+    system.simulate(quiet=True)
+    return system
+
+
+def simulate(engine, **kwargs):
+    def run(system):
+        system.simulate(quiet=True, engine=engine, **kwargs)
+        return dict(events=len(system.events))
+
+    return run
+
+
+def get_simulation_benchmarks(arena_sizes):
+    scenarios = {
+        "break": get_break,
+        "benchmark_long": lambda: pt.System(path=speed_dir / "benchmark_long.pkl"),
+        "three_cushion": get_three_cushion_shot,
+    }
+
+    benchmarks = []
+    for engine in pt.evolution.engines:
+        for name, setup in scenarios.items():
+            benchmarks.append(Benchmark(f"{name}/{engine}", setup, simulate(engine), 1))
+
+        for N in arena_sizes:
+            benchmarks.append(
+                Benchmark(
+                    f"arena/N={N}/{engine}",
+                    lambda N=N: arena(N, density=0.05, seed=42),
+                    simulate(engine, t_final=1),
+                    1,
+                )
+            )
+
+    return benchmarks
+
+
+def save_simulated_break():
+    get_simulated_break().save(io_path)
+    return io_path
+
+
+def get_io_benchmarks():
+    return [
+        Benchmark(
+            "continuize",
+            get_simulated_break,
+            lambda system: system.continuize(dt=0.01),
+        ),
+        Benchmark("save", get_simulated_break, lambda system: system.save(io_path)),
+        Benchmark("load", save_simulated_break, lambda path: pt.System(path=path)),
+    ]
+
+
+def get_rvw():
+    return np.random.rand(3, 3)
+
+
+def get_point():
+    point = np.random.rand(3)
+    point[2] = 0.0285 * 7 / 5
+    return point
+
+
+# The kernels that are timed next to their pure Python counterparts, by name. Each has
+# the Python function, the kernel, and a function that returns the arguments of both
+kernels = {
+    "angle": (
+        pt.utils.angle,
+        pt.utils.angle_fast,
+        lambda: (np.random.rand(2), np.random.rand(2)),
+    ),
+    "coordinate_rotation": (
+        pt.utils.coordinate_rotation,
+        pt.utils.coordinate_rotation_fast,
+        lambda: (np.random.rand(3), 2 * np.pi * np.random.rand()),
+    ),
+    "cross": (
+        pt.utils.cross,
+        pt.utils.cross_fast,
+        lambda: (np.random.rand(3), np.random.rand(3)),
+    ),
+    "unit_vector": (
+        pt.utils.unit_vector,
+        pt.utils.unit_vector_fast,
+        lambda: (10 * np.random.rand(3) - 5,),
+    ),
+    "get_rel_velocity": (
+        pt.utils.get_rel_velocity,
+        pt.utils.get_rel_velocity_fast,
+        lambda: (get_rvw(), 0.0285),
+    ),
+    "quadratic": (
+        pt.utils.quadratic,
+        pt.utils.quadratic_fast,
+        lambda: tuple(np.random.rand(3)),
+    ),
+    "roots": (
+        pt.utils.roots,
+        pt.utils.roots_fast,
+        lambda: (np.random.rand(50, 5),),
+    ),
+    "min_real_root": (
+        pt.utils.min_real_root,
+        pt.utils.min_real_root_fast,
+        lambda: (np.random.rand(50, 5),),
+    ),
+    "min_real_quartic_roots": (
+        lambda p: pt.utils.min_real_root_per_row(p.copy()),
+        pt.utils.min_real_quartic_roots_fast,
+        lambda: (np.random.randn(50, 5),),
+    ),
+    "get_roll_time": (
+        pt.physics.get_roll_time,
+        pt.physics.get_roll_time_fast,
+        lambda: (get_rvw(), 0.18, 9.8),
+    ),
+    "get_slide_time": (
+        pt.physics.get_slide_time,
+        pt.physics.get_slide_time_fast,
+        lambda: (get_rvw(), 0.0285, 0.18, 9.8),
+    ),
+    "get_spin_time": (
+        pt.physics.get_spin_time,
+        pt.physics.get_spin_time_fast,
+        lambda: (get_rvw(), 0.0285, 0.18, 9.8),
+    ),
+    "get_ball_ball_collision_coeffs": (
+        pt.physics.get_ball_ball_collision_coeffs,
+        pt.physics.get_ball_ball_collision_coeffs_fast,
+        lambda: (get_rvw(), get_rvw(), 2, 3, 0.18, 0.04, 0.05, 0.05, 9.8, 9.8, 0.0285),
+    ),
+    "get_ball_linear_cushion_collision_time": (
+        # The kernel takes the side of the cushion that is checked, and the Python
+        # function checks both (direction=2)
+        lambda *args: pt.physics.get_ball_linear_cushion_collision_time(
+            *args[:7], *args[8:]
+        ),
+        pt.physics.get_ball_linear_cushion_collision_time_fast,
+        lambda: (get_rvw(), 2)
+        + tuple(10 * np.random.rand(3) - 5)
+        + (get_point(), get_point(), 2, 0.06, 0.04, 9.8, 0.0285),
+    ),
+    "get_ball_circular_cushion_collision_coeffs": (
+        pt.physics.get_ball_circular_cushion_collision_coeffs,
+        pt.physics.get_ball_circular_cushion_collision_coeffs_fast,
+        lambda: (get_rvw(), 2, 0.42, 0.18, 0.05, 0.06, 0.02, 9.8, 0.0285),
+    ),
+    "get_ball_pocket_collision_coeffs": (
+        pt.physics.get_ball_pocket_collision_coeffs,
+        pt.physics.get_ball_pocket_collision_coeffs_fast,
+        lambda: (get_rvw(), 2, 0.42, 0.18, 0.05, 0.06, 0.02, 9.8, 0.0285),
+    ),
+}
+
+
+def seeded(get_args, seed=0):
+    """Make the same arguments for every repetition"""
+
+    def setup():
+        np.random.seed(seed)
+        return get_args()
+
+    return setup
+
+
+def agree(function, kernel):
+    """Make a check that the kernel and the Python function agree"""
+
+    def check(args):
+        expected = np.asarray(function(*args))
+        output = np.asarray(kernel(*args))
+        if np.iscomplexobj(expected):
+            # The roots may be in a different order, and the order of complex conjugates
+            # depends on rounding, so the real and imaginary parts are sorted separately
+            for part in (np.real, np.imag):
+                np.testing.assert_allclose(
+                    np.sort(part(output)), np.sort(part(expected)), atol=1e-9
+                )
+            return
+
+        np.testing.assert_allclose(output, expected, rtol=1e-6)
+
+    return check
+
+
+def root_residuals(function, seed=0):
+    """Make a measurement of the accuracy of a function that finds quartic roots
+
+    The residual of a polynomial at a root is relative to the size of its terms, so it's
+    about the machine epsilon for a root that is exact up to rounding. The residuals are
+    measured for 10000 polynomials with random coefficients.
+    """
+
+    def metrics():
+        np.random.seed(seed)
+        p = np.random.randn(10000, 5)
+        output = function(p)
+
+        finite = np.isfinite(output)
+        terms = p[finite] * output[finite, None] ** np.arange(4, -1, -1)
+        residual = np.abs(terms.sum(axis=1)) / np.abs(terms).sum(axis=1)
+
+        return dict(
+            median_residual=float(np.median(residual)),
+            max_residual=float(residual.max()),
+        )
+
+    return metrics
+
+
+# The kernels whose accuracy is measured, by name. Each is called with the Python
+# function or the kernel, and returns the measurement (see `Benchmark.metrics`)
+kernel_metrics = {"min_real_quartic_roots": root_residuals}
+
+
+def get_kernel_benchmarks():
+    benchmarks = []
+    for name, (function, kernel, get_args) in kernels.items():
+        metrics = kernel_metrics.get(name)
+        benchmarks.append(
+            Benchmark(
+                f"kernels/{name}/python",
+                seeded(get_args),
+                lambda args, function=function: function(*args),
+                threshold=0.3,
+                metrics=metrics(function) if metrics is not None else None,
+            )
+        )
+        benchmarks.append(
+            Benchmark(
+                f"kernels/{name}/fast",
+                seeded(get_args),
+                lambda args, kernel=kernel: kernel(*args),
+                threshold=0.3,
+                check=agree(function, kernel),
+                metrics=metrics(kernel) if metrics is not None else None,
+            )
+        )
+
+    return benchmarks
+
+
+def get_benchmarks(arena_sizes):
+    return (
+        get_simulation_benchmarks(arena_sizes)
+        + get_io_benchmarks()
+        + get_kernel_benchmarks()
+    )
+
+
+def get_meta():
+    return dict(
+        date=datetime.now().isoformat(timespec="seconds"),
+        pooltool=pt.__version__,
+        python=platform.python_version(),
+        numpy=np.__version__,
+        numba=numba.__version__,
+        machine=platform.machine(),
+        processor=platform.processor(),
+        system=platform.system(),
+    )
+
+
+def compare(results, baseline, threshold=None):
+    """Compare results to a baseline
+
+    Parameters
+    ==========
+    threshold : float, None
+        If not None, the threshold of every benchmark. Otherwise, the threshold of each
+        benchmark in the results is used
+
+    Returns
+    =======
+    ratios : dict
+        The time of each benchmark divided by its time in the baseline, by name.
+        Benchmarks missing from the baseline are left out
+    regressions : list
+        The names of the benchmarks that are regressions
+    """
+    ratios = {}
+    regressions = []
+    for name, result in results["benchmarks"].items():
+        if name not in baseline["benchmarks"]:
+            continue
+
+        ratios[name] = result["seconds"] / baseline["benchmarks"][name]["seconds"]
+        if ratios[name] > 1 + (result["threshold"] if threshold is None else threshold):
+            regressions.append(name)
+
+    return ratios, regressions
+
+
+def format_seconds(seconds):
+    if seconds >= 1:
+        return f"{seconds:.3f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.3f} ms"
+    return f"{seconds * 1e6:.3f} us"
+
+
+def main(args):
+    run = pt.terminal.Run()
+
+    benchmarks = [
+        benchmark
+        for benchmark in get_benchmarks(args.N)
+        if re.search(args.filter, benchmark.name)
+    ]
+
+    if args.list:
+        for benchmark in benchmarks:
+            print(benchmark.name)
+        return 0
+
+    baseline = None
+    if not args.save_baseline and args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        meta = get_meta()
+        changed = [key for key in machine_keys if baseline["meta"][key] != meta[key]]
+        if changed:
+            run.warning(
+                f"The baseline was measured with a different {', '.join(changed)}, so "
+                f"the comparison is unreliable. Store a new baseline for this machine "
+                f"with --save-baseline"
+            )
+
+    results = dict(meta=get_meta(), benchmarks={})
+    run.warning("", header="Benchmarks", lc="green")
+    for benchmark in benchmarks:
+        # The random arguments of some kernels have no real solutions
+        with np.errstate(invalid="ignore"):
+            result = benchmark.measure(args.repeat)
+        results["benchmarks"][benchmark.name] = result
+
+        summary = format_seconds(result["seconds"])
+        if "events" in result:
+            summary += f" ({result['events'] / result['seconds']:.0f} events/s)"
+        if "max_residual" in result:
+            summary += (
+                f" (residual median {result['median_residual']:.1e}, "
+                f"max {result['max_residual']:.1e})"
+            )
+        if baseline is not None and benchmark.name in baseline["benchmarks"]:
+            ratio = (
+                result["seconds"] / baseline["benchmarks"][benchmark.name]["seconds"]
+            )
+            summary += f", {ratio:.2f}x baseline"
+        run.info(benchmark.name, summary)
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=2))
+        run.info("Results written to", args.output)
+
+    if args.save_baseline or baseline is None:
+        # Benchmarks that weren't run keep their baseline
+        if args.baseline.exists():
+            old = json.loads(args.baseline.read_text())
+            results["benchmarks"] = {**old["benchmarks"], **results["benchmarks"]}
+        args.baseline.write_text(json.dumps(results, indent=2))
+        run.info("Baseline written to", args.baseline)
+        return 0
+
+    ratios, regressions = compare(results, baseline, args.threshold)
+    if not regressions:
+        run.warning("", header="No regressions", lc="green")
+        return 0
+
+    run.warning("", header="Regressions", lc="red")
+    for name in regressions:
+        run.info(name, f"{ratios[name]:.2f}x baseline", mc="red")
+
+    return 1
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    ap.add_argument(
+        "--filter",
+        default="",
+        help="Only run the benchmarks whose names match this regular expression",
+    )
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("-N", type=int, nargs="+", default=[16, 50, 200])
+    ap.add_argument("--output", type=Path, help="Write the results to this JSON file")
+    ap.add_argument("--baseline", type=Path, default=default_baseline)
+    ap.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store the results as the baseline instead of comparing to it. By "
+        "default, they are only stored if there is no baseline yet",
+    )
+    ap.add_argument(
+        "--threshold",
+        type=float,
+        help="The fraction by which every benchmark may be slower than the baseline "
+        "before it's a regression. By default, each benchmark has its own",
+    )
+    ap.add_argument("--list", action="store_true", help="List the benchmarks and exit")
+    args = ap.parse_args()
+    sys.exit(main(args))
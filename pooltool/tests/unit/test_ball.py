@@ -7,7 +7,7 @@ import pytest
 
 import pooltool as pt
 from pooltool.error import ConfigError
-from pooltool.objects.ball import Ball
+from pooltool.objects.ball import Ball, BallHistory
 from pooltool.tests import ref, trial
 
 
@@ -31,3 +31,112 @@ def test_save(trial):
         np.testing.assert_allclose(ball.history_cts.rvw, pickle_ball.history_cts.rvw)
         np.testing.assert_allclose(ball.history_cts.s, pickle_ball.history_cts.s)
         np.testing.assert_allclose(ball.history_cts.t, pickle_ball.history_cts.t)
+
+
+def test_system_state(ref):
+    for index, ball in enumerate(ref.balls.values()):
+        assert ball.system_state is ref.state
+        assert ref.state.ids[index] == ball.id
+
+        # Changes to the ball are changes to the system state, and vice versa
+        ball.rvw[0] = [1, 2, 3]
+        np.testing.assert_allclose(ref.state.rvw[index, 0], [1, 2, 3])
+
+        ref.state.s[index] = pt.rolling
+        assert ball.s == pt.rolling
+
+        ball.set(np.zeros((3, 3)), s=pt.stationary, t=5)
+        np.testing.assert_allclose(ref.state.rvw[index], np.zeros((3, 3)))
+        assert ref.state.s[index] == pt.stationary
+        assert ref.state.t[index] == 5
+
+
+def test_state_at(ref):
+    with pytest.raises(ConfigError):
+        Ball("empty").state_at(0)
+
+    for ball in ref.balls.values():
+        history = ball.history
+
+        # At each event, the state is the state recorded in the history. If events
+        # are simultaneous, it is the state after the last of them
+        last = np.searchsorted(history.t, history.t, side="right") - 1
+        rvw, s = ball.state_at(history.t)
+        np.testing.assert_allclose(rvw, np.array(history.rvw)[last], atol=1e-12)
+        np.testing.assert_allclose(s, np.array(history.s)[last])
+
+        # Between events, the state is evolved from the previous event
+        for i in range(len(history.t) - 1):
+            t = (history.t[i] + history.t[i + 1]) / 2
+            if not history.t[i] < t < history.t[i + 1]:
+                # The events are (almost) simultaneous
+                continue
+            rvw_expected, s_expected = pt.physics.evolve_ball_motion(
+                history.s[i],
+                history.rvw[i],
+                ball.R,
+                ball.m,
+                ball.u_s,
+                ball.u_sp,
+                ball.u_r,
+                ball.g,
+                t - history.t[i],
+            )
+
+            rvw, s = ball.state_at(t)
+            np.testing.assert_allclose(rvw, rvw_expected, atol=1e-12)
+            assert s == s_expected
+
+    rvw, s = ref.state_at([0, 1])
+    assert rvw.shape == (2, len(ref.balls), 3, 3)
+    assert s.shape == (2, len(ref.balls))
+
+
+def test_history(trial):
+    history = BallHistory(capacity=1)
+    for ball in trial.balls.values():
+        for i in range(len(ball.history)):
+            history.add(*ball.history.get_state(i))
+
+        # Capacity doubles as states are added
+        assert history.capacity >= len(history)
+        assert history.capacity < 2 * len(history)
+        assert history.rvw.dtype == np.float64
+        assert history.s.dtype == np.int8
+        assert history.t.dtype == np.float64
+
+        np.testing.assert_allclose(history.rvw, ball.history.rvw)
+        np.testing.assert_allclose(history.s, ball.history.s)
+        np.testing.assert_allclose(history.t, ball.history.t)
+
+        # Added states are copies
+        rvw = np.copy(ball.rvw)
+        history.add(rvw, ball.s, ball.t)
+        rvw[0, 0] += 1
+        assert history.rvw[-1, 0, 0] != rvw[0, 0]
+
+        history.set(None, None, None)
+        assert not history.is_populated()
+
+
+def test_unrendered_ball():
+    ball = Ball("1")
+
+    # Render attributes aren't stored until they're set, and empty histories don't
+    # allocate
+    assert not set(ball.render_attributes) & set(vars(ball))
+    assert ball.nodes == {} and not ball.rendered
+    assert ball.history.capacity == 0 and ball.history_cts.capacity == 0
+
+    ball.history.add(ball.rvw, ball.s, ball.t)
+    assert ball.history.capacity == ball.history.initial_capacity
+    assert ball.history_cts.capacity == 0
+    np.testing.assert_allclose(ball.history.rvw[0], ball.rvw)
+
+    # A copy of a ball doesn't share its render attributes
+    ball.nodes["sphere"] = None
+    assert ball.copy().nodes == {}
+    assert ball.copy().initial_orientation == ball.initial_orientation
+
+    orientation = {"pos": [1, 0, 0, 0], "sphere": [0, 1, 0, 0]}
+    assert Ball("1", initial_orientation=orientation).initial_orientation == orientation
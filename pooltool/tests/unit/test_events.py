@@ -0,0 +1,83 @@
+#! /usr/bin/env python
+
+import pytest
+
+import pooltool.constants as c
+import pooltool.events as e
+from pooltool.objects import NonObject
+from pooltool.tests import trial
+
+
+def test_filters(trial):
+    events = trial.events
+    balls = list(trial.balls.values())
+
+    for event_type in (e.type_ball_ball, e.type_ball_cushion, e.type_none):
+        expected = [event for event in events if event.event_type == event_type]
+        assert list(events.filter_type(event_type)) == expected
+
+    types = [e.type_ball_pocket, e.type_ball_ball]
+    expected = [event for event in events if event.event_type in types]
+    assert list(events.filter_type(types)) == expected
+
+    for keep_nonevent in (False, True):
+        expected = [
+            event
+            for event in events
+            if any(ball in event.agents for ball in balls[:2])
+            or (keep_nonevent and event.event_type == e.type_none)
+        ]
+        assert list(events.filter_ball(balls[:2], keep_nonevent)) == expected
+
+    t = events[len(events) // 2].time
+    expected = [event for event in events if event.time > t]
+    assert list(events.filter_time(t)) == expected
+
+    # Filters of views give the same results as filters of the events
+    cushion_events = events.filter_type(e.type_ball_cushion)
+    assert list(cushion_events.filter_ball(balls[0])) == list(
+        events.filter_ball(balls[0]).filter_type(e.type_ball_cushion)
+    )
+    assert list(cushion_events.filter_time(t)) == list(
+        events.filter_time(t).filter_type(e.type_ball_cushion)
+    )
+
+
+def test_views(trial):
+    events = trial.events.copy()
+    view = events.filter_type(e.type_ball_ball)
+    expected = list(view)
+
+    with pytest.raises(TypeError):
+        view.append(events[0])
+
+    # Views are unaffected by changes to the events they were created from
+    del events[0]
+    events.append(e.NonEvent(t=0))
+    assert list(view) == expected
+    assert list(events.filter_type(e.type_ball_ball)) == expected
+
+    events.reset()
+    assert list(view) == expected
+    assert not len(events.filter_type(e.type_ball_ball))
+
+
+def test_event_states(trial):
+    # Events have no __dict__, and the agent states of the events of a simulation are
+    # stored in the buffer of the system
+    for event in trial.events:
+        assert not hasattr(event, "__dict__")
+        assert event.states is None or event.states is trial.state.event_states
+
+    collision = trial.events.filter_type(e.type_ball_cushion)[0]
+    rvw, s = collision.agent1_state_final
+    assert rvw.shape == (3, 3)
+    assert collision.agent2_state_final is None
+
+    # Events without a system have buffers of their own
+    event = e.RollingSpinningTransition(trial.balls["cue"], t=0)
+    event.agents = (NonObject("cue"),)
+    event.agent_state_final = (rvw, c.spinning)
+    assert event.states is not trial.state.event_states
+    assert event.agent_state_initial is None
+    assert event.agent_state_final[1] == c.spinning
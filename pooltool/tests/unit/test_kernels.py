@@ -0,0 +1,30 @@
+#! /usr/bin/env python
+
+import pytest
+
+import pooltool as pt
+from pooltool.kernels import get_kernel_name, signatures
+from pooltool.tests import ref
+
+
+def test_compile_kernels(ref):
+    times = pt.compile_kernels()
+    assert set(times) == set(get_kernel_name(kernel) for kernel in signatures)
+
+    # Simulations don't need kernels to be compiled for types other than the signatures
+    compiled = {kernel: list(kernel.signatures) for kernel in signatures}
+    for engine in pt.evolution.engines:
+        system = ref.copy()
+        system.simulate(quiet=True, engine=engine, continuize=True)
+        system.checkpoint(len(system.events) // 2)
+
+    for kernel in signatures:
+        assert kernel.signatures == compiled[kernel], get_kernel_name(kernel)
+
+    assert set(pt.compile_kernels(engine="compiled")) == {
+        "pooltool.engine.simulate_fast",
+        "pooltool.engine.replay_fast",
+    }
+
+    with pytest.raises(ValueError):
+        pt.compile_kernels(engine="numba")
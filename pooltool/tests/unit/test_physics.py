@@ -199,6 +199,77 @@ def test_get_ball_pocket_collision_time(ref):
             np.testing.assert_allclose(t, t_expected)
 
 
+def test_get_ball_table_collision_times(ref):
+    geometry = ref.table.geometry
+    ids = {
+        "linear_cushion_segment": (0, geometry.linear_ids),
+        "circular_cushion_segment": (2, geometry.circular_ids),
+        "pocket": (4, geometry.pocket_ids),
+    }
+
+    for i, event in enumerate(ref.events):
+        if event.event_type not in ("ball-cushion", "ball-pocket"):
+            continue
+
+        ball, obj = event.agents
+
+        prev_event = ref.events[i - 1]
+        t_expected = event.time - prev_event.time
+
+        ball.set_from_history(i - 1)
+
+        output = p.get_ball_table_collision_times_fast(
+            ball.rvw,
+            ball.s,
+            (ball.u_s if ball.s == c.sliding else ball.u_r),
+            ball.m,
+            ball.g,
+            ball.R,
+            np.inf,
+            *geometry.get_detection_arrays(),
+            np.zeros((4, 4), dtype=np.int64),
+        )
+
+        # The event is the earliest collision with its kind of table geometry. Segments
+        # that share an endpoint may be hit at the same time, so only the time and the
+        # existence of the index are checked
+        column, obj_ids = ids[obj.object_type]
+        np.testing.assert_allclose(output[column], t_expected)
+        assert output[column + 1] in range(len(obj_ids))
+
+
+def test_get_ball_reach(ref):
+    for i in range(len(ref.events) - 1):
+        dt = ref.events[i + 1].time - ref.events[i].time
+
+        for ball in ref.balls.values():
+            if ball.history.s[i + 1] == c.pocketed:
+                # Pocketed balls are moved into the pocket
+                continue
+
+            # Otherwise, resolving an event leaves the position of a ball unchanged, so
+            # the displacement until the next event is bounded even if the ball takes
+            # part in it
+            ball.set_from_history(i)
+            reach = p.get_ball_reach_fast(
+                ball.rvw,
+                ball.s,
+                (ball.u_s if ball.s == c.sliding else ball.u_r),
+                ball.g,
+                dt,
+            )
+
+            displacement = ball.history.rvw[i + 1][0] - ball.rvw[0]
+            assert np.linalg.norm(displacement[:2]) <= reach + 1e-12
+
+    # The reach of a rolling ball is its stopping distance
+    rvw = np.array([[0, 0, 0], [1, 1, 0], [0, 0, 0]], dtype=np.float64)
+    reach = p.get_ball_reach_fast(rvw, c.rolling, 0.01, 9.8, np.inf)
+    assert reach == np.inf
+    reach = p.get_ball_reach_fast(rvw, c.rolling, 0.01, 9.8, 100)
+    np.testing.assert_allclose(reach, 2 / (2 * 0.01 * 9.8))
+
+
 def test_evolve_ball_motion(ref):
     for i in range(len(ref.events) - 1):
         event = ref.events[i]
@@ -236,3 +307,91 @@ def test_evolve_ball_motion(ref):
 
             np.testing.assert_allclose(rvw, rvw_expected)
             np.testing.assert_allclose(s, s_expected)
+
+
+def test_evolve_balls_fast(ref):
+    state = ref.state
+
+    for i in range(len(ref.events) - 1):
+        event = ref.events[i]
+        next_event = ref.events[i + 1]
+
+        dt = next_event.time - event.time
+
+        # All balls are evolved at once, in place
+        ref.set_from_history(i)
+        p.evolve_balls_fast(
+            state.rvw,
+            state.s,
+            state.R,
+            state.m,
+            state.u_s,
+            state.u_sp,
+            state.u_r,
+            state.g,
+            dt,
+        )
+
+        for index, ball in enumerate(ref.balls.values()):
+            if ball in next_event.agents:
+                # See test_evolve_ball_motion
+                continue
+
+            rvw_expected, s_expected = ball.history.rvw[i + 1], ball.history.s[i + 1]
+
+            np.testing.assert_allclose(state.rvw[index], rvw_expected, atol=1e-12)
+            np.testing.assert_allclose(state.s[index], s_expected)
+
+
+def test_evolve_ball_motion_times(ref):
+    for i in range(len(ref.events)):
+        for ball in ref.balls.values():
+            ball.set_from_history(i)
+
+            # The times span every motion state the ball passes through
+            times = np.linspace(-0.1, 10, 25)
+            rvws, states = p.evolve_ball_motion_times(
+                ball.s,
+                ball.rvw,
+                ball.R,
+                ball.m,
+                ball.u_s,
+                ball.u_sp,
+                ball.u_r,
+                ball.g,
+                times,
+            )
+
+            for t, rvw, s in zip(times, rvws, states):
+                rvw_expected, s_expected = p.evolve_ball_motion(
+                    ball.s,
+                    ball.rvw,
+                    ball.R,
+                    ball.m,
+                    ball.u_s,
+                    ball.u_sp,
+                    ball.u_r,
+                    ball.g,
+                    t,
+                )
+
+                np.testing.assert_allclose(rvw, rvw_expected, atol=1e-10)
+                np.testing.assert_allclose(s, s_expected)
+
+
+def test_sample_ball_motion_fast(ref):
+    ref.set_from_history(0)
+    ball = ref.balls["cue"]
+    args = (ball.R, ball.m, ball.u_s, ball.u_sp, ball.u_r, ball.g)
+
+    steps, rvws, states = p.sample_ball_motion_fast(ball.s, ball.rvw, *args, 0.1, 0.03)
+    np.testing.assert_allclose(steps, [0, 0.03, 0.06, 0.09])
+    rvw_expected, s_expected = p.evolve_ball_motion(ball.s, ball.rvw, *args, 0.1)
+    np.testing.assert_allclose(rvws[-1], rvw_expected, atol=1e-10)
+    assert states[-1] == s_expected
+
+    # With no time between the events, the only sample is the state itself
+    steps, rvws, states = p.sample_ball_motion_fast(ball.s, ball.rvw, *args, 0, 0.03)
+    assert len(steps) == 0
+    np.testing.assert_array_equal(rvws, [ball.rvw])
+    np.testing.assert_array_equal(states, [ball.s])
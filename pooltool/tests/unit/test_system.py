@@ -0,0 +1,182 @@
+#! /usr/bin/env python
+
+import numpy as np
+import pytest
+
+import pooltool as pt
+from pooltool.error import ConfigError
+from pooltool.tests import ref, trial
+
+
+def test_copy(trial):
+    system = trial.copy(set_to_initial=False)
+
+    for field in system.state.fields:
+        np.testing.assert_array_equal(
+            getattr(system.state, field), getattr(trial.state, field)
+        )
+
+    # The events of the copy have the objects of the copy as agents
+    assert len(system.events) == len(trial.events)
+    for event, event_trial in zip(system.events, trial.events):
+        assert event.event_type == event_trial.event_type
+        assert event.time == event_trial.time
+        for agent, agent_trial in zip(event.agents, event_trial.agents):
+            assert agent.id == agent_trial.id
+            if agent.object_type == "ball":
+                assert agent is system.balls[agent.id]
+
+    for ball_id, ball in system.balls.items():
+        ball_trial = trial.balls[ball_id]
+        assert ball is not ball_trial
+        assert len(ball.events) == len(ball_trial.events)
+        assert ball.events[-1] is system.events[-1]
+        np.testing.assert_allclose(ball.history.rvw, ball_trial.history.rvw)
+        np.testing.assert_allclose(ball.history_cts.rvw, ball_trial.history_cts.rvw)
+
+    # The copy can be modified and simulated without affecting the original
+    system.balls["cue"].rvw[0, 0] += 0.01
+    system.simulate(quiet=True)
+    assert trial.balls["cue"].rvw[0, 0] != system.balls["cue"].rvw[0, 0]
+    assert system.table.pockets is not trial.table.pockets
+
+    system = trial.copy(history=False)
+    assert not len(system.events)
+    assert not system.balls["cue"].history.is_populated()
+
+    # A copy of a table doesn't share its render attributes
+    table = system.table
+    assert not set(table.render_attributes) & set(vars(table))
+    table.collision_nodes["cushion"] = None
+    assert table.copy().collision_nodes == {}
+
+
+def test_assign_balls(ref, trial):
+    # Assigning the objects of a system one at a time, like the interactive interface
+    # does, packs the balls just like passing them to the constructor
+    source = ref.copy()
+    system = pt.System()
+    system.table = source.table
+    system.balls = source.balls
+    system.cue = source.cue
+
+    assert len(system.state) == len(system.balls)
+    for index, ball in enumerate(system.balls.values()):
+        assert ball.system_state is system.state
+        assert system.state.ids[index] == ball.id
+
+    system.simulate(quiet=True)
+    assert len(system.events) == len(trial.events)
+    for ball_id, ball in system.balls.items():
+        np.testing.assert_allclose(
+            ball.history.rvw, trial.balls[ball_id].history.rvw, atol=1e-8
+        )
+
+
+def test_modify_balls_in_place(ref, trial):
+    # Balls added to System.balls in place aren't packed until the system is simulated
+    source = ref.copy()
+    system = pt.System(table=source.table, cue=source.cue, balls={})
+    system.balls.update(source.balls)
+    assert len(system.state) == 0
+
+    system.simulate(quiet=True)
+    assert len(system.state) == len(system.balls)
+    assert len(system.events) == len(trial.events)
+    for ball_id, ball in system.balls.items():
+        np.testing.assert_allclose(
+            ball.history.rvw, trial.balls[ball_id].history.rvw, atol=1e-8
+        )
+
+    # Without repacking, the energy of a system would only count the packed balls
+    del system.balls["cue"]
+    system.balls["cue"] = source.balls["cue"].copy()
+    system.balls["cue"].rvw[1] = [1, 0, 0]
+    assert system.get_system_energy() > 0
+    assert system.balls["cue"].system_state is system.state
+
+
+def test_checkpoint(ref, trial):
+    def get_events(system):
+        return [
+            (event.event_type, [agent.id for agent in event.agents])
+            for event in system.events
+        ]
+
+    for engine in pt.evolution.engines:
+        system = ref.copy()
+        system.simulate(quiet=True, engine=engine)
+
+        k = len(system.events) // 2
+        checkpoint = system.checkpoint(k)
+        np.testing.assert_allclose(
+            checkpoint.rvw,
+            [ball.history.rvw[k] for ball in trial.balls.values()],
+            atol=1e-8,
+        )
+
+        # Resuming from a checkpoint gives the same events as the full simulation
+        system.restore(checkpoint)
+        assert len(system.events) == k + 1
+        system.resume(quiet=True, engine=engine)
+        assert get_events(system) == get_events(trial)
+        for ball in system.balls.values():
+            np.testing.assert_allclose(
+                ball.history.rvw, trial.balls[ball.id].history.rvw, atol=1e-8
+            )
+
+        # Parameters can be changed before resuming, and the checkpoint can be reused
+        system.restore(checkpoint)
+        for ball in system.balls.values():
+            ball.u_r *= 2
+        system.resume(quiet=True, engine=engine)
+        assert get_events(system)[: k + 1] == get_events(trial)[: k + 1]
+        assert system.t < trial.t
+
+        system.simulate(quiet=True, engine=engine)
+        with pytest.raises(ConfigError):
+            system.restore(checkpoint)
+
+
+def test_branch(ref, trial):
+    for engine in pt.evolution.engines:
+        system = ref.copy()
+        system.simulate(quiet=True, engine=engine)
+        rvw = {
+            ball_id: ball.history.rvw.copy() for ball_id, ball in system.balls.items()
+        }
+
+        # Without changes, a branch is resimulated to the same outcome
+        k = len(system.events) // 2
+        branch = system.branch(k, engine=engine)
+        assert len(branch.events) == len(trial.events)
+        for ball_id, ball in branch.balls.items():
+            assert ball is not system.balls[ball_id]
+            np.testing.assert_allclose(
+                ball.history.rvw, trial.balls[ball_id].history.rvw, atol=1e-8
+            )
+
+        # The events up to the branching event have the objects of the branch as agents
+        for event in branch.events[: k + 1]:
+            for agent in event.agents:
+                if agent.object_type == "ball":
+                    assert agent is branch.balls[agent.id]
+
+        # Changes are applied from the branching event on, and the parent is unaffected
+        branch = system.branch(k, engine=engine, u_r={"cue": 0.02}, e_c=0.5)
+        assert branch.balls["cue"].u_r == 0.02
+        assert branch.balls["1"].e_c == 0.5
+        assert branch.events[k].time == system.events[k].time
+        assert branch.t != system.t
+        for ball_id, ball in system.balls.items():
+            np.testing.assert_array_equal(ball.history.rvw, rvw[ball_id])
+
+        # A branch from the final event is the same as its parent
+        branch = system.branch(-1, engine=engine)
+        assert len(branch.events) == len(system.events)
+        assert branch.t == system.t
+        for ball_id, ball in branch.balls.items():
+            np.testing.assert_array_equal(ball.history.rvw, rvw[ball_id])
+
+        with pytest.raises(ValueError):
+            system.branch(k, t=1)
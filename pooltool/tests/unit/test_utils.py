@@ -0,0 +1,168 @@
+#! /usr/bin/env python
+
+import subprocess
+import sys
+
+import numpy as np
+
+import pooltool.constants as c
+import pooltool.physics as physics
+import pooltool.utils as utils
+
+
+def test_quartic_roots_fast():
+    for expected in ([1, 2, 3, 4], [-1, -1, 1, 1], [0.5, 0, 0, -2], [2, 2, 2, 2]):
+        p = np.poly(expected)
+        roots = np.sort(utils.quartic_roots_fast(p).real)
+        np.testing.assert_allclose(roots, np.sort(expected), atol=1e-6)
+
+    # The leading coefficient is 0
+    roots = utils.quartic_roots_fast(np.array([0, 1, -6, 11, -6], dtype=np.float64))
+    np.testing.assert_allclose(np.sort(roots.real)[:3], [1, 2, 3])
+
+
+def test_min_real_quartic_roots_fast():
+    np.random.seed(42)
+    p = np.random.randn(1000, 5)
+
+    expected = utils.min_real_root_per_row(p.copy())
+    output = utils.min_real_quartic_roots_fast(p)
+
+    np.testing.assert_array_equal(np.isfinite(output), np.isfinite(expected))
+    finite = np.isfinite(expected)
+    np.testing.assert_allclose(output[finite], expected[finite])
+
+
+def test_min_real_quartic_roots_fast_accuracy():
+    # Polynomials with known roots, whose coefficients span many orders of magnitude
+    # like those of the collision equations. In order: distinct real roots, a complex
+    # pair, a nearly repeated root, and a repeated root
+    rng = np.random.default_rng(42)
+    M = 1000
+    roots = rng.uniform(0.01, 10, (4, M, 4)) * rng.choice([-1, 1], (4, M, 4))
+    roots = roots.astype(np.complex128)
+    roots[1, :, 1] = roots[1, :, 0].real + 1j * np.abs(roots[1, :, 1])
+    roots[1, :, 0] = np.conj(roots[1, :, 1])
+    roots[2, :, 1] = np.abs(roots[2, :, 0]) * (1 + 1e-4)
+    roots[2, :, 0] = np.abs(roots[2, :, 0])
+    roots[3, :, 1] = roots[3, :, 0] = np.abs(roots[3, :, 0])
+    scale = 10 ** rng.uniform(-6, 6, (4, M, 1))
+    p = np.array([[np.poly(r).real for r in group] for group in roots]) * scale
+
+    real = (roots.imag == 0) & (roots.real > 0)
+    expected = np.where(real, roots.real, np.inf).min(axis=2)
+
+    for group, tol in zip(range(3), (1e-9, 1e-9, 1e-6)):
+        output = utils.min_real_quartic_roots_fast(p[group])
+        np.testing.assert_allclose(output, expected[group], rtol=tol)
+
+    # A repeated root is ill-conditioned: rounding can turn it into a complex pair,
+    # for the eigenvalue solver (see `roots`) as well. Whichever root is found must
+    # still be a root, as measured by the residual relative to the size of the terms
+    for group in p:
+        output = utils.min_real_quartic_roots_fast(group)
+        finite = np.isfinite(output)
+        terms = group[finite] * output[finite, None] ** np.arange(4, -1, -1)
+        residual = np.abs(terms.sum(axis=1)) / np.abs(terms).sum(axis=1)
+        assert residual.max() < 1e-10
+
+
+def test_has_root_in_interval_fast():
+    np.random.seed(42)
+    p = np.random.randn(1000, 5)
+    t = np.random.rand(1000) * 3
+
+    for p_i, t_i in zip(p, t):
+        roots = np.roots(p_i)
+        roots = roots[(np.abs(roots.imag) < 1e-9) & (roots.real >= 0)].real
+        if np.any(roots <= t_i):
+            # The test is conservative, so it must never rule out an existing root
+            assert utils.has_root_in_interval_fast(p_i, t_i)
+
+    # x**2 - 1 only has a root in [0, t] if t >= 1
+    assert not utils.has_root_in_interval_fast(np.array([1.0, 0, -1]), 0.5)
+    assert utils.has_root_in_interval_fast(np.array([1.0, 0, -1]), 2)
+    assert utils.has_root_in_interval_fast(np.array([1.0, 0, -1]), np.inf)
+
+    # Quartics whose smallest positive root is at the end of the interval, or is a
+    # double root within it. Rounding can give the Bernstein coefficient that is 0 at
+    # such a root either sign
+    rng = np.random.default_rng(42)
+    for _ in range(1000):
+        roots = rng.uniform(0.01, 10, 4) * rng.choice([-1, 1], 4)
+        roots[0] = np.abs(roots[0])
+        roots[1:] = np.where(roots[1:] > 0, roots[1:] + roots[0], roots[1:])
+        p = np.poly(roots) * 10 ** rng.uniform(-6, 6)
+        assert utils.has_root_in_interval_fast(p, roots[0])
+
+        roots[1] = roots[0]
+        p = np.poly(roots) * 10 ** rng.uniform(-6, 6)
+        assert utils.has_root_in_interval_fast(p, roots[0] * 2)
+
+
+def test_sweep_and_prune_fast():
+    def brute_force(bounds):
+        pairs = set()
+        for i in range(len(bounds)):
+            for j in range(i + 1, len(bounds)):
+                xmin1, xmax1, ymin1, ymax1 = bounds[i]
+                xmin2, xmax2, ymin2, ymax2 = bounds[j]
+                if xmin1 > xmax1 or xmin2 > xmax2:
+                    continue
+                if (
+                    xmin1 <= xmax2
+                    and xmin2 <= xmax1
+                    and ymin1 <= ymax2
+                    and ymin2 <= ymax1
+                ):
+                    pairs.add((i, j))
+        return pairs
+
+    # Bounds on a coarse grid, so that many boxes share bounds or touch. Some boxes
+    # have no extent along one or both axes, and some are empty
+    rng = np.random.default_rng(42)
+    for _ in range(100):
+        N = rng.integers(0, 30)
+        lower = rng.integers(0, 10, (N, 2))
+        size = rng.integers(-1, 3, (N, 2)) * (rng.random((N, 2)) < 0.8)
+        bounds = np.empty((N, 4))
+        bounds[:, 0::2] = lower
+        bounds[:, 1::2] = lower + size
+
+        pairs = utils.sweep_and_prune_fast(bounds)
+        assert all(i < j for i, j in pairs)
+        assert len(pairs) == len({(i, j) for i, j in pairs})
+        assert {(i, j) for i, j in pairs} == brute_force(bounds)
+
+    # Touching balls at rest in a rack, and a pocketed ball, whose box is empty (see
+    # `physics.get_ball_swept_bounds_fast`)
+    R = 0.028575
+    rvw = np.zeros((3, 3))
+    bounds = []
+    for row in range(5):
+        for col in range(row + 1):
+            rvw[0, :2] = 2 * R * row, R * (2 * col - row)
+            bounds.append(
+                physics.get_ball_swept_bounds_fast(rvw, c.stationary, 0, 9.8, R, 0)
+            )
+    bounds.append(physics.get_ball_swept_bounds_fast(rvw, c.pocketed, 0, 9.8, R, 0))
+    bounds = np.array(bounds)
+
+    pairs = {(i, j) for i, j in utils.sweep_and_prune_fast(bounds)}
+    assert pairs == brute_force(bounds)
+    assert (0, 1) in pairs and not any(j == 15 for _, j in pairs)
+
+
+def test_headless_import():
+    # Simulating doesn't import the rendering modules
+    code = """
+import sys
+import pooltool as pt
+from pooltool.tests import shot_ref
+system = shot_ref.copy()
+system.simulate(quiet=True, continuize=True)
+rendering = ("panda3d.core", "direct", "pooltool.ani")
+loaded = [name for name in rendering if name in sys.modules]
+assert not loaded, loaded
+"""
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -1,17 +1,21 @@
 #! /usr/bin/env python
 
+import ast
 import collections
+import configparser
+import copy
+import importlib
 import importlib.util
 import linecache
 import os
 import pickle
 import tempfile
 import tracemalloc
+from pathlib import Path
+from typing import Dict
 
 import numpy as np
-import pprofile
 from numba import jit
-from panda3d.core import Filename
 
 import pooltool.constants as c
 
@@ -39,9 +43,84 @@ def is_pickleable(obj):
 
 
 def panda_path(path):
+    from panda3d.core import Filename
+
     return str(Filename.fromOsSpecific(str(path)))
 
 
+class LazyModule(object):
+    def __init__(self, name):
+        """A module that is imported the first time one of its attributes is used
+
+        This keeps modules that are only needed for rendering (panda3d, pooltool.ani,
+        and so on) from being imported by code that only simulates.
+
+        Parameters
+        ==========
+        name : str
+            The name of the module, e.g. 'pooltool.ani'
+        """
+        self.__dict__["_name"] = name
+
+    def __getattr__(self, attr):
+        return getattr(importlib.import_module(self._name), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(importlib.import_module(self._name), attr, value)
+
+    def __repr__(self):
+        return f"<lazily imported module '{self._name}'>"
+
+
+# Parsed config files, by name, along with the modification time of the file when it was
+# parsed (see `load_config`)
+config_cache = {}
+
+
+def load_config(name):
+    """Load a config file from pooltool/config
+
+    Parsing is slow compared to e.g. creating a table, so the parsed config is cached
+    until the file is modified. A copy is returned, so it can be modified freely.
+    """
+    config_path = Path(__file__).parent.parent / "config" / name
+    mtime = config_path.stat().st_mtime_ns if config_path.exists() else None
+
+    if name not in config_cache or config_cache[name][0] != mtime:
+        config_cache[name] = (mtime, parse_config(config_path))
+
+    return copy.deepcopy(config_cache[name][1])
+
+
+def parse_config(config_path):
+    config_obj = configparser.ConfigParser()
+    config_obj.read(config_path)
+    config = {}
+    for section in config_obj.sections():
+        config[section] = {}
+        for k, v in config_obj[section].items():
+            try:
+                config[section][k] = ast.literal_eval(v)
+            except Exception:
+                config[section][k] = v
+    return config
+
+
+def save_config(name, config: Dict, overwrite=False):
+    config_path = Path(__file__).parent.parent / "config" / name
+
+    if config_path.exists() and not overwrite:
+        raise ValueError(
+            f"pass overwrite=True to overwrite existing config: '{config_path}'"
+        )
+
+    config_obj = configparser.ConfigParser()
+    config_obj.read_dict(config)
+
+    with open(config_path, "w") as configfile:
+        config_obj.write(configfile)
+
+
 def get_temp_file_path():
     f = tempfile.NamedTemporaryFile(delete=False)
     temp_file_name = f.name
@@ -175,7 +254,8 @@ def cross_fast(u, v):
 
     Notes
     =====
-    - Speed comparison in pooltool/tests/speed/cross.py
+    - Speed comparison with `pooltool/tests/speed/suite.py --filter
+      kernels/cross/`
     """
     return np.array(
         [
@@ -196,7 +276,8 @@ def get_rel_velocity_fast(rvw, R):
     """
     Notes
     =====
-    - Speed comparison in pooltool/tests/speed/get_rel_velocity.py
+    - Speed comparison with `pooltool/tests/speed/suite.py --filter
+      kernels/get_rel_velocity/`
     """
     _, v, w = rvw
     return v + R * cross_fast(np.array([0.0, 0.0, 1.0], dtype=np.float64), w)
@@ -220,7 +301,8 @@ def quadratic_fast(a, b, c):
 
     Notes
     =====
-    - Speed comparison in pooltool/tests/speed/quadratic.py
+    - Speed comparison with `pooltool/tests/speed/suite.py --filter
+      kernels/quadratic/`
     """
     if a == 0:
         u = -c / b
@@ -268,7 +350,8 @@ def roots_fast(p):
 
     Notes
     =====
-    - Speed comparison in pooltool/tests/speed/roots.py
+    - Speed comparison with `pooltool/tests/speed/suite.py --filter
+      kernels/roots/`
     """
     M, N = p.shape
     p = p.astype(np.complex128)
@@ -298,6 +381,29 @@ def min_real_root(p, tol=1e-12):
         specifies the index of the responsible polynomial. i.e. the polynomial with the
         root `time` is p[index]
     """
+    times = min_real_root_per_row(p, tol=tol)
+
+    # now find the minimum time and the index of the responsible polynomial
+    return times.min(), times.argmin()
+
+
+def min_real_root_per_row(p, tol=1e-12):
+    """Given an array of polynomial coefficients, find the minimum real root of each
+
+    Parameters
+    ==========
+    p : array
+        A mxn array of polynomial coefficients. See `min_real_root` for details.
+    tol : float, 1e-12
+        Roots are considered real if their imaginary component is no more than `tol`,
+        and are considered positive if their real component is more than `tol`
+
+    Returns
+    =======
+    output : array
+        A length-m array, where output[i] is the minimum real root of the polynomial
+        p[i]. If p[i] has no positive real roots, output[i] is np.inf
+    """
     # Get the roots for the polynomials
     times = roots(p)
 
@@ -305,10 +411,7 @@ def min_real_root(p, tol=1e-12):
     # If the root has a nonpositive real component, set to infinity
     times[(abs(times.imag) > tol) | (times.real <= tol)] = np.inf
 
-    # now find the minimum time and the index of the responsible polynomial
-    times = np.min(times.real, axis=1)
-
-    return times.min(), times.argmin()
+    return np.min(times.real, axis=1)
 
 
 @jit(nopython=True, cache=c.numba_cache)
@@ -319,7 +422,8 @@ def min_real_root_fast(p, tol=1e-12):
 
     Notes
     =====
-    - Speed comparison in pooltool/tests/speed/min_real_root.py
+    - Speed comparison with `pooltool/tests/speed/suite.py --filter
+      kernels/min_real_root/`
     """
     # Get the roots for the polynomials
     times = roots_fast(p)
@@ -341,6 +445,325 @@ def min_real_root_fast(p, tol=1e-12):
     return min_root, min_index
 
 
+@jit(nopython=True, cache=c.numba_cache)
+def sweep_and_prune_fast(bounds):
+    """Find all pairs of overlapping axis-aligned bounding boxes
+
+    (just-in-time compiled)
+
+    The boxes are sorted by their lower x-bound, and then swept along the x-axis. Each
+    box is only compared to the boxes whose lower x-bound falls within its x-range.
+
+    Parameters
+    ==========
+    bounds : array
+        A Nx4 array of boxes, where row i is [xmin, xmax, ymin, ymax] of box i. Empty
+        boxes (xmin > xmax) overlap with nothing
+
+    Returns
+    =======
+    output : array
+        A Mx2 array of box index pairs (i, j), where i < j and boxes i and j overlap
+    """
+    order = np.argsort(bounds[:, 0])
+    pairs = []
+
+    for k in range(len(order)):
+        i = order[k]
+        if bounds[i, 0] > bounds[i, 1]:
+            continue
+
+        for l in range(k + 1, len(order)):
+            j = order[l]
+            if bounds[j, 0] > bounds[i, 1]:
+                break
+
+            if bounds[j, 0] > bounds[j, 1]:
+                continue
+
+            if bounds[j, 2] > bounds[i, 3] or bounds[i, 2] > bounds[j, 3]:
+                continue
+
+            pairs.append((min(i, j), max(i, j)))
+
+    output = np.empty((len(pairs), 2), dtype=np.int64)
+    for k in range(len(pairs)):
+        output[k, 0], output[k, 1] = pairs[k]
+
+    return output
+
+
+@jit(nopython=True, cache=c.numba_cache)
+def cubic_roots_fast(A, B, C):
+    """Solve the monic cubic equation t^3 + At^2 + Bt + C = 0 with Cardano's formula
+
+    (just-in-time compiled)
+
+    Returns
+    =======
+    output : array
+        A length-3 complex array of the roots
+    """
+    A, B, C = complex(A), complex(B), complex(C)
+
+    # Depress the cubic with the substitution t = w - A/3, yielding w^3 + Pw + Q = 0
+    P = B - A * A / 3
+    Q = 2 * A * A * A / 27 - A * B / 3 + C
+
+    # Of the two choices for the square root, take the one that avoids cancellation
+    delta = (Q * Q / 4 + P * P * P / 27) ** 0.5
+    S = -Q / 2 + delta if abs(-Q / 2 + delta) >= abs(-Q / 2 - delta) else -Q / 2 - delta
+
+    output = np.empty(3, dtype=np.complex128)
+    if S == 0:
+        output[:] = -A / 3
+        return output
+
+    u = S ** (1 / 3)
+    omega = complex(-0.5, 0.5 * np.sqrt(3))
+    for k in range(3):
+        output[k] = u - P / (3 * u) - A / 3
+        u *= omega
+
+    return output
+
+
+@jit(nopython=True, cache=c.numba_cache)
+def quartic_roots_fast(p):
+    """Solve the quartic equation at^4 + bt^3 + ct^2 + dt + e = 0 analytically
+
+    (just-in-time compiled)
+
+    The roots are found with Ferrari's method, where the resolvent cubic is solved with
+    Cardano's formula (see `cubic_roots_fast`). Each root is then polished with Newton's
+    method to recover the precision lost in the closed-form expressions.
+
+    Parameters
+    ==========
+    p : array
+        A length-5 array of the coefficients a, b, c, d, e. If a is 0, the roots of the
+        lower order polynomial are solved with numpy.roots and the remaining roots are
+        np.inf
+
+    Returns
+    =======
+    output : array
+        A length-4 complex array of the roots
+    """
+    output = np.empty(4, dtype=np.complex128)
+
+    if p[0] == 0:
+        output[:] = np.inf
+        lower = np.roots(p[1:].astype(np.complex128))
+        output[: len(lower)] = lower
+        return output
+
+    # Normalize to t^4 + Bt^3 + Ct^2 + Dt + E = 0
+    B, C, D, E = p[1] / p[0], p[2] / p[0], p[3] / p[0], p[4] / p[0]
+
+    # Depress the quartic with the substitution t = y - B/4, yielding
+    # y^4 + Py^2 + Qy + R = 0
+    P = C - 3 * B * B / 8
+    Q = D - B * C / 2 + B * B * B / 8
+    R = E - B * D / 4 + B * B * C / 16 - 3 * B * B * B * B / 256
+
+    # A root m of the resolvent cubic makes y^4 + Py^2 + Qy + R the difference of two
+    # squares, (y^2 + P/2 + m)^2 - 2m(y - Q/(4m))^2. The largest root is the most
+    # stable choice, and is only 0 when P, Q, and R are all 0
+    resolvent = cubic_roots_fast(P, P * P / 4 - R, -Q * Q / 8)
+    m = resolvent[np.argmax(np.abs(resolvent))]
+
+    if m == 0:
+        output[:] = -B / 4
+        return output
+
+    s = (2 * m) ** 0.5
+    for k, sign in enumerate((1, -1)):
+        # y^2 - sign*s*y + (P/2 + m + sign*Q/(2s)) = 0
+        beta = -sign * s
+        gamma = P / 2 + m + sign * Q / (2 * s)
+
+        # Of the two choices for the square root, take the one that avoids cancellation
+        delta = (beta * beta - 4 * gamma) ** 0.5
+        if abs(beta + delta) < abs(beta - delta):
+            delta = -delta
+
+        y1 = -(beta + delta) / 2
+        y2 = gamma / y1 if y1 != 0 else -beta - y1
+
+        output[2 * k] = y1 - B / 4
+        output[2 * k + 1] = y2 - B / 4
+
+    # Polish the roots with Newton's method. Near a multiple root, f and df are both
+    # dominated by rounding error, so a step is rejected if it increases |f|
+    for k in range(4):
+        t = output[k]
+        f = (((t + B) * t + C) * t + D) * t + E
+        for _ in range(2):
+            df = ((4 * t + 3 * B) * t + 2 * C) * t + D
+            if df == 0:
+                break
+
+            t_next = t - f / df
+            f_next = (((t_next + B) * t_next + C) * t_next + D) * t_next + E
+            if abs(f_next) > abs(f):
+                break
+
+            t, f = t_next, f_next
+        output[k] = t
+
+    return output
+
+
+@jit(nopython=True, cache=c.numba_cache)
+def min_real_quartic_roots_fast(p, tol=1e-12):
+    """Find the minimum real root of each quartic equation in an array
+
+    (just-in-time compiled)
+
+    This is a specialization of `min_real_root_per_row` to quartic equations. Rather
+    than compute eigenvalues of companion matrices, each polynomial is solved
+    analytically (see `quartic_roots_fast`).
+
+    Parameters
+    ==========
+    p : array
+        A mx5 array of polynomial coefficients. See `min_real_root` for details.
+    tol : float, 1e-12
+        Roots are considered real if their imaginary component is no more than `tol`,
+        and are considered positive if their real component is more than `tol`
+
+    Returns
+    =======
+    output : array
+        A length-m array, where output[i] is the minimum real root of the polynomial
+        p[i]. If p[i] has no positive real roots, output[i] is np.inf
+
+    Notes
+    =====
+    - Speed comparison with `pooltool/tests/speed/suite.py --filter
+      kernels/min_real_quartic_roots/`, which also checks that the output agrees with
+      min_real_root_per_row, and reports the accuracy of both
+    """
+    M = p.shape[0]
+    output = np.full(M, np.inf)
+
+    for m in range(M):
+        roots = quartic_roots_fast(p[m])
+        for n in range(4):
+            root = roots[n]
+            if np.abs(root.imag) > tol or root.real <= tol:
+                continue
+
+            if root.real < output[m]:
+                output[m] = root.real
+
+    return output
+
+
+@jit(nopython=True, cache=c.numba_cache)
+def has_root_in_interval_fast(p, t, tol=1e-12):
+    """Whether a polynomial may have a root in the interval [0, t]
+
+    (just-in-time compiled)
+
+    This is a conservative test that is much cheaper than finding the roots. The
+    polynomial is written in the Bernstein basis of [0, t], which takes O(n**2)
+    operations. By Descartes' rule of signs (applied after mapping [0, t] onto
+    [0, inf)), the polynomial has at most as many roots in the interval as there are
+    sign changes in its Bernstein coefficients. So if they all have the same strict
+    sign, there are no roots in the interval.
+
+    The coefficients are computed in floating point, so one that is within rounding
+    error of 0 could have either sign, e.g. when there is a root at t, or a double root
+    in the interval. Such a coefficient counts as a sign change.
+
+    Parameters
+    ==========
+    p : array
+        The polynomial coefficients, highest degree first. See `min_real_root` for
+        details.
+    t : float
+        The end of the interval
+    tol : float, 1e-12
+        A Bernstein coefficient is within rounding error of 0 if its magnitude is no
+        more than `tol` times the sum of the magnitudes of its terms
+
+    Returns
+    =======
+    output : bool
+        False if the polynomial provably has no roots in [0, t], and True otherwise.
+        Always True if t is np.inf
+    """
+    if not t < np.inf:
+        return True
+
+    n = len(p) - 1
+
+    # The coefficients of p(t*x), lowest degree first, divided by binomial(n, k)
+    a = np.empty(n + 1)
+    scale, binomial = 1.0, 1.0
+    for k in range(n + 1):
+        a[k] = p[n - k] * scale / binomial
+        scale *= t
+        binomial = binomial * (n - k) / (k + 1)
+
+    first = 0.0
+    for i in range(n + 1):
+        # The ith Bernstein coefficient is sum_k binomial(i, k) * a[k]
+        b, size, binomial = 0.0, 0.0, 1.0
+        for k in range(i + 1):
+            b += binomial * a[k]
+            size += abs(binomial * a[k])
+            binomial = binomial * (i - k) / (k + 1)
+
+        if i == 0:
+            first = b
+
+        # Zero within rounding error, a sign change, or nan
+        if not (b * first > 0 and abs(b) > tol * size):
+            return True
+
+    return False
+
+
+@jit(nopython=True, cache=c.numba_cache)
+def min_real_quartic_roots_within_fast(p, t, tol=1e-12):
+    """Find the minimum real root of each quartic equation that may be within a bound
+
+    (just-in-time compiled)
+
+    This is `min_real_quartic_roots_fast` for callers that only care about roots in
+    [0, t[i]]. Quartics that provably have no roots in the interval (see
+    `has_root_in_interval_fast`) are not solved.
+
+    Returns
+    =======
+    output : tuple
+        (roots, skipped), where roots[i] is the minimum real root of p[i], or np.inf if
+        p[i] has no positive real roots or was skipped, and skipped[i] is whether p[i]
+        was skipped. Roots of solved quartics are returned even if they are after t[i]
+    """
+    M = p.shape[0]
+    skipped = np.zeros(M, dtype=np.bool_)
+
+    num_solved = 0
+    solved = np.empty(M, dtype=np.int64)
+    for m in range(M):
+        if has_root_in_interval_fast(p[m], t[m]):
+            solved[num_solved] = m
+            num_solved += 1
+        else:
+            skipped[m] = True
+
+    output = np.full(M, np.inf)
+    roots = min_real_quartic_roots_fast(p[solved[:num_solved]], tol)
+    for n in range(num_solved):
+        output[solved[n]] = roots[n]
+
+    return output, skipped
+
+
 def unit_vector(vector, handle_zero=False):
     """Returns the unit vector of the vector.
 
@@ -368,7 +791,8 @@ def unit_vector_fast(vector, handle_zero=False):
     Notes
     =====
     - Unlike unit_vector, this does not support 2D arrays
-    - Speed comparison in pooltool/tests/speed/unit_vector.py
+    - Speed comparison with `pooltool/tests/speed/suite.py --filter
+      kernels/unit_vector/`
     """
     norm = np.sqrt(vector[0] ** 2 + vector[1] ** 2 + vector[2] ** 2)
     if handle_zero and norm == 0.0:
@@ -421,7 +845,8 @@ def angle_fast(v2, v1=(1, 0)):
 
     Notes
     =====
-    - Speed comparison in pooltool/tests/speed/angle.py
+    - Speed comparison with `pooltool/tests/speed/suite.py --filter
+      kernels/angle/`
     """
     ang = np.arctan2(v2[1], v2[0]) - np.arctan2(v1[1], v1[0])
 
@@ -448,7 +873,8 @@ def coordinate_rotation_fast(v, phi):
 
     Notes
     =====
-    - Speed comparison in pooltool/tests/speed/coordinate_rotation.py
+    - Speed comparison with `pooltool/tests/speed/suite.py --filter
+      kernels/coordinate_rotation/`
     """
     cos_phi = np.cos(phi)
     sin_phi = np.sin(phi)
@@ -490,21 +916,26 @@ class ListLike(collections.abc.MutableSequence):
         return self._list.__repr__()
 
 
-class PProfile(pprofile.Profile):
-    """Small wrapper for pprofile that accepts a filepath and outputs cachegrind file"""
+class PProfile(object):
+    """Small wrapper for pprofile that accepts a filepath and outputs cachegrind file
+
+    pprofile is imported when the wrapper is created, since importing it is slow
+    """
 
     def __init__(self, path, run=True):
+        import pprofile
+
         self.run = run
         self.path = path
-        pprofile.Profile.__init__(self)
+        self.profile = pprofile.Profile()
 
     def __enter__(self):
         if self.run:
-            return pprofile.Profile.__enter__(self)
+            return self.profile.__enter__()
         else:
             return self
 
     def __exit__(self, *args):
         if self.run:
-            pprofile.Profile.__exit__(self, *args)
-            self.dump_stats(self.path)
+            self.profile.__exit__(*args)
+            self.profile.dump_stats(self.path)
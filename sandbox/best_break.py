@@ -1,7 +1,6 @@
 #! /usr/bin/env python
 """This illustrates how shots can be visualized multiple times in a single script"""
 
-import multiprocessing
 from collections import Counter
 from pathlib import Path
 
@@ -44,28 +43,51 @@ def load_prev_data():
     return shot, stats
 
 
+def get_break():
+    # setup table, cue, and cue ball
+    table = pt.PocketTable(model_name="7_foot")
+    balls = pt.get_nine_ball_rack(table, spacing_factor=spacing_factor, ordered=True)
+    balls["cue"].rvw[0] = get_cue_pos(balls["cue"], table)
+    cue = pt.Cue(cueing_ball=balls["cue"])
+
+    # Aim at the head ball then strike the cue ball
+    cue.aim_at_ball(balls["1"])
+    cue.strike(V0=8)
+
+    return pt.System(cue=cue, table=table, balls=balls)
+
+
+def get_breaks():
+    while True:
+        yield get_break()
+
+
 def process_shots(shots, stats, break_count, session_best, best_break, interface):
-    for shot_dict in shots:
-        shot = pt.System(d=shot_dict)
+    for result in shots:
+        if result.failed:
+            # The break couldn't be simulated, so it is skipped
+            continue
 
         break_count += 1
 
-        if len(shot.events.filter_ball(shot.balls["cue"]).filter_type("ball-pocket")):
+        pocketed = result.get_pocketed_ball_ids()
+
+        if "cue" in pocketed:
             # Cue ball was potted. Illegal shot
             stats["scratch"] += 1
 
         else:
             # Count how many balls were potted, ignoring cue ball
-            numbered_balls = [ball for ball in shot.balls.values() if ball.id != "cue"]
-            balls_potted = len(
-                shot.events.filter_type("ball-pocket").filter_ball(numbered_balls)
-            )
+            balls_potted = len(pocketed)
             stats[balls_potted] += 1
 
             if balls_potted > session_best:
                 session_best = balls_potted
 
             if balls_potted > best_break:
+                # The balls are set to their states when the cue struck, and the cue is
+                # set to the one that struck, so the rack of the system doesn't matter
+                shot = result.apply(get_break())
                 shot.continuize(dt=0.003)
                 shot.save(Path(__file__).parent / "best_break.pkl")
                 best_break = balls_potted
@@ -77,38 +99,6 @@ def process_shots(shots, stats, break_count, session_best, best_break, interface
     return stats, break_count, session_best, best_break
 
 
-def worker(output_queue):
-    while True:
-        # setup table, cue, and cue ball
-        table = pt.PocketTable(model_name="7_foot")
-        balls = pt.get_nine_ball_rack(
-            table, spacing_factor=spacing_factor, ordered=True
-        )
-        balls["cue"].rvw[0] = get_cue_pos(balls["cue"], table)
-        cue = pt.Cue(cueing_ball=balls["cue"])
-
-        # Aim at the head ball then strike the cue ball
-        cue.aim_at_ball(balls["1"])
-        cue.strike(V0=8)
-
-        # Evolve the shot
-        shot = pt.System(cue=cue, table=table, balls=balls)
-        try:
-            shot.simulate(continuize=False, quiet=True)
-        except Exception as e:
-            continue
-
-        if len(shot.events.filter_ball(balls["cue"]).filter_type("ball-pocket")):
-            # Cue ball was potted. Illegal shot
-            output_queue.put(shot.as_dict())
-            continue
-
-        output_queue.put(shot.as_dict())
-
-    # Code never reaches here because worker is terminated by main thread
-    return
-
-
 def print_stats(stats, run):
     run.warning("", header="Cumulative stats", lc="green")
     run.info(f"Num total breaks", sum(stats.values()))
@@ -142,22 +132,12 @@ def main(args):
 
     shots = []
     buffer_size = 200
-    queue_size = args.threads * 5
-
-    manager = multiprocessing.Manager()
-    output_queue = manager.Queue(queue_size)
-
-    processes = []
-    for _ in range(args.threads):
-        processes.append(multiprocessing.Process(target=worker, args=(output_queue,)))
 
-    for proc in processes:
-        proc.start()
-
-    while True:
-        try:
-            shot = output_queue.get()
-            shots.append(shot)
+    try:
+        for result in pt.simulate_many(
+            get_breaks(), processes=args.threads, chunksize=10, stream=True
+        ):
+            shots.append(result)
 
             if buffer_size > 0 and len(shots) % buffer_size == 0:
                 stats, break_count, session_best, best_break = process_shots(
@@ -166,20 +146,8 @@ def main(args):
                 print_stats(stats, run)
                 shots = []
 
-        except KeyboardInterrupt:
-            run.info_single("Cancelling upon user request...", nl_before=1, nl_after=1)
-            break
-
-        except Exception as worker_error:
-            for proc in processes:
-                proc.terminate()
-            run.info_single("Thread interrupted. Ending...", nl_before=1, nl_after=1)
-            break
-
-    for proc in processes:
-        proc.terminate()
-
-    shots = []
+    except KeyboardInterrupt:
+        run.info_single("Cancelling upon user request...", nl_before=1, nl_after=1)
 
 
 if __name__ == "__main__":